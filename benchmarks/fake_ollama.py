@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Ollama HTTP API.
+Serves /api/generate (streaming, non-streaming and JSON mode) and /api/tags with a
+configurable first-token latency and token rate, so benchmarks and load tests
+exercise the real clients without a GPU or a downloaded model.
+"""
+
+import json
+import time
+import random
+import argparse
+import contextlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Words the fake model "generates"; mixed lengths keep responses text-like
+VOCABULARY = (
+    "the key concept in this lecture is how neural networks learn from data "
+    "gradient descent updates each weight to reduce the loss while backpropagation "
+    "computes those gradients layer by layer practical applications include image "
+    "recognition language models and recommendation systems"
+).split()
+
+
+class FakeOllamaServer:
+    """
+    Threaded HTTP server imitating Ollama's response timing.
+    Each request waits `latency` seconds, plus prompt evaluation at
+    `prompt_rate` tokens per second if set, then produces tokens at
+    `token_rate` tokens per second up to min(num_predict, response_tokens).
+    Like Ollama it returns a `context` token array; tokens passed back in
+    `context` count as already evaluated. With `parallel` set, at most that
+    many requests are processed at once and the rest queue, as on one real
+    Ollama instance; 0 means unlimited.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.05,
+                 token_rate: float = 200.0, response_tokens: int = 120, models=("llama3:8b",),
+                 prompt_rate: float = 0.0, parallel: int = 0):
+        self.latency = latency
+        self.token_rate = token_rate
+        self.prompt_rate = prompt_rate
+        self.response_tokens = response_tokens
+        self.models = list(models)
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(parallel) if parallel > 0 else contextlib.nullcontext()
+        self._httpd = ThreadingHTTPServer((host, port), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeOllamaServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def _tokens(self, prompt: str, num_predict: int):
+        # Seed from the prompt so the same request always gets the same answer
+        rng = random.Random(prompt)
+        count = max(1, min(num_predict, self.response_tokens))
+        return [rng.choice(VOCABULARY) + " " for _ in range(count)]
+
+    def _json_tokens(self, prompt: str):
+        """
+        JSON-mode answer shaped like the combined analysis response, split into
+        ~4-character tokens. It is never cut at num_predict, which would only
+        produce invalid JSON.
+        """
+        rng = random.Random(prompt)
+
+        def words(n):
+            return " ".join(rng.choice(VOCABULARY) for _ in range(n))
+
+        payload = {
+            'summary': words(60),
+            'study_guide': {key: [words(6) for _ in range(3)] for key in (
+                "key_concepts", "learning_objectives", "study_strategies",
+                "practical_applications", "further_reading")},
+            'topics': [{'name': words(3), 'why': words(10), 'level': "Beginner"} for _ in range(5)],
+            'quiz': [{'question': words(10), 'options': [words(3) for _ in range(4)], 'answer': words(3),
+                      'explanation': words(12), 'difficulty': "Medium"} for _ in range(5)],
+        }
+        text = json.dumps(payload)
+        return [text[i:i + 4] for i in range(0, len(text), 4)]
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass  # keep benchmark output readable
+
+            def _send_json(self, payload, status=200):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                if self.path == "/api/tags":
+                    self._send_json({'models': [{'name': name, 'model': name} for name in server.models]})
+                else:
+                    self._send_json({'error': "not found"}, status=404)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                try:
+                    data = json.loads(self.rfile.read(length) or b"{}")
+                except ValueError:
+                    self._send_json({'error': "invalid JSON"}, status=400)
+                    return
+                if self.path != "/api/generate":
+                    self._send_json({'error': "not found"}, status=404)
+                    return
+                if data.get('model') not in server.models:
+                    self._send_json({'error': f"model '{data.get('model')}' not found"}, status=404)
+                    return
+
+                if not data.get('prompt'):
+                    # A request without a prompt only loads the model (Ollama's preload/keep_alive call)
+                    self._send_json({'model': data['model'], 'response': "", 'done': True, 'done_reason': "load"})
+                    return
+
+                with server._lock:
+                    server.requests += 1
+                # Like OLLAMA_NUM_PARALLEL: requests beyond `parallel` queue for a slot
+                with server._slots:
+                    options = data.get('options') or {}
+                    if data.get('format') == "json":
+                        tokens = server._json_tokens(data.get('prompt', ""))
+                    else:
+                        tokens = server._tokens(data.get('prompt', ""), int(options.get('num_predict', 128)))
+                    interval = 1.0 / server.token_rate if server.token_rate > 0 else 0.0
+                    prompt_tokens = len(data.get('prompt', "")) // 4 + 1
+                    context = list(data.get('context') or []) + list(range(prompt_tokens + len(tokens)))
+                    start = time.perf_counter()
+                    time.sleep(server.latency + (prompt_tokens / server.prompt_rate if server.prompt_rate > 0 else 0.0))
+
+                    final = {'model': data['model'], 'done': True, 'done_reason': "stop", 'context': context,
+                             'prompt_eval_count': prompt_tokens, 'eval_count': len(tokens)}
+                    if data.get('stream', True):
+                        self.send_response(200)
+                        self.send_header("Content-Type", "application/x-ndjson")
+                        self.send_header("Transfer-Encoding", "chunked")
+                        self.end_headers()
+                        for token in tokens:
+                            time.sleep(interval)
+                            self._write_chunk({'model': data['model'], 'response': token, 'done': False})
+                        final.update(response="", total_duration=int((time.perf_counter() - start) * 1e9))
+                        self._write_chunk(final)
+                        self.wfile.write(b"0\r\n\r\n")
+                    else:
+                        time.sleep(interval * len(tokens))
+                        final.update(response="".join(tokens), total_duration=int((time.perf_counter() - start) * 1e9))
+                        self._send_json(final)
+
+            def _write_chunk(self, payload):
+                line = json.dumps(payload).encode("utf-8") + b"\n"
+                self.wfile.write(f"{len(line):x}\r\n".encode("ascii") + line + b"\r\n")
+                self.wfile.flush()
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a fake Ollama server for benchmarks and load tests.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds before the first token")
+    parser.add_argument("--token-rate", type=float, default=200.0, help="tokens generated per second")
+    parser.add_argument("--prompt-rate", type=float, default=0.0, help="prompt tokens evaluated per second (0: free)")
+    parser.add_argument("--parallel", type=int, default=0, help="requests processed at once (0: unlimited)")
+    parser.add_argument("--response-tokens", type=int, default=120, help="upper bound on tokens per response")
+    parser.add_argument("--model", action="append", dest="models", help="model name to serve (repeatable)")
+    args = parser.parse_args()
+
+    server = FakeOllamaServer(args.host, args.port, args.latency, args.token_rate, args.response_tokens,
+                              models=args.models or ("llama3:8b",), prompt_rate=args.prompt_rate, parallel=args.parallel)
+    print(f"🦙 Fake Ollama listening on {server.url} "
+          f"(latency {args.latency}s, {args.token_rate} tokens/s)")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+simple_server.py wired for load testing.
+URL downloads are served from a local fixture file instead of the network,
+and Ollama is whatever OLLAMA_URLS or OLLAMA_BASE_URL points at (normally fake_ollama.py).
+Optionally Whisper is replaced by a CPU-bound stand-in with a fixed real-time
+factor, to find the HTTP/LLM saturation point on machines without a model.
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, 'src'))
+sys.path.insert(0, ROOT_DIR)
+
+
+def stub_downloader(fixture: str, download_seconds: float):
+    """Make every URL resolve to the fixture, after a simulated network delay"""
+    from offline.audio import probe_duration
+    from utils.video_downloader import video_downloader
+
+    info = {
+        'title': "Load test fixture",
+        'duration': round(probe_duration(fixture)),
+        'uploader': "load-test",
+        'view_count': 0,
+        'description': "",
+        'thumbnail': "",
+    }
+
+    def is_valid_url(url):
+        return url.startswith(("http://", "https://"))
+
+    def resolve_audio_stream(url):
+        time.sleep(download_seconds)
+        return fixture, {}, dict(info, url=url)
+
+    def download_with_info(url, audio_only=True, output_dir=None, max_duration=3600):
+        time.sleep(download_seconds)
+        path = os.path.join(output_dir, "fixture" + os.path.splitext(fixture)[1])
+        shutil.copyfile(fixture, path)
+        return path, dict(info, url=url)
+
+    video_downloader.is_valid_url = is_valid_url
+    video_downloader.resolve_audio_stream = resolve_audio_stream
+    video_downloader.download_with_info = download_with_info
+
+
+def wav_decoding_fallback():
+    """Decode WAV fixtures with the wave module when ffmpeg is not installed"""
+    import wave
+    from offline import processor
+    from offline.audio import ffmpeg_available, pcm16_to_float
+
+    if ffmpeg_available():
+        return
+
+    def load_pcm(path, sample_rate=16000):
+        with wave.open(path, "rb") as f:
+            if f.getsampwidth() != 2 or f.getnchannels() != 1 or f.getframerate() != sample_rate:
+                raise RuntimeError("Without ffmpeg only 16 kHz mono 16-bit WAV fixtures can be decoded")
+            return pcm16_to_float(f.readframes(f.getnframes()))
+
+    print("⚠️  ffmpeg not found: decoding WAV fixtures in Python, extraction timings are not representative")
+    processor.load_pcm = load_pcm
+
+
+def stub_transcription(realtime_factor: float):
+    """
+    Replace Whisper with a busy loop lasting realtime_factor x the audio length,
+    so CPU usage stays representative while no model is loaded.
+    """
+    import numpy as np
+    from offline.audio import SAMPLE_RATE
+    from offline.transcriber import parallel_transcriber
+    from offline.model_registry import whisper_registry
+    from run_benchmarks import SAMPLE_TRANSCRIPT
+
+    def burn(seconds):
+        deadline = time.perf_counter() + seconds
+        block = np.random.default_rng(0).random((64, 64))
+        while time.perf_counter() < deadline:
+            block @ block
+
+    def transcribe(audio, model_name=None, **options):
+        burn(len(audio) / SAMPLE_RATE * realtime_factor)
+        return SAMPLE_TRANSCRIPT * 5
+
+    def transcribe_stream(blocks, model_name=None, **options):
+        samples = 0
+        for block in blocks:
+            samples += len(block)
+        burn(samples / SAMPLE_RATE * realtime_factor)
+        return SAMPLE_TRANSCRIPT * 5
+
+    parallel_transcriber.transcribe = transcribe
+    parallel_transcriber.transcribe_stream = transcribe_stream
+    # Startup warm-up "loads" nothing, so the server reports ready at once
+    whisper_registry.get = lambda name=None: None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run simple_server.py with load-test stubs.")
+    parser.add_argument("--fixture", required=True, help="media file every URL 'downloads'")
+    parser.add_argument("--port", type=int, default=8013)
+    parser.add_argument("--download-seconds", type=float, default=0.5, help="simulated download time")
+    parser.add_argument("--fake-transcription", type=float, default=None, metavar="RTF",
+                        help="replace Whisper with a CPU burn of RTF x audio duration")
+    parser.add_argument("--keep-cache", action="store_true",
+                        help="keep the transcript cache (by default every request is transcribed)")
+    args = parser.parse_args()
+
+    if not args.keep_cache:
+        # A zero-byte budget evicts every transcript as soon as it is written
+        os.environ["TRANSCRIPT_CACHE_MAX_BYTES"] = "0"
+        os.environ["OLLAMA_CACHE_DB"] = ""
+        os.environ["OLLAMA_CACHE_MEMORY_ENTRIES"] = "0"
+
+    stub_downloader(os.path.abspath(args.fixture), args.download_seconds)
+    wav_decoding_fallback()
+    if args.fake_transcription is not None:
+        stub_transcription(args.fake_transcription)
+
+    import uvicorn
+    import simple_server
+    uvicorn.run(simple_server.app, host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+End-to-end load test for simple_server.py
+Starts a fake Ollama server and a stubbed analysis server, drives
+/analyze-video and /analyze-url at a configured concurrency or arrival rate,
+and reports throughput, tail latency, error rate and server CPU/RSS over time.
+
+    python benchmarks/load_test.py --concurrency 1,4,16,50 --requests 100
+    python benchmarks/load_test.py --rate 2 --duration 120 --url-fraction 0.5
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+import contextlib
+import threading
+import subprocess
+
+import httpx
+import numpy as np
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+
+from fake_ollama import FakeOllamaServer
+from run_benchmarks import synthetic_speech, write_wav
+
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+
+
+class ProcessSampler:
+    """
+    Samples CPU and RSS of a process and all its descendants from /proc,
+    so spawned transcription workers are included.
+    """
+
+    def __init__(self, pid: int, interval: float = 1.0):
+        self.pid = pid
+        self.interval = interval
+        self.samples = []  # (elapsed seconds, cpu percent, rss MB)
+        self.started = None  # perf_counter() when sampling began
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _tree(self):
+        children = {}
+        for name in os.listdir("/proc"):
+            if not name.isdigit():
+                continue
+            try:
+                with open(f"/proc/{name}/stat") as f:
+                    ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+            except (OSError, IndexError, ValueError):
+                continue
+            children.setdefault(ppid, []).append(int(name))
+        pids, stack = [], [self.pid]
+        while stack:
+            pid = stack.pop()
+            pids.append(pid)
+            stack.extend(children.get(pid, []))
+        return pids
+
+    def _read(self):
+        cpu_ticks, rss_pages = 0, 0
+        for pid in self._tree():
+            try:
+                with open(f"/proc/{pid}/stat") as f:
+                    fields = f.read().rsplit(")", 1)[1].split()
+                cpu_ticks += int(fields[11]) + int(fields[12])  # utime + stime
+                with open(f"/proc/{pid}/statm") as f:
+                    rss_pages += int(f.read().split()[1])
+            except (OSError, IndexError, ValueError):
+                continue
+        return cpu_ticks / CLOCK_TICKS, rss_pages * PAGE_SIZE / (1024 * 1024)
+
+    def _run(self):
+        last_cpu, last_time = self._read()[0], self.started
+        while not self._stop.wait(self.interval):
+            cpu, rss = self._read()
+            now = time.perf_counter()
+            self.samples.append((now - self.started, 100 * (cpu - last_cpu) / (now - last_time), rss))
+            last_cpu, last_time = cpu, now
+
+    def start(self):
+        self.started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def window(self, start: float, end: float):
+        return [sample for sample in self.samples if start <= sample[0] <= end]
+
+
+async def one_request(client: httpx.AsyncClient, fixture: bytes, fixture_name: str, url_fraction: float):
+    """Send one analysis request; returns (endpoint, latency, ok, error)"""
+    if random.random() < url_fraction:
+        endpoint = "/analyze-url"
+        kwargs = {'data': {'url': f"https://example.com/watch?v={random.getrandbits(32):08x}"}}
+    else:
+        endpoint = "/analyze-video"
+        kwargs = {'files': {'video': (fixture_name, fixture, "application/octet-stream")}}
+    start = time.perf_counter()
+    try:
+        response = await client.post(endpoint, **kwargs)
+        # The plain-text endpoints report failures in the body with status 200
+        ok = response.status_code == 200 and not response.text.lstrip().startswith("Error")
+        error = None if ok else f"{response.status_code}: {response.text.strip()[:120]}"
+    except httpx.HTTPError as e:
+        ok, error = False, repr(e)
+    return endpoint, time.perf_counter() - start, ok, error
+
+
+async def run_level(base_url: str, fixture_path: str, concurrency: int, requests: int, rate, duration,
+                    url_fraction: float, timeout: float):
+    """
+    Closed loop (no rate): `concurrency` clients send back-to-back requests.
+    Open loop (rate): Poisson arrivals at `rate`/s, with at most `concurrency` in flight.
+    """
+    with open(fixture_path, "rb") as f:
+        fixture = f.read()
+    name = os.path.basename(fixture_path)
+    results = []
+    slots = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        start = time.perf_counter()
+
+        def more():
+            if duration:
+                return time.perf_counter() - start < duration
+            return issued < requests
+
+        async def send():
+            async with slots:
+                results.append(await one_request(client, fixture, name, url_fraction))
+
+        issued = 0
+        if rate:
+            tasks = []
+            while more():
+                tasks.append(asyncio.ensure_future(send()))
+                issued += 1
+                await asyncio.sleep(random.expovariate(rate))
+            await asyncio.gather(*tasks)
+        else:
+            async def worker():
+                nonlocal issued
+                while more():
+                    issued += 1
+                    await send()
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    return results, elapsed
+
+
+def summarize(results, elapsed):
+    latencies = np.array([latency for _, latency, ok, _ in results if ok]) if results else np.array([])
+    errors = [error for _, _, ok, error in results if not ok]
+    summary = {
+        'requests': len(results),
+        'errors': len(errors),
+        'error_rate': len(errors) / len(results) if results else 0.0,
+        'throughput': (len(results) - len(errors)) / elapsed if elapsed else 0.0,  # successes per second
+        'elapsed': elapsed,
+        'sample_errors': sorted(set(errors))[:3],
+    }
+    for q in (50, 90, 95, 99):
+        summary[f'p{q}'] = float(np.percentile(latencies, q)) if len(latencies) else None
+    summary['max'] = float(latencies.max()) if len(latencies) else None
+    return summary
+
+
+def wait_until_ready(base_url: str, server: subprocess.Popen, timeout: float = 120):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"Server exited with code {server.returncode}")
+        try:
+            # 503 while the models are still loading
+            if httpx.get(f"{base_url}/ready", timeout=2).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError("Server did not become ready in time (see GET /ready)")
+
+
+def fmt(seconds):
+    return f"{seconds:8.2f}" if seconds is not None else "       -"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the analysis server with stubbed dependencies.")
+    parser.add_argument("--concurrency", default="1,4,16", help="comma-separated levels to sweep")
+    parser.add_argument("--requests", type=int, default=40, help="requests per level (closed loop)")
+    parser.add_argument("--rate", type=float, default=None, help="open-loop arrivals per second")
+    parser.add_argument("--duration", type=float, default=None, help="seconds per level instead of --requests")
+    parser.add_argument("--url-fraction", type=float, default=0.0, help="share of requests sent to /analyze-url")
+    parser.add_argument("--media", default=None, help="fixture media file (default: synthetic speech WAV)")
+    parser.add_argument("--media-seconds", type=float, default=30.0, help="length of the synthetic fixture")
+    parser.add_argument("--download-seconds", type=float, default=0.5, help="simulated download time")
+    parser.add_argument("--fake-transcription", type=float, default=None, metavar="RTF",
+                        help="replace Whisper with a CPU burn of RTF x audio duration")
+    parser.add_argument("--keep-cache", action="store_true", help="let repeated fixtures hit the caches")
+    parser.add_argument("--server-log", default=None, help="file for the server's output (default: discarded)")
+    parser.add_argument("--ollama-latency", type=float, default=0.2, help="fake Ollama first-token latency")
+    parser.add_argument("--ollama-token-rate", type=float, default=40.0, help="fake Ollama tokens per second")
+    parser.add_argument("--ollama-backends", type=int, default=1, help="number of fake Ollama servers (OLLAMA_URLS)")
+    parser.add_argument("--ollama-parallel", type=int, default=0,
+                        help="requests each fake Ollama processes at once, like OLLAMA_NUM_PARALLEL (0: unlimited)")
+    parser.add_argument("--port", type=int, default=8013)
+    parser.add_argument("--timeout", type=float, default=600.0, help="per-request timeout")
+    parser.add_argument("--sample-interval", type=float, default=1.0)
+    parser.add_argument("--output", default=None, help="write the full report as JSON here")
+    args = parser.parse_args()
+
+    print("🎬 Video AI Analyzer - Load Test")
+    print("=" * 50)
+    levels = [int(level) for level in args.concurrency.split(",")]
+    base_url = f"http://127.0.0.1:{args.port}"
+
+    with tempfile.TemporaryDirectory() as tmp, contextlib.ExitStack() as stack:
+        backends = [stack.enter_context(FakeOllamaServer(
+            latency=args.ollama_latency, token_rate=args.ollama_token_rate, parallel=args.ollama_parallel
+        )) for _ in range(args.ollama_backends)]
+        fixture = args.media
+        if fixture is None:
+            fixture = os.path.join(tmp, "fixture.wav")
+            write_wav(fixture, synthetic_speech(args.media_seconds))
+        for ollama in backends:
+            print(f"🦙 Fake Ollama at {ollama.url} (latency {args.ollama_latency}s, {args.ollama_token_rate:g} tokens/s)")
+
+        command = [sys.executable, os.path.join(BENCH_DIR, "load_server.py"), "--fixture", fixture,
+                   "--port", str(args.port), "--download-seconds", str(args.download_seconds)]
+        if args.fake_transcription is not None:
+            command += ["--fake-transcription", str(args.fake_transcription)]
+        if args.keep_cache:
+            command.append("--keep-cache")
+        env = dict(os.environ, OLLAMA_URLS=",".join(ollama.url for ollama in backends),
+                   WORKSPACE_ROOT=os.path.join(tmp, "workspaces"))
+        log = open(args.server_log, "w") if args.server_log else subprocess.DEVNULL
+        server = subprocess.Popen(command, env=env, stdout=log, stderr=subprocess.STDOUT)
+        sampler = None
+        report = {'levels': []}
+        try:
+            wait_until_ready(base_url, server)
+            print(f"🚀 Server ready at {base_url} (pid {server.pid})")
+            sampler = ProcessSampler(server.pid, args.sample_interval)
+            sampler.start()
+
+            print(f"\n{'conc':>5}{'reqs':>6}{'err%':>7}{'req/s':>8}{'p50 s':>9}{'p95 s':>9}{'p99 s':>9}"
+                  f"{'max s':>9}{'cpu% avg':>10}{'rss MB max':>11}")
+            print("-" * 83)
+            for level in levels:
+                level_start = time.perf_counter() - sampler.started
+                results, elapsed = asyncio.run(run_level(
+                    base_url, fixture, level, args.requests, args.rate, args.duration,
+                    args.url_fraction, args.timeout,
+                ))
+                window = sampler.window(level_start, level_start + elapsed + args.sample_interval)
+                summary = summarize(results, elapsed)
+                summary['concurrency'] = level
+                summary['cpu_percent_avg'] = float(np.mean([s[1] for s in window])) if window else None
+                summary['rss_mb_max'] = float(max(s[2] for s in window)) if window else None
+                report['levels'].append(summary)
+                print(f"{level:>5}{summary['requests']:>6}{summary['error_rate'] * 100:>6.1f}%"
+                      f"{summary['throughput']:>8.2f}{fmt(summary['p50'])} {fmt(summary['p95'])} "
+                      f"{fmt(summary['p99'])} {fmt(summary['max'])}"
+                      f"{summary['cpu_percent_avg'] or 0:>10.0f}{summary['rss_mb_max'] or 0:>11.0f}")
+                for error in summary['sample_errors']:
+                    print(f"      ❌ {error}")
+        finally:
+            if sampler:
+                sampler.stop()
+                report['resources'] = [{'t': round(t, 2), 'cpu_percent': round(cpu, 1), 'rss_mb': round(rss, 1)}
+                                       for t, cpu, rss in sampler.samples]
+            server.terminate()
+            try:
+                server.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                server.kill()
+            if args.server_log:
+                log.close()
+
+    best = max(report['levels'], key=lambda level: level['throughput'], default=None)
+    if best and len(report['levels']) > 1:
+        # Past the saturation point extra concurrency only adds queueing delay
+        print(f"\n📈 Peak throughput {best['throughput']:.2f} req/s at concurrency {best['concurrency']}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
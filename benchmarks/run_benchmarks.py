@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Per-stage micro-benchmarks for Video AI Analyzer
+Times audio extraction, Whisper transcription on synthetic speech-like audio,
+each analyzer and result formatting against a local fake Ollama server, then
+compares p50/p95 latency with a saved baseline.
+
+    python benchmarks/run_benchmarks.py                  # run and compare
+    python benchmarks/run_benchmarks.py --save-baseline  # record a new baseline
+"""
+
+import os
+import sys
+import json
+import time
+import wave
+import argparse
+import platform
+import tempfile
+
+import numpy as np
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(BENCH_DIR), 'src'))
+sys.path.insert(0, BENCH_DIR)
+
+from fake_ollama import FakeOllamaServer
+
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+
+SAMPLE_TRANSCRIPT = (
+    "Welcome to this tutorial on machine learning and artificial intelligence. "
+    "Today we'll cover the basics of neural networks, how they work, and their applications in real-world scenarios. "
+    "We'll start with the fundamentals of deep learning, including backpropagation and gradient descent. "
+    "Then we'll explore practical applications like image recognition, natural language processing, and recommendation systems. "
+)
+
+
+def synthetic_speech(seconds: float, sample_rate: int = 16000, seed: int = 0) -> np.ndarray:
+    """
+    Speech-like test signal: voiced syllables with a wandering pitch and a few
+    harmonics, grouped into words and phrases separated by pauses, over a low
+    noise floor. Gives the chunker real silences to cut at.
+    """
+    rng = np.random.default_rng(seed)
+    total = int(seconds * sample_rate)
+    audio = rng.normal(0, 0.003, total).astype(np.float32)
+    pos = 0
+    while pos < total:
+        for _ in range(rng.integers(3, 9)):  # words per phrase
+            for _ in range(rng.integers(1, 4)):  # syllables per word
+                length = int(rng.uniform(0.12, 0.28) * sample_rate)
+                if pos + length >= total:
+                    return audio
+                t = np.arange(length) / sample_rate
+                pitch = rng.uniform(100, 220) * (1 + 0.05 * np.sin(2 * np.pi * rng.uniform(2, 5) * t))
+                phase = 2 * np.pi * np.cumsum(pitch) / sample_rate
+                voiced = sum(np.sin(k * phase) / k for k in range(1, 5))
+                audio[pos:pos + length] += 0.25 * np.hanning(length) * voiced
+                pos += length
+            pos += int(rng.uniform(0.04, 0.12) * sample_rate)  # gap between words
+        pos += int(rng.uniform(0.3, 0.9) * sample_rate)  # pause between phrases
+    return audio
+
+
+def write_wav(path: str, samples: np.ndarray, sample_rate: int = 16000):
+    pcm = (np.clip(samples, -1, 1) * 32767).astype("<i2")
+    with wave.open(path, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes(pcm.tobytes())
+
+
+def measure(func, iterations: int, warmup: int = 1) -> dict:
+    """Call func repeatedly and summarize its latency distribution"""
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    samples = np.array(samples)
+    return {
+        'iterations': iterations,
+        'p50': float(np.percentile(samples, 50)),
+        'p95': float(np.percentile(samples, 95)),
+        'mean': float(samples.mean()),
+        'throughput': iterations / float(samples.sum()),  # operations per second
+    }
+
+
+def run_suite(args, server: FakeOllamaServer) -> dict:
+    # Imported only now so the clients pick up the fake server and a disabled cache
+    from offline import audio as audio_module
+    from offline.transcriber import split_audio, merge_transcripts, ParallelTranscriber
+    from analyzer.summarizer import Summarizer
+    from analyzer.study_guide import StudyGuide
+    from analyzer.topic_recommender import TopicRecommender
+    from analyzer.quiz_generator import QuizGenerator
+    from analyzer.pipeline import run_analysis
+    from ai.async_client import async_ollama_client
+    from analyzer.results import build_result
+
+    results = {}
+    selected = set(args.stages.split(",")) if args.stages else None
+
+    def bench(name, func, iterations=args.iterations, **extra):
+        if selected and not any(name.startswith(prefix) for prefix in selected):
+            return
+        print(f"⏱️  {name} ...", flush=True)
+        try:
+            results[name] = dict(measure(func, iterations, warmup=args.warmup), **extra)
+        except Exception as e:
+            print(f"   ⚠️ skipped: {e}")
+
+    speech = synthetic_speech(args.audio_seconds)
+    transcript = SAMPLE_TRANSCRIPT * args.transcript_repeat
+
+    with tempfile.TemporaryDirectory() as tmp:
+        wav_path = os.path.join(tmp, "speech.wav")
+        write_wav(wav_path, speech)
+        if audio_module.ffmpeg_available():
+            bench("audio.extract", lambda: audio_module.load_pcm(wav_path), audio_seconds=args.audio_seconds)
+        else:
+            print("⏭️  audio.extract: ffmpeg not found")
+
+    bench("transcriber.split", lambda: split_audio(speech, chunk_seconds=30, overlap_seconds=1),
+          audio_seconds=args.audio_seconds)
+    words = transcript.split()
+    pieces = [" ".join(words[i:i + 120]) for i in range(0, len(words), 110)]
+    bench("transcriber.merge", lambda: merge_transcripts(pieces))
+
+    try:
+        import whisper  # noqa: F401
+        transcriber = ParallelTranscriber(workers=args.whisper_workers, chunk_seconds=30)
+        bench("transcriber.whisper", lambda: transcriber.transcribe(speech, args.whisper_model),
+              iterations=args.whisper_iterations, audio_seconds=args.audio_seconds, model=args.whisper_model)
+        transcriber.shutdown()
+    except ImportError:
+        print("⏭️  transcriber.whisper: openai-whisper not installed")
+
+    summarizer, study_guide = Summarizer(), StudyGuide()
+    topic_recommender, quiz_generator = TopicRecommender(), QuizGenerator()
+    summary = summarizer.summarize(transcript)
+    guide = study_guide.create_guide(summary)
+    if server.requests == 0:
+        print("⚠️ The analyzers never reached the fake Ollama server; results measure the fallbacks")
+
+    bench("llm.summarizer", lambda: summarizer.summarize(transcript))
+    bench("llm.study_guide", lambda: study_guide.create_guide(summary))
+    bench("llm.topic_recommender", lambda: topic_recommender.recommend_topics(transcript))
+    bench("llm.quiz_generator", lambda: quiz_generator.generate_quizzes(guide))
+    bench("llm.pipeline", lambda: async_ollama_client.run(run_analysis(transcript)))
+    bench("llm.combined", lambda: async_ollama_client.run(run_analysis(transcript, mode="combined")))
+
+    analysis = async_ollama_client.run(run_analysis(transcript))
+    result = build_result(transcript, analysis, {'title': "Benchmark", 'uploader': "bench", 'duration': 60, 'url': ""})
+    bench("format.text", result.to_text, iterations=args.iterations * 50)
+    bench("format.json", result.to_json, iterations=args.iterations * 50)
+    bench("format.json_full", lambda: result.to_json(result.ALL_FIELDS), iterations=args.iterations * 50)
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float, min_delta: float = 0.001) -> list:
+    """
+    Print a table against the baseline and return the stages that regressed.
+    A stage regresses when its p95 grows by more than `tolerance` and by more
+    than `min_delta` seconds, so timer noise on sub-millisecond stages is ignored.
+    """
+    regressions = []
+    print(f"\n{'stage':<24}{'p50 ms':>10}{'p95 ms':>10}{'ops/s':>10}{'base p95':>10}{'change':>9}")
+    print("-" * 73)
+    for name, stats in results.items():
+        line = f"{name:<24}{stats['p50'] * 1000:>10.2f}{stats['p95'] * 1000:>10.2f}{stats['throughput']:>10.1f}"
+        base = baseline.get(name)
+        if base:
+            change = stats['p95'] / base['p95'] - 1 if base['p95'] else 0.0
+            regressed = change > tolerance and stats['p95'] - base['p95'] > min_delta
+            line += f"{base['p95'] * 1000:>10.2f}{change:>+8.0%}{' ❌' if regressed else ''}"
+            if regressed:
+                regressions.append(name)
+        print(line)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-stage micro-benchmarks against a fake Ollama server.")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--stages", default=None, help="comma-separated stage prefixes, e.g. llm,format")
+    parser.add_argument("--latency", type=float, default=0.02, help="fake Ollama first-token latency (s)")
+    parser.add_argument("--token-rate", type=float, default=2000.0, help="fake Ollama tokens per second")
+    parser.add_argument("--prompt-rate", type=float, default=0.0,
+                        help="fake Ollama prompt-eval tokens per second (0: free); CPU hosts manage ~50-200")
+    parser.add_argument("--audio-seconds", type=float, default=60.0)
+    parser.add_argument("--transcript-repeat", type=int, default=20, help="copies of the sample transcript")
+    parser.add_argument("--whisper-model", default="tiny")
+    parser.add_argument("--whisper-workers", type=int, default=1)
+    parser.add_argument("--whisper-iterations", type=int, default=3)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="write these results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed p95 slowdown before failing")
+    parser.add_argument("--output", default=None, help="also write results as JSON here")
+    args = parser.parse_args()
+
+    print("🎬 Video AI Analyzer - Stage Benchmarks")
+    print("=" * 50)
+    with FakeOllamaServer(latency=args.latency, token_rate=args.token_rate, prompt_rate=args.prompt_rate) as server:
+        os.environ["OLLAMA_BASE_URL"] = server.url
+        os.environ["OLLAMA_CACHE_DB"] = ""
+        os.environ["OLLAMA_CACHE_MEMORY_ENTRIES"] = "0"
+        print(f"🦙 Fake Ollama at {server.url} (latency {args.latency}s, {args.token_rate:g} tokens/s)")
+        results = run_suite(args, server)
+
+    baseline = {}
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f).get('stages', {})
+    regressions = compare(results, baseline, args.tolerance)
+
+    report = {
+        'machine': {'platform': platform.platform(), 'python': platform.python_version(), 'cpus': os.cpu_count()},
+        'settings': {'latency': args.latency, 'token_rate': args.token_rate, 'prompt_rate': args.prompt_rate,
+                     'audio_seconds': args.audio_seconds},
+        'stages': results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Baseline saved to {args.baseline}")
+    elif not baseline:
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline to record one.")
+    elif regressions:
+        print(f"\n❌ p95 regressed more than {args.tolerance:.0%} in: {', '.join(regressions)}")
+        sys.exit(1)
+    else:
+        print("\n✅ No regressions against the baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,26 +5,33 @@ Simple working server with URL support
 
 import sys
 import os
+from typing import Optional
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
-from fastapi import FastAPI, File, UploadFile, Request, Form
+from fastapi import FastAPI, Request, Form, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import PlainTextResponse, HTMLResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-import shutil
-import os
 
 # Import analyzer components
-from analyzer.summarizer import Summarizer
-from analyzer.study_guide import StudyGuide
-from analyzer.topic_recommender import TopicRecommender
-from analyzer.quiz_generator import QuizGenerator
-from offline.processor import VideoProcessor
+from analyzer.pipeline import run_analysis
+from analyzer.results import build_result
+from offline.url_pipeline import resolve_url, transcribe_url
+from ai.model_policy import model_policy
+from utils.workspace import workspace_manager
+from utils.json_api import requested_fields, json_response
+from utils.metrics import install_metrics
+from api.routes import router as analysis_router, lifespan, analysis_stream_response
+from jobs.manager import job_manager
+from jobs.routes import router as jobs_router, submit_job
+from jobs.tasks import analyze_url_job
 
 # Import video downloader
 from utils.video_downloader import video_downloader
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
+install_metrics(app)
 
 # Setup templates and static files
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -37,6 +44,9 @@ os.makedirs(templates_dir, exist_ok=True)
 app.mount("/static", StaticFiles(directory=static_dir), name="static")
 templates = Jinja2Templates(directory=templates_dir)
 
+app.include_router(analysis_router)
+app.include_router(jobs_router)
+
 @app.get("/", response_class=HTMLResponse)
 async def home(request: Request):
     return templates.TemplateResponse("index.html", {"request": request})
@@ -53,31 +63,21 @@ async def analyze_url(url: str = Form(...)):
         if not video_downloader.is_valid_url(url):
             return "Error: Invalid or unsupported video URL. Please provide a valid YouTube, Vimeo, or other supported video URL."
         
-        # Get video info
-        video_info = video_downloader.get_video_info(url)
-        if not video_info:
-            return "Error: Could not retrieve video information. Please check the URL and try again."
-        
-        print(f"📺 Analyzing video: {video_info['title']}")
-        print(f"👤 Uploader: {video_info['uploader']}")
-        print(f"⏱️ Duration: {video_info['duration']} seconds")
-        
-        # Download audio for faster processing
-        audio_path = video_downloader.download_audio_only(url)
-        if not audio_path:
-            return "Error: Failed to download video audio. Please try again or check your internet connection."
-        
+        # Metadata first: the models are chosen for the video's length
+        stream, duration = await run_in_threadpool(resolve_url, url)
+        workspace = workspace_manager.create()
+        models = model_policy.admit(duration, job_manager.backlog())
         try:
-            # Initialize analysis components
-            processor = VideoProcessor(audio_path)
-            summarizer = Summarizer()
-            study_guide = StudyGuide()
-            topic_recommender = TopicRecommender()
-            quiz_generator = QuizGenerator()
-            
-            # Process the audio
+            # Fetch and transcribe the audio, overlapping the download with Whisper
             print("🎬 Processing audio...")
-            transcript = processor.transcribe_audio()
+            transcript, video_info = await run_in_threadpool(transcribe_url, url, workspace,
+                                                             model_name=models.whisper_model, stream=stream)
+            if video_info is None:
+                return "Error: Failed to download video audio. Please try again or check your internet connection."
+            
+            print(f"📺 Analyzing video: {video_info['title']}")
+            print(f"👤 Uploader: {video_info['uploader']}")
+            print(f"⏱️ Duration: {video_info['duration']} seconds")
             
             if not transcript or len(transcript.strip()) < 20:
                 return "Error: Could not transcribe audio from the video. The video might not have clear speech or audio."
@@ -86,40 +86,11 @@ async def analyze_url(url: str = Form(...)):
             
             # Generate analysis results
             print("📊 Generating AI analysis...")
-            summary = summarizer.summarize(transcript)
-            guide = study_guide.create_guide(summary)
-            topics = topic_recommender.recommend_topics(transcript)
-            quizzes = quiz_generator.generate_quizzes(guide)
+            # Topics run alongside the summary -> guide -> quiz chain
+            analysis = await run_analysis(transcript, llm_model=models.llm_model)
             
             # Format the results with video info
-            results = f"""
-🎯 VIDEO ANALYSIS RESULTS
-========================
-
-📺 VIDEO INFORMATION:
-Title: {video_info['title']}
-Uploader: {video_info['uploader']}
-Duration: {video_info['duration']} seconds
-URL: {url}
-
-📝 TRANSCRIPT:
-{transcript}
-
-📊 SUMMARY:
-{summary}
-
-📚 STUDY GUIDE:
-{guide}
-
-🎯 RECOMMENDED TOPICS:
-{topics}
-
-❓ QUIZZES:
-{quizzes}
-
-========================
-Analysis completed successfully!
-"""
+            results = build_result(transcript, analysis, video_info).to_text()
             
             print("✅ Analysis completed!")
             return results
@@ -129,72 +100,80 @@ Analysis completed successfully!
             return f"Error processing video: {str(e)}"
         finally:
             # Clean up downloaded file
-            video_downloader.cleanup_file(audio_path)
+            model_policy.release(models)
+            workspace.cleanup()
         
     except Exception as e:
         print(f"❌ Error analyzing URL: {e}")
         return f"Error analyzing video URL: {str(e)}"
 
-@app.post("/analyze-video", response_class=PlainTextResponse)
-async def analyze_video(video: UploadFile = File(...)):
-    temp_video_path = f"temp_{video.filename}"
-    with open(temp_video_path, "wb") as buffer:
-        shutil.copyfileobj(video.file, buffer)
-
+@app.post("/api/analyze-url")
+async def analyze_url_json(url: str = Form(...), fields: Optional[str] = None):
+    """Analyze a video URL and return JSON with only the requested fields"""
+    fields = requested_fields(fields)
+    if not video_downloader.is_valid_url(url):
+        raise HTTPException(status_code=400, detail="Invalid or unsupported video URL")
+    stream, duration = await run_in_threadpool(resolve_url, url)
+    workspace = workspace_manager.create()
+    models = model_policy.admit(duration, job_manager.backlog())
     try:
-        # Initialize analysis components
-        processor = VideoProcessor(temp_video_path)
-        summarizer = Summarizer()
-        study_guide = StudyGuide()
-        topic_recommender = TopicRecommender()
-        quiz_generator = QuizGenerator()
-        
-        # Process the video
-        print("🎬 Processing video...")
-        transcript = processor.process_video()
-        print("✅ Transcription completed!")
-        
-        # Generate analysis results
-        print("📊 Generating analysis...")
-        summary = summarizer.summarize(transcript)
-        guide = study_guide.create_guide(summary)
-        topics = topic_recommender.recommend_topics(transcript)
-        quizzes = quiz_generator.generate_quizzes(guide)
-        
-        # Format the results
-        results = f"""
-🎯 VIDEO ANALYSIS RESULTS
-========================
-
-📝 TRANSCRIPT:
-{transcript}
-
-📊 SUMMARY:
-{summary}
+        transcript, video_info = await run_in_threadpool(transcribe_url, url, workspace,
+                                                         model_name=models.whisper_model, stream=stream)
+        if video_info is None:
+            raise HTTPException(status_code=502, detail="Failed to download video audio")
+        if not transcript or len(transcript.strip()) < 20:
+            raise HTTPException(status_code=422, detail="Could not transcribe audio from the video")
+        analysis = await run_analysis(transcript, llm_model=models.llm_model)
+        return json_response(build_result(transcript, analysis, video_info), fields)
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"❌ Error analyzing URL: {e}")
+        raise HTTPException(status_code=500, detail=f"Error analyzing video URL: {str(e)}")
+    finally:
+        model_policy.release(models)
+        workspace.cleanup()
 
-📚 STUDY GUIDE:
-{guide}
+@app.post("/analyze-url/stream")
+async def analyze_url_stream(url: str = Form(...)):
+    """Analyze video from URL, streaming progress and LLM tokens as server-sent events"""
+    if not video_downloader.is_valid_url(url):
+        return PlainTextResponse("Error: Invalid or unsupported video URL. Please provide a valid YouTube, Vimeo, or other supported video URL.", status_code=400)
 
-🎯 RECOMMENDED TOPICS:
-{topics}
+    stream, duration = await run_in_threadpool(resolve_url, url)
+    workspace = workspace_manager.create()
+    try:
+        models = model_policy.admit(duration, job_manager.backlog())
+    except BaseException:
+        workspace.cleanup()
+        raise
 
-❓ QUIZZES:
-{quizzes}
+    def finish():
+        model_policy.release(models)
+        workspace.cleanup()
 
-========================
-Analysis completed successfully!
-"""
-        
-        print("✅ Analysis completed!")
-        return results
-        
-    except Exception as e:
-        print(f"❌ Error during analysis: {e}")
-        return f"Error processing video: {str(e)}"
-    finally:
-        # Clean up temporary file
-        if os.path.exists(temp_video_path):
-            os.remove(temp_video_path)
+    async def transcribe():
+        try:
+            transcript, video_info = await run_in_threadpool(transcribe_url, url, workspace,
+                                                             model_name=models.whisper_model, stream=stream)
+            if video_info is None:
+                raise Exception("Failed to download video audio. Please try again or check your internet connection.")
+            return transcript
+        finally:
+            workspace.cleanup()
+
+    info = stream[2] if stream else {'url': url}
+    return analysis_stream_response(transcribe, finish, info=info, llm_model=models.llm_model)
+
+@app.post("/jobs/url")
+async def submit_url_job(url: str = Form(...)):
+    """Queue a video URL for analysis and return its job ID immediately"""
+    if not video_downloader.is_valid_url(url):
+        raise HTTPException(status_code=400, detail="Invalid or unsupported video URL")
+    # The duration sets the job's priority; the job reuses the resolved stream instead of extracting again
+    stream, duration = await run_in_threadpool(resolve_url, url)
+    info = dict(stream[2]) if stream else {'url': url}
+    return submit_job("url", lambda job: analyze_url_job(job, url, stream), duration=duration, info=info)
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,225 @@
+import os
+import json
+import time
+import asyncio
+from typing import Optional, Dict, Any, Callable, List
+
+import httpx
+
+from ai.ollama_client import OllamaClient, OllamaBackend, configured_urls
+from ai.tuning import InferenceTuner, inference_tuner
+from utils.metrics import ollama_request_seconds
+
+
+class AsyncOllamaClient(OllamaClient):
+    """
+    Native asyncio Ollama client.
+    Shares prompt building, caching and fallbacks with OllamaClient, but talks to
+    Ollama over pooled keep-alive connections and never blocks the event loop.
+    Each backend gets `max_concurrency` request slots, so throughput grows with
+    the number of backends.
+    """
+
+    def __init__(self, model: str = "llama3:8b", base_url: str = "http://localhost:11434",
+                 max_concurrency: int = 4, timeout: float = 120.0, keep_alive: Optional[str] = None,
+                 base_urls: Optional[List[str]] = None, tuner: Optional[InferenceTuner] = None):
+        super().__init__(model, base_url, keep_alive, timeout, base_urls, tuner)
+        self.max_concurrency = max_concurrency
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._loop = None
+        self._closer: Optional[asyncio.Task] = None
+
+    def _ensure_client(self):
+        """Create the HTTP pool and limiters for the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            if self._client is not None and self._loop.is_running():
+                # Connections belong to the loop that opened them, so close them there
+                asyncio.run_coroutine_threadsafe(self._client.aclose(), self._loop)
+            connections = self.max_concurrency * len(self.pool.backends)
+            self._client = httpx.AsyncClient(
+                timeout=self._timeout(),
+                limits=httpx.Limits(
+                    max_connections=connections,
+                    max_keepalive_connections=connections,
+                    keepalive_expiry=60,
+                ),
+            )
+            self._semaphores = {}
+            self._loop = loop
+            self._closer = loop.create_task(self._close_on_shutdown(self._client))
+
+    @staticmethod
+    async def _close_on_shutdown(client: httpx.AsyncClient):
+        """
+        Waits until cancelled, then closes client. asyncio.run() cancels the
+        tasks still pending before it closes its loop, so a pool opened under a
+        plain asyncio.run() is closed on that loop instead of leaking its sockets.
+        """
+        try:
+            await asyncio.get_running_loop().create_future()
+        finally:
+            await client.aclose()
+
+    def _slot(self, backend: OllamaBackend) -> asyncio.Semaphore:
+        if backend.url not in self._semaphores:
+            self._semaphores[backend.url] = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphores[backend.url]
+
+    def _concurrency(self) -> float:
+        # Requests queued for a slot are not running on Ollama yet
+        return min(self.pool.load() + 1, self.max_concurrency)
+
+    def _timeout(self, timeout: Optional[float] = None) -> httpx.Timeout:
+        return httpx.Timeout(timeout or self.timeout, connect=self.connect_timeout)
+
+    async def _make_request_async(self, endpoint: str, data: Dict[str, Any], timeout: Optional[float] = None,
+                                  backend: Optional[OllamaBackend] = None,
+                                  affinity: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Make a request to the Ollama API, waiting for a free slot on the chosen backend first.
+        Returns None at once, without queueing for a slot, if no backend's circuit lets it through.
+        """
+        backend = self._acquire(backend, affinity)
+        if backend is None:
+            return None
+        self._ensure_client()
+        seconds, error = None, None
+        try:
+            async with self._slot(backend):
+                start = time.perf_counter()  # backend latency, not time spent queueing for a slot
+                response = await self._client.post(
+                    f"{backend.url}/api/{endpoint}", json=data, timeout=self._timeout(timeout)
+                )
+                response.raise_for_status()
+                result = response.json()
+                seconds = time.perf_counter() - start
+                return result
+        except (httpx.HTTPError, ValueError) as e:
+            self.logger.error(f"Ollama request to {backend.url} failed: {e!r}")
+            error = e
+            return None
+        finally:
+            backend.finished(seconds, error)
+
+    async def _stream_request_async(self, data: Dict[str, Any], on_token: Callable[[str], Any],
+                                    timeout: Optional[float] = None,
+                                    affinity: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Stream /api/generate, passing each token to on_token as it arrives"""
+        backend = self._acquire(None, affinity)
+        if backend is None:
+            return None
+        self._ensure_client()
+        data = dict(data, stream=True)
+        pieces = []
+        seconds, error = None, None
+        try:
+            async with self._slot(backend):
+                start = time.perf_counter()
+                async with self._client.stream(
+                    "POST", f"{backend.url}/api/generate", json=data, timeout=self._timeout(timeout)
+                ) as response:
+                    response.raise_for_status()
+                    async for line in response.aiter_lines():
+                        if not line:
+                            continue
+                        chunk = json.loads(line)
+                        token = chunk.get("response", "")
+                        if token:
+                            pieces.append(token)
+                            on_token(token)
+                        if chunk.get("done"):
+                            seconds = time.perf_counter() - start
+                            return dict(chunk, response="".join(pieces))
+                # A cut-off answer must not be cached as if it were complete
+                raise httpx.RemoteProtocolError("stream ended before Ollama reported done")
+        except (httpx.HTTPError, ValueError) as e:
+            self.logger.error(f"Ollama streaming request to {backend.url} failed: {e!r}")
+            error = e
+            return None
+        finally:
+            backend.finished(seconds, error)
+
+    async def generate_async(self, prompt: str, context: str = "", max_tokens: int = 500,
+                             timeout: Optional[float] = None,
+                             on_token: Optional[Callable[[str], Any]] = None,
+                             format: Optional[str] = None, options: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Async counterpart of generate() with a per-call timeout.
+        When on_token is given the response is streamed and each token is passed
+        to it as Ollama produces it.
+        """
+        data = self._build_request(prompt, context, max_tokens, format, options)
+
+        # Check cache first
+        cache_key = self._cache_key(data)
+        cached_result = self.cache.get(cache_key)
+        if cached_result:
+            if on_token:
+                on_token(cached_result)
+            return cached_result
+
+        self._tune(data, max_tokens, options)
+        start = time.perf_counter()
+        if on_token:
+            result = await self._stream_request_async(data, on_token, timeout)
+        else:
+            result = await self._make_request_async("generate", data, timeout)
+        ollama_request_seconds.observe(time.perf_counter() - start, model=data["model"],
+                                       outcome="ok" if result else "error")
+
+        response_text = self._response_text(result, data, cache_key)
+        if response_text is not None:
+            return response_text
+
+        # Fallback to simple text processing if Ollama fails
+        return self._fallback_processing(prompt, context)
+
+    async def load_model_async(self, model: Optional[str] = None, timeout: Optional[float] = None) -> bool:
+        """
+        Load a model into every backend's memory (or extend its keep_alive)
+        without generating anything: a generate request with no prompt.
+        True if at least one backend has it loaded.
+        """
+        data = {"model": model or self.model, "stream": False}
+        if self.tuner is not None:
+            # Load with the options requests will use, or the first request reloads the model
+            data["options"] = self.tuner.resident_options(data["model"])
+        if self.keep_alive is not None:
+            data["keep_alive"] = self.keep_alive
+        results = await asyncio.gather(*(
+            self._make_request_async("generate", data, timeout, backend=backend) for backend in self.pool.backends
+        ))
+        return any(result is not None for result in results)
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            if self._closer is not None:
+                self._closer.cancel()
+            self._client = None
+            self._loop = None
+            self._closer = None
+
+    def run(self, coro):
+        """
+        asyncio.run() for command-line entry points: the connection pool is
+        closed before the event loop is, so no connections outlive it.
+        """
+        async def main():
+            try:
+                return await coro
+            finally:
+                await self.aclose()
+        return asyncio.run(main())
+
+
+# Global async client instance
+async_ollama_client = AsyncOllamaClient(
+    base_urls=configured_urls(),
+    max_concurrency=int(os.environ.get("OLLAMA_MAX_CONCURRENCY", "4")),
+    timeout=float(os.environ.get("OLLAMA_TIMEOUT", "120")),
+    keep_alive=os.environ.get("OLLAMA_KEEP_ALIVE", "30m"),
+    tuner=inference_tuner,
+)
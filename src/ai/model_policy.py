@@ -0,0 +1,205 @@
+import os
+import logging
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from ai.ollama_client import ollama_client
+from utils.metrics import metrics
+
+# Seconds of Whisper inference per second of audio on a typical CPU; refined from observations
+DEFAULT_WHISPER_RTF = {'tiny': 0.05, 'base': 0.1, 'small': 0.3, 'medium': 0.8, 'large': 1.6}
+# Seconds for a full four-stage analysis with an unfamiliar LLM, until one has been measured
+DEFAULT_ANALYSIS_SECONDS = 60.0
+
+
+class ModelChoice:
+    """Models picked for one job and the turnaround the policy expects"""
+
+    def __init__(self, whisper_model: str, llm_model: str, predicted_seconds: float, degraded: bool):
+        self.whisper_model = whisper_model
+        self.llm_model = llm_model
+        self.predicted_seconds = predicted_seconds
+        self.degraded = degraded
+        self.request_id: Optional[int] = None  # set while admitted as a synchronous request
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            'whisper_model': self.whisper_model,
+            'llm_model': self.llm_model,
+            'predicted_seconds': round(self.predicted_seconds, 1),
+            'degraded': self.degraded,
+        }
+
+
+class ModelPolicy:
+    """
+    Picks the Whisper and LLM model for each job from its media duration, the
+    work already queued and a turnaround target.
+
+    Both ladders are ordered best-first. The best pair whose predicted
+    turnaround (own work plus the backlog spread over the workers, as if it ran
+    on the same pair) fits the target wins; if none fits, the fastest pair is
+    used. Moving back up a tier needs `upgrade_margin` headroom, so the choice
+    does not flap around the target. Speed estimates start from defaults and
+    follow measured timings with an exponentially weighted average.
+
+    Only models that run get measured, so every `explore_every`-th degraded
+    choice goes one tier up instead; otherwise a pessimistic default would
+    keep a faster-than-expected model from ever being picked.
+
+    The backlog of background jobs is passed in by the caller as
+    (jobs, media seconds); synchronous requests are tracked by admit/release.
+    """
+
+    def __init__(self, whisper_ladder: List[str], llm_ladder: List[str], target_seconds: float = 300.0,
+                 workers: int = 1, adaptive: bool = False, upgrade_margin: float = 0.8, smoothing: float = 0.3,
+                 explore_every: int = 10):
+        self.whisper_ladder = whisper_ladder
+        self.llm_ladder = llm_ladder
+        self.target_seconds = target_seconds
+        self.workers = max(1, workers)
+        self.adaptive = adaptive
+        self.upgrade_margin = upgrade_margin
+        self.smoothing = smoothing
+        self.explore_every = explore_every  # 0 disables exploration
+        self.logger = logging.getLogger(__name__)
+        self.whisper_rtf = {name: DEFAULT_WHISPER_RTF.get(name.split('.')[0], 0.5) for name in whisper_ladder}
+        # Until measured, assume each step down the LLM ladder is somewhat faster
+        self.analysis_seconds = {name: DEFAULT_ANALYSIS_SECONDS * 0.6 ** i for i, name in enumerate(llm_ladder)}
+        self._inflight: Dict[int, float] = {}  # synchronous requests being served -> media seconds
+        self._next_id = 0
+        self._last_rank = 0
+        self._degraded_choices = 0
+        self._lock = threading.Lock()
+
+    def _pairs(self) -> List[Tuple[str, str]]:
+        """All model pairs, best first: one tier down on either ladder costs the same"""
+        pairs = [(w, l) for w in range(len(self.whisper_ladder)) for l in range(len(self.llm_ladder))]
+        pairs.sort(key=lambda pair: (pair[0] + pair[1], pair[0]))
+        return [(self.whisper_ladder[w], self.llm_ladder[l]) for w, l in pairs]
+
+    def _job_seconds(self, whisper_model: str, llm_model: str, duration: float) -> float:
+        return duration * self.whisper_rtf[whisper_model] + self.analysis_seconds[llm_model]
+
+    def backlog(self, jobs: Tuple[int, float] = (0, 0.0)) -> Tuple[int, float]:
+        """The caller's queued/running jobs plus the synchronous requests being served"""
+        count, media = jobs
+        with self._lock:
+            count += len(self._inflight)
+            media += sum(self._inflight.values())
+        return count, media
+
+    def choose(self, duration: float, waited: float = 0.0, backlog: Tuple[int, float] = (0, 0.0)) -> ModelChoice:
+        """
+        Pick models for a job with `duration` seconds of media that has already
+        waited `waited` seconds, behind `backlog` (jobs, media seconds) of background jobs
+        """
+        best = (self.whisper_ladder[0], self.llm_ladder[0])
+        if not self.adaptive:
+            return ModelChoice(best[0], best[1], self._job_seconds(*best, duration), False)
+
+        jobs_ahead, media_ahead = self.backlog(backlog)
+        budget = self.target_seconds - waited
+        pairs = self._pairs()
+        predictions = []
+        for whisper_model, llm_model in pairs:
+            backlog_seconds = (media_ahead * self.whisper_rtf[whisper_model]
+                               + jobs_ahead * self.analysis_seconds[llm_model]) / self.workers
+            predictions.append(self._job_seconds(whisper_model, llm_model, duration) + backlog_seconds)
+
+        with self._lock:
+            rank = len(pairs) - 1  # nothing fits: take the fastest pair
+            for i, predicted in enumerate(predictions):
+                # Tiers above the current one must fit with room to spare
+                limit = budget * self.upgrade_margin if i < self._last_rank else budget
+                if predicted <= limit:
+                    rank = i
+                    break
+            if rank != self._last_rank:
+                direction = "⬇️ Degrading" if rank > self._last_rank else "⬆️ Restoring"
+                print(f"{direction} models to Whisper {pairs[rank][0]} / {pairs[rank][1]} "
+                      f"({jobs_ahead} jobs ahead, {predictions[rank]:.0f}s predicted, target {self.target_seconds:.0f}s)")
+            self._last_rank = rank
+            if rank > 0 and self.explore_every > 0:
+                self._degraded_choices += 1
+                if self._degraded_choices % self.explore_every == 0:
+                    # Measure the next tier up; _last_rank stays put so this is not an upgrade
+                    rank -= 1
+                    print(f"🔍 Trying Whisper {pairs[rank][0]} / {pairs[rank][1]} to refresh its speed estimate")
+        whisper_model, llm_model = pairs[rank]
+        return ModelChoice(whisper_model, llm_model, predictions[rank], rank > 0)
+
+    def admit(self, duration: float, backlog: Tuple[int, float] = (0, 0.0)) -> ModelChoice:
+        """
+        Choose models for a synchronous request and count its media towards
+        the backlog until release() is called.
+        """
+        choice = self.choose(duration, backlog=backlog)
+        with self._lock:
+            choice.request_id = self._next_id
+            self._next_id += 1
+            self._inflight[choice.request_id] = duration
+        return choice
+
+    def release(self, choice: Optional[ModelChoice]):
+        """Remove an admitted request from the backlog (safe to call more than once)"""
+        if choice is None:
+            return
+        with self._lock:
+            self._inflight.pop(choice.request_id, None)
+
+    def _update(self, estimates: Dict[str, float], name: str, value: float):
+        with self._lock:
+            if name in estimates:
+                estimates[name] += self.smoothing * (value - estimates[name])
+
+    def observe_transcription(self, whisper_model: str, media_seconds: float, seconds: float):
+        if media_seconds > 1:
+            self._update(self.whisper_rtf, whisper_model, seconds / media_seconds)
+
+    def observe_analysis(self, llm_model: str, seconds: float):
+        if seconds > 0.5:  # anything faster was answered from the response cache
+            self._update(self.analysis_seconds, llm_model, seconds)
+
+    def preload_models(self) -> List[str]:
+        """Whisper models to load at startup so a downgrade never waits for a model load"""
+        return list(self.whisper_ladder) if self.adaptive else self.whisper_ladder[:1]
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                'adaptive': self.adaptive,
+                'target_seconds': self.target_seconds,
+                'current': dict(zip(("whisper_model", "llm_model"), self._pairs()[self._last_rank])),
+                'whisper_rtf': {name: round(value, 3) for name, value in self.whisper_rtf.items()},
+                'analysis_seconds': {name: round(value, 1) for name, value in self.analysis_seconds.items()},
+            }
+
+
+def _ladder(name: str, default: List[str]) -> List[str]:
+    value = os.environ.get(name)
+    models = [model.strip() for model in value.split(",") if model.strip()] if value else default
+    return list(dict.fromkeys(models))
+
+
+def _smaller_whisper_models(model: str) -> List[str]:
+    """The configured Whisper model followed by every smaller standard size"""
+    sizes = ["large", "medium", "small", "base", "tiny"]
+    base = model.split(".")[0]
+    return [model] + sizes[sizes.index(base) + 1:] if base in sizes else [model]
+
+
+# Global policy instance.
+# WHISPER_MODEL_LADDER / OLLAMA_MODEL_LADDER list models best-first, e.g.
+# OLLAMA_MODEL_LADDER=llama3:8b,llama3.2:3b,llama3.2:1b (each must be pulled).
+# MODEL_POLICY=adaptive lets the policy degrade; otherwise the first model of each ladder is used.
+model_policy = ModelPolicy(
+    whisper_ladder=_ladder("WHISPER_MODEL_LADDER", _smaller_whisper_models(os.environ.get("WHISPER_MODEL", "small"))),
+    llm_ladder=_ladder("OLLAMA_MODEL_LADDER", [ollama_client.model]),
+    target_seconds=float(os.environ.get("LATENCY_TARGET_SECONDS", "300")),
+    workers=int(os.environ.get("JOB_WORKERS", "2")),
+    adaptive=os.environ.get("MODEL_POLICY", "fixed") == "adaptive",
+)
+
+metrics.gauge("video_ai_model_policy_tier", "Current model tier chosen by the policy (0 = best models)",
+              collect=lambda: {(): model_policy._last_rank})
@@ -1,8 +1,302 @@
+import os
 import requests
 import json
 import time
-from typing import Optional, Dict, Any
+import asyncio
+import threading
+from collections import OrderedDict
+from typing import Optional, Dict, Any, List, Callable
 import logging
+from contextvars import ContextVar
+
+from ai.response_cache import response_cache, make_cache_key
+from ai.tuning import InferenceTuner, inference_tuner, CONTEXT_MARGIN
+from utils.metrics import metrics, ollama_request_seconds, ollama_prompt_tokens
+
+# Per-job model chosen by the model policy; set for the duration of one analysis
+model_override: ContextVar[Optional[str]] = ContextVar("ollama_model_override", default=None)
+# Key that keeps one analysis on one Ollama backend; set for the duration of one analysis
+backend_affinity: ContextVar[Optional[str]] = ContextVar("ollama_backend_affinity", default=None)
+
+# Primes a session: the document is evaluated once and the model only has to acknowledge it
+SESSION_PRIMER = "Read this video transcript carefully; questions about it follow. Reply only with OK."
+# Room for a task prompt and its answer, reserved when a session's context size is chosen
+SESSION_TASK_TOKENS = 768
+# Options that change speed and memory but not the answer, so they stay out of cache keys
+RUNTIME_OPTIONS = ("num_thread", "num_ctx")
+
+def keep_alive_value(value: Optional[str]):
+    """OLLAMA_KEEP_ALIVE as Ollama expects it: a duration string ("30m") or seconds (-1 = forever)"""
+    if not value:
+        return None
+    return int(value) if value.lstrip("-").isdigit() else value
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for English text (about 4 characters per token)"""
+    return len(text) // 4 + 1
+
+class OllamaHealth:
+    """
+    Circuit breaker for one Ollama server, shared by every client that talks to it.
+
+    closed: requests go through. `failure_threshold` consecutive failures, or
+    one failed /api/tags probe, open the circuit.
+    open: requests fail immediately so callers go straight to their fallback.
+    A successful probe closes it again; after `reset_timeout` without one, a
+    single trial request is let through (half_open) and its outcome decides.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, base_url: str, failure_threshold: int = 3, reset_timeout: float = 30.0,
+                 probe_interval: float = 10.0, probe_timeout: float = 2.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.base_url = base_url
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.probe_interval = probe_interval
+        self.probe_timeout = probe_timeout
+        self.clock = clock
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trial_started = 0.0
+        self.short_circuited = 0  # requests answered by the fallback without trying Ollama
+        self.last_probe: Optional[Dict[str, Any]] = None
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._prober: Optional[threading.Thread] = None
+
+    def allow(self) -> bool:
+        """Whether a request may be sent now"""
+        self._ensure_prober()
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            now = self.clock()
+            if self.state == self.OPEN and now - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self.trial_started = now
+                return True
+            if self.state == self.HALF_OPEN and now - self.trial_started >= self.reset_timeout:
+                # The last trial never reported back; allow another one
+                self.trial_started = now
+                return True
+            self.short_circuited += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self.state != self.CLOSED:
+                print(f"✅ Ollama at {self.base_url} is reachable again")
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or (self.state == self.CLOSED and self.failures >= self.failure_threshold):
+                self._open()
+
+    def _open(self):
+        if self.state == self.CLOSED:
+            print(f"🔌 Ollama at {self.base_url} is unavailable; failing fast until it recovers")
+        self.state = self.OPEN
+        self.opened_at = self.clock()
+
+    def probe(self) -> bool:
+        """Check /api/tags once and update the circuit"""
+        start = time.perf_counter()
+        try:
+            response = requests.get(f"{self.base_url}/api/tags", timeout=self.probe_timeout)
+            response.raise_for_status()
+            ok, error = True, None
+        except requests.exceptions.RequestException as e:
+            ok, error = False, str(e)
+        self.last_probe = {'ok': ok, 'seconds': round(time.perf_counter() - start, 3), 'error': error, 'at': time.time()}
+        if ok:
+            self.record_success()
+        else:
+            with self._lock:
+                self._open()
+        return ok
+
+    def _ensure_prober(self):
+        if self.probe_interval <= 0 or self._prober is not None:
+            return
+        with self._lock:
+            if self._prober is None:
+                self._prober = threading.Thread(target=self._probe_loop, name="ollama-health", daemon=True)
+                self._prober.start()
+
+    def _probe_loop(self):
+        while True:
+            time.sleep(self.probe_interval)
+            try:
+                self.probe()
+            except Exception as e:
+                self.logger.error(f"Ollama health probe crashed: {e}")
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'state': self.state,
+                'consecutive_failures': self.failures,
+                'short_circuited': self.short_circuited,
+                'last_probe': self.last_probe,
+            }
+
+_health: Dict[str, OllamaHealth] = {}
+_health_lock = threading.Lock()
+
+def health_for(base_url: str) -> OllamaHealth:
+    """The shared circuit breaker for an Ollama base URL"""
+    with _health_lock:
+        if base_url not in _health:
+            _health[base_url] = OllamaHealth(
+                base_url,
+                failure_threshold=int(os.environ.get("OLLAMA_BREAKER_FAILURES", "3")),
+                reset_timeout=float(os.environ.get("OLLAMA_BREAKER_RESET_SECONDS", "30")),
+                probe_interval=float(os.environ.get("OLLAMA_HEALTH_INTERVAL", "10")),
+            )
+        return _health[base_url]
+
+def is_outage(error: Exception) -> bool:
+    """
+    Connection problems, timeouts and 5xx count against the circuit; 4xx and
+    unparseable response bodies mean the server is up
+    """
+    if isinstance(error, ValueError):
+        return False
+    response = getattr(error, "response", None)
+    status = getattr(response, "status_code", None)
+    return status is None or status >= 500
+
+class OllamaBackend:
+    """One Ollama server: requests in flight, smoothed latency and its circuit breaker"""
+
+    def __init__(self, url: str, smoothing: float = 0.3):
+        self.url = url
+        self.health = health_for(url)
+        self.smoothing = smoothing
+        self.outstanding = 0
+        self.ewma_seconds: Optional[float] = None  # latency of successful requests
+        self.requests = 0
+        self.failures = 0
+        self._lock = threading.Lock()
+
+    @property
+    def available(self) -> bool:
+        return self.health.state == OllamaHealth.CLOSED
+
+    def finished(self, seconds: Optional[float], error: Optional[Exception]):
+        """Book a finished request; seconds is None if it was cancelled"""
+        with self._lock:
+            self.outstanding -= 1
+            if seconds is None and error is None:
+                return
+            self.requests += 1
+            if error is None:
+                self.ewma_seconds = seconds if self.ewma_seconds is None else \
+                    self.ewma_seconds + self.smoothing * (seconds - self.ewma_seconds)
+            elif is_outage(error):
+                self.failures += 1
+        if error is None or not is_outage(error):
+            self.health.record_success()
+        else:
+            self.health.record_failure()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'url': self.url,
+                'state': self.health.state,
+                'outstanding': self.outstanding,
+                'ewma_seconds': round(self.ewma_seconds, 3) if self.ewma_seconds is not None else None,
+                'requests': self.requests,
+                'failures': self.failures,
+            }
+
+_backends: Dict[str, OllamaBackend] = {}
+_backends_lock = threading.Lock()
+
+def backend_for(url: str) -> OllamaBackend:
+    """The shared backend record for a URL, so every client sees the same load"""
+    with _backends_lock:
+        if url not in _backends:
+            _backends[url] = OllamaBackend(url)
+        return _backends[url]
+
+class OllamaBackendPool:
+    """
+    Spreads requests over several Ollama servers.
+
+    A request goes to the backend with the fewest requests in flight, with the
+    lowest latency EWMA breaking ties. Backends whose circuit is open are
+    ejected until their health probe passes. Requests with the same affinity
+    key (one analysis) stick to the backend first chosen for it, so its primed
+    session context is reused, unless that backend is ejected or has `spill`
+    more requests in flight than the least busy one.
+    """
+
+    def __init__(self, urls: List[str], spill: int = 4, max_affinities: int = 4096):
+        self.backends = [backend_for(url.rstrip("/")) for url in dict.fromkeys(urls)]
+        self.spill = spill
+        self.max_affinities = max_affinities
+        self._pinned: "OrderedDict[str, OllamaBackend]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def acquire(self, affinity: Optional[str] = None) -> Optional[OllamaBackend]:
+        """Pick a backend and count the request against it; None if every backend is down"""
+        for backend in self.backends:
+            backend.health._ensure_prober()
+        with self._lock:
+            healthy = [backend for backend in self.backends if backend.available]
+            if healthy:
+                least = min(healthy, key=lambda b: (b.outstanding, b.ewma_seconds or 0.0))
+                chosen = least
+                if affinity is not None:
+                    pinned = self._pinned.get(affinity)
+                    if pinned is None or pinned not in healthy:
+                        self._pinned[affinity] = least
+                        while len(self._pinned) > self.max_affinities:
+                            self._pinned.popitem(last=False)
+                    elif pinned.outstanding < least.outstanding + self.spill:
+                        chosen = pinned
+                        self._pinned.move_to_end(affinity)
+                with chosen._lock:
+                    chosen.outstanding += 1
+                return chosen
+        # Everything is ejected: let a recovering backend take a trial request
+        for backend in self.backends:
+            if self.claim(backend):
+                return backend
+        return None
+
+    def claim(self, backend: OllamaBackend) -> bool:
+        """Count a request against a specific backend if its circuit lets it through"""
+        if not backend.health.allow():
+            return False
+        with backend._lock:
+            backend.outstanding += 1
+        return True
+
+    def forget(self, affinity: Optional[str]):
+        with self._lock:
+            self._pinned.pop(affinity, None)
+
+    def load(self) -> float:
+        """Mean requests in flight or queued per backend that is up (all of them if none is)"""
+        up = [backend for backend in self.backends if backend.available] or self.backends
+        return sum(backend.outstanding for backend in self.backends) / len(up)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        return [backend.stats() for backend in self.backends]
+
+def configured_urls(default: str = "http://localhost:11434") -> List[str]:
+    """Ollama servers from OLLAMA_URLS (comma separated), else OLLAMA_BASE_URL"""
+    urls = [url.strip() for url in os.environ.get("OLLAMA_URLS", "").split(",") if url.strip()]
+    return urls or [os.environ.get("OLLAMA_BASE_URL", default)]
 
 class OllamaClient:
     """
@@ -10,71 +304,76 @@ class OllamaClient:
     Uses Meta-style optimizations: streaming, caching, and smart prompting.
     """
     
-    def __init__(self, model: str = "llama3:8b", base_url: str = "http://localhost:11434"):
+    def __init__(self, model: str = "llama3:8b", base_url: str = "http://localhost:11434",
+                 keep_alive: Optional[str] = None, timeout: float = 120.0,
+                 base_urls: Optional[List[str]] = None, tuner: Optional[InferenceTuner] = None):
         self.model = model
-        self.base_url = base_url
+        self.pool = OllamaBackendPool(base_urls or [base_url])
+        self.base_url = self.pool.backends[0].url
+        self.timeout = timeout  # seconds to wait for a response
+        self.connect_timeout = 3.0  # an unreachable server should fail fast, not after `timeout`
+        self.keep_alive = keep_alive_value(keep_alive)  # how long Ollama keeps the model loaded after a request
+        self.last_used = 0.0  # time.monotonic() of the last successful generation
         self.session = requests.Session()
-        self.session.timeout = 30  # 30 second timeout
-        self.cache = {}  # Simple in-memory cache
+        self.cache = response_cache  # Shared memory + SQLite response cache
+        self.context_window = 2048  # num_ctx and prompt budget when there is no tuner
+        self.tuner = tuner  # picks num_thread/num_ctx/num_predict per request
         self.logger = logging.getLogger(__name__)
         
-    def _make_request(self, endpoint: str, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """Make optimized request to Ollama API"""
+    @property
+    def health(self) -> OllamaHealth:
+        return health_for(self.base_url)
+    
+    def _acquire(self, backend: Optional[OllamaBackend], affinity: Optional[str]) -> Optional[OllamaBackend]:
+        if self.tuner is not None:
+            # Only requests that reach Ollama count towards the load, not cache hits
+            self.tuner.observe(self._concurrency())
+        if backend is not None:
+            return backend if self.pool.claim(backend) else None
+        return self.pool.acquire(affinity or backend_affinity.get())
+    
+    def _make_request(self, endpoint: str, data: Dict[str, Any], backend: Optional[OllamaBackend] = None,
+                      affinity: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Make optimized request to Ollama API on a backend from the pool (or the given one).
+        None at once if no backend's circuit lets the request through.
+        """
+        backend = self._acquire(backend, affinity)
+        if backend is None:
+            return None
+        seconds, error = None, None
         try:
+            start = time.perf_counter()
             response = self.session.post(
-                f"{self.base_url}/api/{endpoint}",
+                f"{backend.url}/api/{endpoint}",
                 json=data,
-                stream=False  # Disable streaming for faster processing
+                stream=False,  # Disable streaming for faster processing
+                timeout=(self.connect_timeout, self.timeout),
             )
             response.raise_for_status()
-            return response.json()
+            result = response.json()
+            seconds = time.perf_counter() - start
+            return result
         except requests.exceptions.RequestException as e:
-            self.logger.error(f"Ollama request failed: {e}")
+            self.logger.error(f"Ollama request to {backend.url} failed: {e}")
+            error = e
             return None
+        finally:
+            backend.finished(seconds, error)
     
-    def _get_cache_key(self, prompt: str, context: str = "") -> str:
-        """Generate cache key for prompt"""
-        return f"{hash(prompt + context)}"
-    
-    def _is_cached(self, cache_key: str) -> Optional[str]:
-        """Check if result is cached"""
-        if cache_key in self.cache:
-            cached_time, result = self.cache[cache_key]
-            # Cache valid for 1 hour
-            if time.time() - cached_time < 3600:
-                return result
-            else:
-                del self.cache[cache_key]
-        return None
-    
-    def _cache_result(self, cache_key: str, result: str):
-        """Cache the result"""
-        self.cache[cache_key] = (time.time(), result)
-        # Limit cache size to 100 entries
-        if len(self.cache) > 100:
-            oldest_key = min(self.cache.keys(), key=lambda k: self.cache[k][0])
-            del self.cache[oldest_key]
-    
-    def generate(self, prompt: str, context: str = "", max_tokens: int = 500) -> str:
+    def _build_request(self, prompt: str, context: str = "", max_tokens: int = 500,
+                       format: Optional[str] = None, options: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
-        Generate response using Ollama with optimizations:
-        - Caching for repeated requests
-        - Optimized token limits
-        - Error handling and fallbacks
+        Build the /api/generate payload with optimized parameters for llama3:8b.
+        format="json" asks Ollama for a single JSON value; options override the
+        defaults. The result is what cache keys are computed from: _tune() applies
+        the tuner only once a request is known to be sent.
         """
-        cache_key = self._get_cache_key(prompt, context)
-        
-        # Check cache first
-        cached_result = self._is_cached(cache_key)
-        if cached_result:
-            return cached_result
-        
         # Prepare optimized prompt
         full_prompt = self._optimize_prompt(prompt, context)
         
-        # Make request with optimized parameters for llama3:8b
         data = {
-            "model": self.model,
+            "model": model_override.get() or self.model,
             "prompt": full_prompt,
             "stream": False,
             "options": {
@@ -84,22 +383,119 @@ class OllamaClient:
                 "num_predict": max_tokens,  # Use num_predict for llama3
                 "repeat_penalty": 1.1,  # Prevent repetition
                 "stop": ["\n\n", "---", "===", "##"],  # Stop at section breaks
-                "num_ctx": 2048,     # Context window for efficiency
+                "num_ctx": self.context_window,  # Context window for efficiency
                 "num_thread": 4      # Use 4 threads for faster processing
             }
         }
+        if self.keep_alive is not None:
+            data["keep_alive"] = self.keep_alive
+        if format:
+            data["format"] = format
+            # Blank lines and separators are valid inside JSON, so they must not end the response
+            del data["options"]["stop"]
+        if options:
+            data["options"].update(options)
+        return data
+    
+    def _tune(self, data: Dict[str, Any], max_tokens: int, options: Optional[Dict[str, Any]] = None,
+              report: bool = True) -> Dict[str, Any]:
+        """
+        Size num_thread, num_ctx and num_predict of a request that missed the cache
+        and is about to be sent; options still override the tuner. Cache keys stay
+        on the untuned request, so they hold the caller's max_tokens rather than a
+        num_predict that moves with context retention and token calibration.
+        """
+        if self.tuner is None:
+            return data
+        data["options"].update(self.tuner.options(
+            data["model"], estimate_tokens(data["prompt"]), max_tokens,
+            num_ctx=(options or {}).get("num_ctx"), report=report,
+        ))
+        if options:
+            data["options"].update(options)
+        return data
+
+    def _concurrency(self) -> float:
+        """Requests running on a backend, counting the one about to be sent"""
+        return self.pool.load() + 1
+
+    def _cache_key(self, data: Dict[str, Any]) -> str:
+        options = {key: value for key, value in data["options"].items() if key not in RUNTIME_OPTIONS}
+        if "format" in data:
+            options["format"] = data["format"]
+        return make_cache_key(data["model"], options, data["prompt"])
+    
+    def _response_text(self, result: Optional[Dict[str, Any]], data: Dict[str, Any], cache_key: str) -> Optional[str]:
+        """Text of a successful /api/generate result (now cached), or None if the call failed"""
+        if not result or "response" not in result:
+            return None
+        self._record_prompt_tokens(data, result)
+        self.last_used = time.monotonic()
+        response_text = result["response"].strip()
+        self.cache.put(cache_key, response_text)
+        return response_text
+    
+    def _record_prompt_tokens(self, data: Dict[str, Any], result: Dict[str, Any]):
+        """Count the prompt tokens Ollama evaluated and calibrate the tuner's estimate with them"""
+        evaluated = result.get("prompt_eval_count")
+        if not evaluated:
+            return
+        ollama_prompt_tokens.inc(evaluated, model=data["model"])
+        # With a session context only the new tokens are evaluated, which says nothing about the estimate
+        if self.tuner is not None and "context" not in data:
+            self.tuner.record_prompt(data["model"], estimate_tokens(data["prompt"]), evaluated)
+
+    def _prompt_tokens(self, model: str, text: str) -> int:
+        """Estimated tokens of text, calibrated by the tuner when there is one"""
+        estimated = estimate_tokens(text)
+        return self.tuner.prompt_tokens(model, estimated) if self.tuner is not None else estimated
+
+    def open_session(self, document: str) -> "OllamaSession":
+        """Session for several prompts about the same document (see OllamaSession)"""
+        return OllamaSession(self, document)
+    
+    def generate(self, prompt: str, context: str = "", max_tokens: int = 500,
+                 format: Optional[str] = None, options: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Generate response using Ollama with optimizations:
+        - Caching for repeated requests
+        - Optimized token limits
+        - Error handling and fallbacks
+        """
+        data = self._build_request(prompt, context, max_tokens, format, options)
+        
+        # Check cache first
+        cache_key = self._cache_key(data)
+        cached_result = self.cache.get(cache_key)
+        if cached_result:
+            return cached_result
         
+        self._tune(data, max_tokens, options)
+        start = time.perf_counter()
         result = self._make_request("generate", data)
+        ollama_request_seconds.observe(time.perf_counter() - start, model=data["model"],
+                                       outcome="ok" if result else "error")
         
-        if result and "response" in result:
-            response_text = result["response"].strip()
-            # Cache the result
-            self._cache_result(cache_key, response_text)
+        response_text = self._response_text(result, data, cache_key)
+        if response_text is not None:
             return response_text
         
         # Fallback to simple text processing if Ollama fails
         return self._fallback_processing(prompt, context)
     
+    def prompt_budget(self, prompt: str, max_tokens: int) -> int:
+        """
+        Tokens of context (as estimate_tokens() counts them) that fit next to the
+        prompt and the response in num_ctx. With a tuner that is its largest
+        context size, corrected by the token ratio it has measured.
+        """
+        model = model_override.get() or self.model
+        num_ctx = self.tuner.context_sizes[-1] if self.tuner is not None else self.context_window
+        room = num_ctx - self._prompt_tokens(model, self._optimize_prompt(prompt)) - max_tokens - CONTEXT_MARGIN
+        if self.tuner is not None:
+            room = int(room / self.tuner.token_ratio(model))
+        return max(256, room)
+    
     def _optimize_prompt(self, prompt: str, context: str = "") -> str:
         """
         Optimize prompt for better performance and accuracy.
@@ -138,5 +534,156 @@ class OllamaClient:
         
         return "Analysis completed. Please ensure Ollama is running for enhanced AI features."
 
+class OllamaSession:
+    """
+    Several task prompts about one document with its prompt evaluation paid once.
+
+    The first uncached task primes the session: the document is sent on its
+    own and the `context` token state Ollama returns is kept. Every task is
+    then sent after that state, so Ollama reuses its KV cache for the document
+    and only evaluates the short task prompt. Answers come from a different
+    prompt than the equivalent one-shot request, so they are cached under keys
+    of their own.
+
+    Ollama silently drops the start of a context that outgrows num_ctx, so
+    the session is only used while primed tokens, task and answer fit in the
+    num_ctx the document was evaluated with. Otherwise, or if priming fails,
+    tasks are sent as one-shot prompts.
+    """
+
+    def __init__(self, client: OllamaClient, document: str):
+        self.client = client
+        self.document = document
+        # Primer and tasks go to the same backend, which holds the document's KV cache
+        self.affinity = backend_affinity.get() or f"session-{id(self)}"
+        self.tokens: Optional[List[int]] = None
+        # num_thread/num_ctx the document was evaluated with; tasks must match or Ollama reloads
+        self.options: Dict[str, Any] = {}
+        self.primed = False
+        self._lock = threading.Lock()
+        self._async_lock = None
+
+    def _primer_request(self) -> Dict[str, Any]:
+        data = self.client._build_request(SESSION_PRIMER, self.document, max_tokens=SESSION_TASK_TOKENS)
+        # num_ctx is sized to leave room for tasks; the primer itself only needs an acknowledgement
+        self.client._tune(data, SESSION_TASK_TOKENS, report=False)
+        data["options"]["num_predict"] = 4
+        self.options = {key: data["options"][key] for key in RUNTIME_OPTIONS}
+        return data
+
+    def _start_request(self) -> Optional[Dict[str, Any]]:
+        """The primer request, or None when the document leaves no room for a task in num_ctx"""
+        data = self._primer_request()
+        document_tokens = self.client._prompt_tokens(data["model"], data["prompt"])
+        if document_tokens + SESSION_TASK_TOKENS > data["options"]["num_ctx"]:
+            self.primed = True
+            self.client.logger.info("Document too long to share in one Ollama context; using one-shot prompts")
+            return None
+        return data
+
+    def _fits(self, prompt: str, max_tokens: int) -> bool:
+        """Primed tokens, this task and its answer fit in the session's num_ctx"""
+        model = model_override.get() or self.client.model
+        task = self.client._prompt_tokens(model, self.client._optimize_prompt(prompt))
+        needed = len(self.tokens) + task + max_tokens
+        return needed + CONTEXT_MARGIN <= self.options["num_ctx"]
+
+    def _task_request(self, prompt: str, max_tokens: int) -> Dict[str, Any]:
+        data = self.client._tune(self.client._build_request(prompt, "", max_tokens, options=self.options),
+                                 max_tokens, self.options)
+        data["context"] = self.tokens
+        return data
+
+    def _prime(self, data: Dict[str, Any], result: Optional[Dict[str, Any]]):
+        self.primed = True
+        if result and result.get("context"):
+            self.tokens = result["context"]
+            self.client._record_prompt_tokens(data, result)
+            self.client.logger.info(f"Primed Ollama session with {len(self.tokens)} context tokens")
+        else:
+            self.client.logger.warning("Could not prime Ollama session; falling back to one-shot prompts")
+
+    def _cache_key(self, prompt: str, max_tokens: int) -> str:
+        data = self.client._build_request(prompt, "", max_tokens, options=self.options or None)
+        # Everything the model saw: the primer with the document, then the task
+        data["prompt"] = self.client._optimize_prompt(SESSION_PRIMER, self.document) + "\n" + data["prompt"]
+        return self.client._cache_key(data)
+
+    def generate(self, prompt: str, max_tokens: int = 500) -> str:
+        """Answer a task about the document, like client.generate(prompt, document, max_tokens), without re-evaluating it"""
+        cache_key = self._cache_key(prompt, max_tokens)
+        cached_result = self.client.cache.get(cache_key)
+        if cached_result:
+            return cached_result
+
+        with self._lock:
+            if not self.primed:
+                primer = self._start_request()
+                if primer is not None:
+                    self._prime(primer, self.client._make_request("generate", primer, affinity=self.affinity))
+        if self.tokens is None or not self._fits(prompt, max_tokens):
+            return self.client.generate(prompt, self.document, max_tokens)
+
+        data = self._task_request(prompt, max_tokens)
+        start = time.perf_counter()
+        result = self.client._make_request("generate", data, affinity=self.affinity)
+        ollama_request_seconds.observe(time.perf_counter() - start, model=data["model"],
+                                       outcome="ok" if result else "error")
+        response_text = self.client._response_text(result, data, cache_key)
+        if response_text is not None:
+            return response_text
+        return self.client._fallback_processing(prompt, self.document)
+
+    async def generate_async(self, prompt: str, max_tokens: int = 500, timeout: Optional[float] = None,
+                             on_token=None) -> str:
+        """Async version of generate(); needs an AsyncOllamaClient"""
+        cache_key = self._cache_key(prompt, max_tokens)
+        cached_result = self.client.cache.get(cache_key)
+        if cached_result:
+            if on_token:
+                on_token(cached_result)
+            return cached_result
+
+        if self._async_lock is None:
+            self._async_lock = asyncio.Lock()
+        async with self._async_lock:
+            # Concurrent tasks wait here for the one priming request
+            if not self.primed:
+                primer = self._start_request()
+                if primer is not None:
+                    self._prime(primer, await self.client._make_request_async("generate", primer, timeout,
+                                                                              affinity=self.affinity))
+        if self.tokens is None or not self._fits(prompt, max_tokens):
+            return await self.client.generate_async(prompt, self.document, max_tokens,
+                                                    timeout=timeout, on_token=on_token)
+
+        data = self._task_request(prompt, max_tokens)
+        start = time.perf_counter()
+        if on_token:
+            result = await self.client._stream_request_async(data, on_token, timeout, affinity=self.affinity)
+        else:
+            result = await self.client._make_request_async("generate", data, timeout, affinity=self.affinity)
+        ollama_request_seconds.observe(time.perf_counter() - start, model=data["model"],
+                                       outcome="ok" if result else "error")
+        response_text = self.client._response_text(result, data, cache_key)
+        if response_text is not None:
+            return response_text
+        return self.client._fallback_processing(prompt, self.document)
+
 # Global client instance
-ollama_client = OllamaClient()
+# OLLAMA_URLS=http://gpu1:11434,http://gpu2:11434 spreads requests over several servers.
+ollama_client = OllamaClient(base_urls=configured_urls(),
+                             keep_alive=os.environ.get("OLLAMA_KEEP_ALIVE", "30m"),
+                             timeout=float(os.environ.get("OLLAMA_TIMEOUT", "120")),
+                             tuner=inference_tuner)
+
+_CIRCUIT_STATES = {OllamaHealth.CLOSED: 0, OllamaHealth.HALF_OPEN: 1, OllamaHealth.OPEN: 2}
+metrics.gauge("video_ai_ollama_circuit_state", "Ollama circuit breaker state (0 closed, 1 half-open, 2 open)",
+              ["base_url"], collect=lambda: {(url,): _CIRCUIT_STATES[h.state] for url, h in list(_health.items())})
+metrics.counter("video_ai_ollama_short_circuits_total", "Ollama requests answered by the fallback while the circuit was open",
+                ["base_url"], collect=lambda: {(url,): h.short_circuited for url, h in list(_health.items())})
+metrics.gauge("video_ai_ollama_backend_outstanding", "Ollama requests in flight or queued, per backend",
+              ["base_url"], collect=lambda: {(url,): b.outstanding for url, b in list(_backends.items())})
+metrics.gauge("video_ai_ollama_backend_latency_seconds", "Smoothed (EWMA) latency of successful requests, per backend",
+              ["base_url"], collect=lambda: {(url,): b.ewma_seconds for url, b in list(_backends.items())
+                                             if b.ewma_seconds is not None})
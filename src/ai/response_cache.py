@@ -0,0 +1,177 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Optional, Dict, Any
+
+from utils.metrics import metrics
+
+
+def make_cache_key(model: str, options: Dict[str, Any], prompt: str) -> str:
+    """Stable digest of everything that determines an LLM response"""
+    payload = json.dumps({'model': model, 'options': options, 'prompt': prompt},
+                         sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    Two-tier LLM response cache.
+    An in-memory LRU with TTL sits in front of a SQLite store that is shared
+    across restarts and across worker processes.
+    """
+
+    def __init__(self, db_path: Optional[str], max_entries: int = 1000, ttl: float = 24 * 3600,
+                 max_disk_bytes: int = 256 * 1024 * 1024):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_disk_bytes = max_disk_bytes
+        self.logger = logging.getLogger(__name__)
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        self._writes_since_prune = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if db_path:
+            self._open()
+
+    def _open(self):
+        try:
+            os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(self.db_path, timeout=5, check_same_thread=False,
+                                       isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+                " created REAL NOT NULL, accessed REAL NOT NULL, size INTEGER NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+        except sqlite3.Error as e:
+            self.logger.error(f"Response cache disabled on disk, could not open {self.db_path}: {e}")
+            self._db = None
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                created, value = entry
+                if now - created < self.ttl:
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    return value
+                del self._memory[key]
+
+            if self._db is not None:
+                try:
+                    row = self._db.execute(
+                        "SELECT value, created FROM responses WHERE key = ?", (key,)
+                    ).fetchone()
+                    if row and now - row[1] < self.ttl:
+                        self._db.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+                        self._remember(key, row[1], row[0])
+                        self.disk_hits += 1
+                        return row[0]
+                except sqlite3.Error as e:
+                    self.logger.error(f"Response cache read failed: {e}")
+
+            self.misses += 1
+            return None
+
+    def put(self, key: str, value: str):
+        now = time.time()
+        with self._lock:
+            self._remember(key, now, value)
+            if self._db is None:
+                return
+            try:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses (key, value, created, accessed, size)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    (key, value, now, now, len(value.encode("utf-8"))),
+                )
+                self._writes_since_prune += 1
+                if self._writes_since_prune >= 50:
+                    self._prune(now)
+            except sqlite3.Error as e:
+                self.logger.error(f"Response cache write failed: {e}")
+
+    def _remember(self, key: str, created: float, value: str):
+        self._memory[key] = (created, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _prune(self, now: float):
+        """Drop expired rows, then least-recently-accessed rows beyond the size budget"""
+        self._writes_since_prune = 0
+        self._db.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl,))
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_disk_bytes:
+            return
+        excess = total - self.max_disk_bytes
+        freed = 0
+        doomed = []
+        for key, size in self._db.execute("SELECT key, size FROM responses ORDER BY accessed"):
+            if freed >= excess:
+                break
+            doomed.append((key,))
+            freed += size
+        self._db.executemany("DELETE FROM responses WHERE key = ?", doomed)
+
+    def storage(self) -> Dict[str, Dict[str, int]]:
+        """Entries and bytes held in each tier"""
+        with self._lock:
+            memory = {'entries': len(self._memory),
+                      'bytes': sum(len(v.encode("utf-8")) for _, v in self._memory.values())}
+            disk = {'entries': 0, 'bytes': 0}
+            if self._db is not None:
+                try:
+                    disk['entries'], disk['bytes'] = self._db.execute(
+                        "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+                    ).fetchone()
+                except sqlite3.Error as e:
+                    self.logger.error(f"Response cache size query failed: {e}")
+            return {'memory': memory, 'disk': disk}
+
+
+# Global cache instance shared by all Ollama clients in this process
+response_cache = ResponseCache(
+    db_path=os.environ.get(
+        "OLLAMA_CACHE_DB",
+        os.path.join(os.path.expanduser("~"), ".cache", "video-ai-analyzer", "ollama_responses.sqlite3"),
+    ) or None,
+    max_entries=int(os.environ.get("OLLAMA_CACHE_MEMORY_ENTRIES", "1000")),
+    ttl=float(os.environ.get("OLLAMA_CACHE_TTL", str(24 * 3600))),
+)
+
+
+def _hit_ratio():
+    lookups = response_cache.memory_hits + response_cache.disk_hits + response_cache.misses
+    hits = response_cache.memory_hits + response_cache.disk_hits
+    return {(): hits / lookups if lookups else 0.0}
+
+
+metrics.counter(
+    "video_ai_ollama_cache_lookups_total", "Ollama response cache lookups, by result", ["result"],
+    collect=lambda: {
+        ("memory_hit",): response_cache.memory_hits,
+        ("disk_hit",): response_cache.disk_hits,
+        ("miss",): response_cache.misses,
+    },
+)
+metrics.gauge("video_ai_ollama_cache_hit_ratio", "Share of Ollama response cache lookups served from cache",
+              collect=_hit_ratio)
+metrics.gauge("video_ai_ollama_cache_entries", "Responses held in the Ollama response cache, by tier",
+              ["tier"], collect=lambda: {(tier,): usage['entries'] for tier, usage in response_cache.storage().items()})
+metrics.gauge("video_ai_ollama_cache_bytes", "Bytes of responses stored in the Ollama response cache, by tier",
+              ["tier"], collect=lambda: {(tier,): usage['bytes'] for tier, usage in response_cache.storage().items()})
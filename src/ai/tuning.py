@@ -0,0 +1,336 @@
+import os
+import json
+import math
+import time
+import logging
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from utils.metrics import ollama_truncated_responses
+
+DEFAULT_PROFILE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "video-ai-analyzer", "ollama_profile.json")
+DEFAULT_CONTEXT_SIZES = [2048, 4096, 8192]
+# Room a response needs besides the prompt, matching the prompt_budget() margin
+CONTEXT_MARGIN = 64
+# Bounds on one measured/estimated prompt token sample; far fewer tokens than
+# estimated means Ollama reused a cached prefix, which says nothing about the text
+TOKEN_RATIO_BOUNDS = (0.5, 4.0)
+
+
+def _cgroup_cpu_limit() -> Optional[float]:
+    """CPU quota of this container (cgroup v2 cpu.max), if one is set"""
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()[:2]
+        return None if quota == "max" else int(quota) / int(period)
+    except (OSError, ValueError):
+        return None
+
+
+def _threads_per_core() -> int:
+    """Hardware threads per physical core, from /proc/cpuinfo (1 if unknown)"""
+    try:
+        with open("/proc/cpuinfo") as f:
+            text = f.read()
+    except OSError:
+        return 1
+    cores, logical, physical_id = set(), 0, None
+    for line in text.splitlines():
+        key, _, value = line.partition(":")
+        key, value = key.strip(), value.strip()
+        if key == "processor":
+            logical += 1
+        elif key == "physical id":
+            physical_id = value
+        elif key == "core id":
+            cores.add((physical_id, value))
+    return max(1, logical // len(cores)) if cores else 1
+
+
+def detect_cores() -> int:
+    """
+    Physical cores this process may use. llama.cpp gains nothing from
+    hyperthreads, so SMT siblings are not counted; affinity masks and cgroup
+    quotas are.
+    """
+    try:
+        logical = len(os.sched_getaffinity(0))
+    except AttributeError:
+        logical = os.cpu_count() or 1
+    quota = _cgroup_cpu_limit()
+    if quota:
+        logical = min(logical, max(1, int(quota)))
+    return max(1, logical // _threads_per_core())
+
+
+class InferenceTuner:
+    """
+    Picks num_thread, num_ctx and num_predict for each Ollama request from the
+    host's cores, the current concurrency and the prompt's token count.
+
+    - num_thread: the cores divided among the requests in flight. Concurrency
+      is smoothed and rounded to a power of two, because Ollama reloads the
+      model whenever num_thread or num_ctx change. A new level is only taken
+      once the load has pointed away from the current one for `settle_after`
+      seconds, so a load hovering near a boundary does not flip it.
+    - num_ctx: the smallest configured size that holds prompt and response.
+      A larger size loaded for an earlier prompt is kept for `shrink_after`
+      seconds instead of reloading back and forth.
+    - num_predict: the requested limit, cut to what still fits in the context.
+      Cuts are logged and counted in video_ai_ollama_num_predict_truncated_total.
+
+    Prompt sizes are estimated from their length (estimate_tokens) and scaled
+    per model by the measured ratio of Ollama's prompt_eval_count to that
+    estimate (see record_prompt).
+
+    A calibration profile (see calibrate_main) replaces the cores/concurrency
+    rule with the measured best thread count per concurrency level.
+    """
+
+    def __init__(self, cores: int, context_sizes: Optional[List[int]] = None,
+                 threads_by_concurrency: Optional[Dict[Any, int]] = None,
+                 smoothing: float = 0.2, shrink_after: float = 600.0, settle_after: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.cores = max(1, cores)
+        self.context_sizes = sorted(context_sizes or DEFAULT_CONTEXT_SIZES)
+        self.threads_by_concurrency = {int(level): int(threads)
+                                       for level, threads in (threads_by_concurrency or {}).items()}
+        self.smoothing = smoothing
+        self.shrink_after = shrink_after
+        self.settle_after = settle_after
+        self.clock = clock
+        self.logger = logging.getLogger(__name__)
+        self._load = 1.0
+        self._level_now = 1
+        self._level_since: Optional[float] = None  # when the load first pointed to another level
+        self._contexts: Dict[str, Tuple[int, float]] = {}  # model -> (num_ctx, when it was last needed)
+        self._token_ratio: Dict[str, float] = {}  # model -> smoothed prompt_eval_count / estimate
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_profile(cls, path: str, cores: Optional[int] = None) -> "InferenceTuner":
+        """Tuner using a saved calibration profile, or detected defaults if there is none"""
+        profile = {}
+        if path and os.path.exists(path):
+            try:
+                with open(path) as f:
+                    profile = json.load(f)
+            except (OSError, ValueError) as e:
+                logging.getLogger(__name__).error(f"Ignoring unreadable tuning profile {path}: {e}")
+        return cls(
+            cores=cores or profile.get('cores') or detect_cores(),
+            context_sizes=profile.get('context_sizes'),
+            threads_by_concurrency=profile.get('threads'),
+        )
+
+    def observe(self, concurrency: float):
+        """Book the concurrency seen by a request that is about to be sent to Ollama"""
+        now = self.clock()
+        with self._lock:
+            self._load += self.smoothing * (concurrency - self._load)
+            target = self._level(self._load)
+            if target == self._level_now:
+                self._level_since = None
+                return
+            if self._level_since is None:
+                self._level_since = now
+            if now - self._level_since >= self.settle_after:
+                self._level_now = target
+                self._level_since = None
+
+    def concurrency_level(self) -> int:
+        """Smoothed concurrency rounded to a power of two, held while the load settles"""
+        with self._lock:
+            return self._level_now
+
+    @staticmethod
+    def _level(load: float) -> int:
+        return 1 << max(0, round(math.log2(max(1.0, load))))
+
+    def threads(self) -> int:
+        return self._threads_for(self.concurrency_level())
+
+    def _threads_for(self, level: int) -> int:
+        if self.threads_by_concurrency:
+            measured = [known for known in sorted(self.threads_by_concurrency) if known <= level]
+            known = measured[-1] if measured else min(self.threads_by_concurrency)
+            # Beyond the calibrated levels, share the measured threads out further
+            return max(1, self.threads_by_concurrency[known] * known // level)
+        return max(1, self.cores // level)
+
+    def context(self, model: str, tokens: int) -> int:
+        """Context size for `tokens` of prompt plus response"""
+        fits = next((size for size in self.context_sizes if size >= tokens), self.context_sizes[-1])
+        now = self.clock()
+        with self._lock:
+            current, last_needed = self._contexts.get(model, (0, 0.0))
+            if fits >= current or now - last_needed > self.shrink_after:
+                self._contexts[model] = (fits, now)
+                return fits
+            return current
+
+    def record_prompt(self, model: str, estimated: int, evaluated: int):
+        """Calibrate the prompt size estimate with the prompt_eval_count Ollama reported"""
+        if estimated <= 0 or evaluated <= 0:
+            return
+        ratio = evaluated / estimated
+        low, high = TOKEN_RATIO_BOUNDS
+        if ratio < low:
+            return
+        with self._lock:
+            current = self._token_ratio.get(model)
+            ratio = min(ratio, high)
+            self._token_ratio[model] = ratio if current is None else current + self.smoothing * (ratio - current)
+
+    def token_ratio(self, model: str) -> float:
+        """Measured prompt tokens per estimate_tokens() token for this model (1.0 until measured)"""
+        with self._lock:
+            return self._token_ratio.get(model, 1.0)
+
+    def prompt_tokens(self, model: str, estimated: int) -> int:
+        """An estimate_tokens() count corrected by what Ollama measured for this model"""
+        return math.ceil(estimated * self.token_ratio(model))
+
+    def options(self, model: str, prompt_tokens: int, max_tokens: int,
+                num_ctx: Optional[int] = None, report: bool = True) -> Dict[str, int]:
+        """
+        Options for one request that is about to be sent; prompt_tokens is the
+        estimate_tokens() count of its prompt. A caller-fixed num_ctx is kept and
+        only bounds num_predict. report=False skips logging and counting a cut
+        num_predict, for callers that replace it anyway.
+        Does not change the load, which the client books in observe().
+        """
+        prompt_tokens = self.prompt_tokens(model, prompt_tokens)
+        if num_ctx is None:
+            num_ctx = self.context(model, prompt_tokens + max_tokens + CONTEXT_MARGIN)
+        room = num_ctx - prompt_tokens - CONTEXT_MARGIN
+        if room < max_tokens and report:
+            if room < CONTEXT_MARGIN:
+                ollama_truncated_responses.inc(model=model, reason="floor")
+                self.logger.warning(f"Prompt of ~{prompt_tokens} tokens leaves no room in num_ctx {num_ctx}; "
+                                    f"num_predict {max_tokens} cut to {CONTEXT_MARGIN} and Ollama will drop "
+                                    f"the start of the prompt")
+            else:
+                ollama_truncated_responses.inc(model=model, reason="context")
+                self.logger.info(f"num_predict {max_tokens} cut to {room} to fit num_ctx {num_ctx}")
+        return {
+            'num_thread': self.threads(),
+            'num_ctx': num_ctx,
+            'num_predict': max(CONTEXT_MARGIN, min(max_tokens, room)),
+        }
+
+    def resident_options(self, model: str) -> Dict[str, int]:
+        """Load options matching what requests currently use, so preloading does not cause a reload"""
+        with self._lock:
+            level = self._level_now
+            num_ctx = self._contexts.get(model, (self.context_sizes[0], 0.0))[0]
+        return {
+            'num_thread': self._threads_for(level),
+            'num_ctx': num_ctx,
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'cores': self.cores,
+                'concurrency': round(self._load, 2),
+                'concurrency_level': self._level_now,
+                'context_sizes': self.context_sizes,
+                'calibrated_threads': self.threads_by_concurrency or None,
+                'num_ctx': {model: size for model, (size, _) in self._contexts.items()},
+                'prompt_token_ratio': {model: round(ratio, 3) for model, ratio in self._token_ratio.items()},
+            }
+
+
+def _calibration_request(url: str, model: str, prompt: str, threads: int, num_ctx: int,
+                         timeout: float) -> Dict[str, Any]:
+    import requests
+    response = requests.post(f"{url}/api/generate", json={
+        "model": model,
+        "prompt": prompt,
+        "stream": False,
+        "options": {"num_thread": threads, "num_ctx": num_ctx, "num_predict": 128, "temperature": 0},
+    }, timeout=timeout)
+    response.raise_for_status()
+    return response.json()
+
+
+def calibrate_main(argv: List[str]):
+    """Benchmark num_thread per concurrency level against a live Ollama server and save a profile"""
+    from ai.ollama_client import ollama_client
+
+    cores = detect_cores()
+    candidates = sorted({max(1, cores >> shift) for shift in range(4)} | {cores})
+    parser = argparse.ArgumentParser(prog="main.py calibrate",
+                                     description="Measure the best Ollama num_thread per concurrency level.")
+    parser.add_argument("--url", default=ollama_client.base_url, help="Ollama server to benchmark")
+    parser.add_argument("--model", default=ollama_client.model)
+    parser.add_argument("--cores", type=int, default=cores, help="physical cores of the Ollama host")
+    parser.add_argument("--threads", default=",".join(map(str, candidates)), help="num_thread values to try")
+    parser.add_argument("--levels", default="1,2,4", help="concurrent requests to measure")
+    parser.add_argument("--context-sizes", default=",".join(map(str, DEFAULT_CONTEXT_SIZES)),
+                        help="num_ctx sizes the tuner may use (largest must fit in memory)")
+    parser.add_argument("--prompt-tokens", type=int, default=1200, help="approximate prompt length")
+    parser.add_argument("--timeout", type=float, default=600.0)
+    parser.add_argument("-o", "--output", default=os.environ.get("OLLAMA_TUNING_PROFILE", DEFAULT_PROFILE_PATH))
+    args = parser.parse_args(argv)
+
+    threads_options = [int(value) for value in args.threads.split(",")]
+    levels = [int(value) for value in args.levels.split(",")]
+    context_sizes = sorted(int(value) for value in args.context_sizes.split(","))
+    filler = ("The lecture explains how neural networks learn from data by gradient descent, "
+              "and how the learning rate controls the size of every update. ")
+    body = filler * max(1, args.prompt_tokens * 4 // len(filler))
+    num_ctx = next((size for size in context_sizes if size >= args.prompt_tokens + 256), context_sizes[-1])
+
+    print(f"🧪 Calibrating {args.model} at {args.url} ({args.cores} cores, num_ctx {num_ctx})")
+    print(f"{'threads':>8}{'conc':>6}{'wall s':>9}{'req/s':>8}{'prompt tok/s':>14}{'gen tok/s':>11}")
+    measurements = []
+    for threads in threads_options:
+        # Changing num_thread reloads the model; keep that out of the measurement
+        _calibration_request(args.url, args.model, "Say OK.", threads, num_ctx, args.timeout)
+        for level in levels:
+            # A unique first line per request defeats Ollama's prompt cache
+            prompts = [f"Run {threads}-{level}-{i}-{time.time()}: summarize this.\n{body}" for i in range(level)]
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=level) as pool:
+                results = list(pool.map(lambda prompt: _calibration_request(
+                    args.url, args.model, prompt, threads, num_ctx, args.timeout), prompts))
+            wall = time.perf_counter() - start
+            prompt_rate = sum(r.get('prompt_eval_count', 0) for r in results) / wall
+            gen_rate = sum(r.get('eval_count', 0) for r in results) / wall
+            measurements.append({'threads': threads, 'concurrency': level, 'wall_seconds': round(wall, 3),
+                                 'requests_per_second': round(level / wall, 4),
+                                 'prompt_tokens_per_second': round(prompt_rate, 1),
+                                 'generated_tokens_per_second': round(gen_rate, 1)})
+            print(f"{threads:>8}{level:>6}{wall:>9.2f}{level / wall:>8.3f}{prompt_rate:>14.1f}{gen_rate:>11.1f}")
+
+    best = {}
+    for level in levels:
+        runs = [m for m in measurements if m['concurrency'] == level]
+        best[str(level)] = max(runs, key=lambda m: m['requests_per_second'])['threads']
+    profile = {
+        'created': time.strftime("%Y-%m-%dT%H:%M:%S"),
+        'url': args.url,
+        'model': args.model,
+        'cores': args.cores,
+        'context_sizes': context_sizes,
+        'threads': best,
+        'measurements': measurements,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(profile, f, indent=2)
+    print(f"✅ Best num_thread per concurrency level: {best}")
+    print(f"💾 Profile saved to {args.output} (restart the server to use it)")
+
+
+# Global tuner instance.
+# OLLAMA_TUNING=off sends the fixed num_thread/num_ctx of earlier releases;
+# OLLAMA_HOST_CORES describes the Ollama host when it is not this machine.
+inference_tuner = None if os.environ.get("OLLAMA_TUNING", "auto") == "off" else InferenceTuner.from_profile(
+    os.environ.get("OLLAMA_TUNING_PROFILE", DEFAULT_PROFILE_PATH),
+    cores=int(os.environ["OLLAMA_HOST_CORES"]) if os.environ.get("OLLAMA_HOST_CORES") else None,
+)
@@ -0,0 +1,180 @@
+import json
+from typing import Any, Dict, List, Optional
+
+from ai.ollama_client import ollama_client, estimate_tokens
+from ai.async_client import async_ollama_client
+from analyzer.summarizer import Summarizer
+from analyzer.study_guide import StudyGuide
+from analyzer.topic_recommender import TopicRecommender
+from analyzer.quiz_generator import QuizGenerator
+
+# One request for all four sections, answered as a single JSON object
+COMBINED_PROMPT = """Analyze this video transcript and answer with one JSON object with exactly these keys:
+        "summary": string, under 150 words: main topic, 3-5 most important points, practical takeaways
+        "study_guide": object with lists of short strings "key_concepts" (3-5), "learning_objectives",
+            "study_strategies", "practical_applications", "further_reading"
+        "topics": list of 5-7 objects {"name", "why" (1 sentence), "level" (Beginner/Intermediate/Advanced)}
+        "quiz": list of 5-7 objects {"question", "options" (4 strings, or [] for short answer),
+            "answer", "explanation", "difficulty" (Easy/Medium/Hard)}
+        Use only information from the transcript. Output JSON only."""
+
+COMBINED_TOKENS = 1400
+# The answer is several times longer than any single-section answer, so without a tuner
+# (which sizes num_ctx from prompt and answer) it needs a larger window than the client's
+COMBINED_CONTEXT_WINDOW = 4096
+
+GUIDE_SECTIONS = [
+    ("key_concepts", "🔑 KEY CONCEPTS"),
+    ("learning_objectives", "🎯 LEARNING OBJECTIVES"),
+    ("study_strategies", "📖 STUDY STRATEGIES"),
+    ("practical_applications", "🛠️ PRACTICAL APPLICATIONS"),
+    ("further_reading", "📚 FURTHER READING"),
+]
+
+def parse_json_object(text: str) -> Dict[str, Any]:
+    """Parse a model response as a JSON object, tolerating text around it; {} if there is none"""
+    if not text:
+        return {}
+    try:
+        data = json.loads(text)
+    except ValueError:
+        start, end = text.find('{'), text.rfind('}')
+        if start < 0 or end <= start:
+            return {}
+        try:
+            data = json.loads(text[start:end + 1])
+        except ValueError:
+            return {}
+    return data if isinstance(data, dict) else {}
+
+def _items(value: Any) -> List[str]:
+    """Non-empty strings from a JSON list (or a lone string)"""
+    if isinstance(value, str):
+        value = [value]
+    if not isinstance(value, list):
+        return []
+    return [str(item).strip() for item in value if isinstance(item, (str, int, float)) and str(item).strip()]
+
+class CombinedAnalyzer:
+    """
+    Generates summary, study guide, topics and quiz with one LLM call in
+    Ollama's JSON mode, instead of one call per section.
+    Each section is rendered into the same text the separate analyzers
+    produce; a section that is missing or malformed comes back as None so the
+    caller can generate just that one separately.
+    """
+
+    SECTIONS = ("summary", "guide", "topics", "quizzes")
+
+    def __init__(self, context_window: int = COMBINED_CONTEXT_WINDOW):
+        self.client = ollama_client
+        self.async_client = async_ollama_client
+        self.context_window = context_window
+        self.summarizer = Summarizer()
+        self.study_guide = StudyGuide()
+        self.topic_recommender = TopicRecommender()
+        self.quiz_generator = QuizGenerator()
+
+    def _request_kwargs(self) -> Dict[str, Any]:
+        kwargs = {'max_tokens': COMBINED_TOKENS, 'format': "json"}
+        # A fixed num_ctx next to tuner-sized requests would make Ollama reload the model back and forth
+        if self.client.tuner is None:
+            kwargs['options'] = {"num_ctx": self.context_window}
+        return kwargs
+
+    def _fits(self, text: str) -> bool:
+        if self.client.tuner is not None:
+            return estimate_tokens(text) <= self.client.prompt_budget(COMBINED_PROMPT, COMBINED_TOKENS)
+        overhead = estimate_tokens(self.client._optimize_prompt(COMBINED_PROMPT))
+        return estimate_tokens(text) <= self.context_window - overhead - COMBINED_TOKENS - 64
+
+    def analyze(self, transcript: str) -> Dict[str, Optional[str]]:
+        """Run the combined request; sections that could not be parsed are None"""
+        if not transcript or len(transcript.strip()) < 50:
+            return dict.fromkeys(self.SECTIONS)
+        try:
+            # Long transcripts are condensed with the summarizer's map-reduce first
+            text = transcript if self._fits(transcript) else self.summarizer._reduce(transcript)
+            response = self.client.generate(COMBINED_PROMPT, text, **self._request_kwargs())
+        except Exception as e:
+            print(f"AI combined analysis failed: {e}")
+            response = ""
+        return self.parse(response)
+
+    async def analyze_async(self, transcript: str) -> Dict[str, Optional[str]]:
+        """Async version of analyze() that awaits the pooled Ollama client"""
+        if not transcript or len(transcript.strip()) < 50:
+            return dict.fromkeys(self.SECTIONS)
+        try:
+            text = transcript if self._fits(transcript) else await self.summarizer._reduce_async(transcript)
+            response = await self.async_client.generate_async(COMBINED_PROMPT, text, **self._request_kwargs())
+        except Exception as e:
+            print(f"AI combined analysis failed: {e}")
+            response = ""
+        return self.parse(response)
+
+    def parse(self, response: str) -> Dict[str, Optional[str]]:
+        """Render each section of a combined JSON response into the usual text shape"""
+        data = parse_json_object(response)
+        sections = {
+            'summary': self._summary(data.get("summary")),
+            'guide': self._guide(data.get("study_guide")),
+            'topics': self._topics(data.get("topics")),
+            'quizzes': self._quizzes(data.get("quiz")),
+        }
+        missing = [name for name, value in sections.items() if value is None]
+        if missing:
+            print(f"⚠️ Combined analysis is missing {', '.join(missing)}; generating separately")
+        return sections
+
+    def _summary(self, value: Any) -> Optional[str]:
+        if isinstance(value, str) and len(value.strip()) >= 20:
+            return value.strip()
+        return None
+
+    def _guide(self, value: Any) -> Optional[str]:
+        if isinstance(value, str):
+            return self.study_guide.format_guide(value.strip()) if len(value.strip()) > 50 else None
+        if not isinstance(value, dict) or not _items(value.get("key_concepts")):
+            return None
+        blocks = []
+        for key, heading in GUIDE_SECTIONS:
+            items = _items(value.get(key))
+            if items:
+                blocks.append("\n".join([f"{heading}:"] + [f"• {item}" for item in items]))
+        return self.study_guide.format_guide("\n\n".join(blocks))
+
+    def _topics(self, value: Any) -> Optional[str]:
+        if not isinstance(value, list):
+            return None
+        lines = []
+        for topic in value:
+            if isinstance(topic, str) and topic.strip():
+                lines.append(f"{len(lines) + 1}. {topic.strip()}")
+            elif isinstance(topic, dict) and str(topic.get("name") or "").strip():
+                line = f"{len(lines) + 1}. {str(topic['name']).strip()}"
+                if topic.get("level"):
+                    line += f" ({topic['level']})"
+                if topic.get("why"):
+                    line += f"\n   {topic['why']}"
+                lines.append(line)
+        return self.topic_recommender.format_topics("\n".join(lines)) if len(lines) >= 3 else None
+
+    def _quizzes(self, value: Any) -> Optional[str]:
+        if not isinstance(value, list):
+            return None
+        questions = []
+        for item in value:
+            if not isinstance(item, dict) or not str(item.get("question") or "").strip():
+                continue
+            lines = [f"Q{len(questions) + 1}. {str(item['question']).strip()}"]
+            if item.get("difficulty"):
+                lines[0] += f" [{item['difficulty']}]"
+            for letter, option in zip("ABCD", _items(item.get("options"))):
+                lines.append(f"   {letter}) {option}")
+            if item.get("answer"):
+                lines.append(f"   Answer: {item['answer']}")
+            if item.get("explanation"):
+                lines.append(f"   Explanation: {item['explanation']}")
+            questions.append("\n".join(lines))
+        return self.quiz_generator.format_quizzes("\n\n".join(questions)) if len(questions) >= 3 else None
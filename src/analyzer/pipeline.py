@@ -0,0 +1,226 @@
+import os
+import uuid
+import asyncio
+import time
+from typing import Callable, Awaitable, Dict, Any, Iterable, List, Optional
+
+from analyzer.summarizer import Summarizer, SUMMARY_PROMPT, SUMMARY_TOKENS
+from analyzer.study_guide import StudyGuide
+from analyzer.topic_recommender import TopicRecommender
+from analyzer.quiz_generator import QuizGenerator
+from analyzer.combined import CombinedAnalyzer
+from ai.ollama_client import OllamaSession, model_override, backend_affinity, estimate_tokens
+from ai.async_client import async_ollama_client
+from ai.model_policy import model_policy
+from utils.metrics import stage_seconds
+
+# "pipeline" asks the LLM once per section, "combined" asks for all sections in one JSON response
+ANALYSIS_MODE = os.environ.get("ANALYSIS_MODE", "pipeline")
+ANALYSIS_MODES = ("pipeline", "combined")
+# Stages that read the transcript share one Ollama session, so it is evaluated once per video
+SESSION_REUSE = os.environ.get("OLLAMA_SESSION_REUSE", "1") != "0"
+
+
+class Stage:
+    """A named async step and the names of the results it needs"""
+
+    def __init__(self, name: str, func: Callable[[Dict[str, Any]], Awaitable[Any]],
+                 depends_on: Iterable[str] = ()):
+        self.name = name
+        self.func = func
+        self.depends_on = list(depends_on)
+
+
+class PipelineResult:
+    def __init__(self, results: Dict[str, Any], timings: Dict[str, float], total: float):
+        self.results = results
+        self.timings = timings  # seconds spent inside each stage
+        self.total = total      # wall-clock seconds for the whole run
+
+    def __getitem__(self, name: str):
+        return self.results[name]
+
+
+class AnalysisPipeline:
+    """
+    Runs stages as soon as their dependencies are done.
+    Independent stages run concurrently, so end-to-end latency follows the
+    critical path instead of the sum of all stages.
+    """
+
+    def __init__(self, stages: List[Stage], inputs: Iterable[str] = ()):
+        self.stages = {stage.name: stage for stage in stages}
+        self.inputs = set(inputs)
+        self._validate()
+
+    def _validate(self):
+        known = self.inputs | set(self.stages)
+        for stage in self.stages.values():
+            missing = [dep for dep in stage.depends_on if dep not in known]
+            if missing:
+                raise ValueError(f"Stage '{stage.name}' depends on unknown stage(s): {missing}")
+
+        # Depth-first search for dependency cycles
+        state: Dict[str, int] = {}
+
+        def visit(name: str):
+            if name in self.inputs or state.get(name) == 2:
+                return
+            if state.get(name) == 1:
+                raise ValueError(f"Dependency cycle through stage '{name}'")
+            state[name] = 1
+            for dep in self.stages[name].depends_on:
+                visit(dep)
+            state[name] = 2
+
+        for name in self.stages:
+            visit(name)
+
+    async def run(self, on_stage: Optional[Callable[[str, str, Dict[str, Any]], Any]] = None,
+                  **inputs) -> PipelineResult:
+        """
+        Run every stage and return all results with per-stage timings.
+        on_stage(event, stage_name, info) is called with "start" and "end" events.
+        """
+        missing = self.inputs - set(inputs)
+        if missing:
+            raise ValueError(f"Missing pipeline inputs: {sorted(missing)}")
+
+        results: Dict[str, Any] = dict(inputs)
+        timings: Dict[str, float] = {}
+        tasks: Dict[str, asyncio.Task] = {}
+        started = time.perf_counter()
+
+        async def run_stage(stage: Stage):
+            if stage.depends_on:
+                await asyncio.gather(*(tasks[dep] for dep in stage.depends_on if dep in tasks))
+            if on_stage:
+                on_stage("start", stage.name, {})
+            stage_start = time.perf_counter()
+            results[stage.name] = await stage.func(results)
+            timings[stage.name] = time.perf_counter() - stage_start
+            if on_stage:
+                on_stage("end", stage.name, {'seconds': timings[stage.name]})
+
+        for stage in self.stages.values():
+            tasks[stage.name] = asyncio.ensure_future(run_stage(stage))
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            raise
+
+        return PipelineResult(results, timings, time.perf_counter() - started)
+
+
+def build_analysis_pipeline(emit: Optional[Callable[[str, Dict[str, Any]], Any]] = None) -> AnalysisPipeline:
+    """
+    The standard summary -> guide -> quiz chain, with topics alongside it.
+    If emit is given, LLM tokens are streamed to it as ("token", {...}) events.
+    The "session" input is an OllamaSession over the transcript, or None.
+    """
+    summarizer = Summarizer()
+    study_guide = StudyGuide()
+    topic_recommender = TopicRecommender()
+    quiz_generator = QuizGenerator()
+
+    def tokens_for(stage: str):
+        if emit is None:
+            return None
+        return lambda token: emit("token", {'stage': stage, 'text': token})
+
+    return AnalysisPipeline([
+        Stage("summary", lambda r: summarizer.summarize_async(
+            r["transcript"], on_token=tokens_for("summary"), session=r["session"]), ["transcript", "session"]),
+        Stage("guide", lambda r: study_guide.create_guide_async(
+            r["summary"], on_token=tokens_for("guide")), ["summary"]),
+        Stage("quizzes", lambda r: quiz_generator.generate_quizzes_async(
+            r["guide"], on_token=tokens_for("quizzes")), ["guide"]),
+        Stage("topics", lambda r: topic_recommender.recommend_topics_async(
+            r["transcript"], on_token=tokens_for("topics"), session=r["session"]), ["transcript", "session"]),
+    ], inputs=["transcript", "session"])
+
+
+def build_combined_pipeline(emit: Optional[Callable[[str, Dict[str, Any]], Any]] = None) -> AnalysisPipeline:
+    """
+    One JSON-mode request for all sections, then a stage per section that
+    takes it from the combined answer or, if it is missing there, generates it
+    with the usual analyzer (in the usual dependency order).
+    """
+    combined = CombinedAnalyzer()
+
+    def tokens_for(stage: str):
+        if emit is None:
+            return None
+        return lambda token: emit("token", {'stage': stage, 'text': token})
+
+    def section(stage: str, fallback: Callable[[Dict[str, Any]], Awaitable[Any]]):
+        async def func(results: Dict[str, Any]):
+            value = results["combined"][stage]
+            if value is None:
+                return await fallback(results)
+            on_token = tokens_for(stage)
+            if on_token:
+                on_token(value)
+            return value
+        return func
+
+    return AnalysisPipeline([
+        Stage("combined", lambda r: combined.analyze_async(r["transcript"]), ["transcript"]),
+        Stage("summary", section("summary", lambda r: combined.summarizer.summarize_async(
+            r["transcript"], on_token=tokens_for("summary"), session=r["session"])), ["combined"]),
+        Stage("guide", section("guide", lambda r: combined.study_guide.create_guide_async(
+            r["summary"], on_token=tokens_for("guide"))), ["combined", "summary"]),
+        Stage("quizzes", section("quizzes", lambda r: combined.quiz_generator.generate_quizzes_async(
+            r["guide"], on_token=tokens_for("quizzes"))), ["combined", "guide"]),
+        Stage("topics", section("topics", lambda r: combined.topic_recommender.recommend_topics_async(
+            r["transcript"], on_token=tokens_for("topics"), session=r["session"])), ["combined"]),
+    ], inputs=["transcript", "session"])
+
+
+def transcript_session(transcript: str) -> Optional[OllamaSession]:
+    """
+    Session over the transcript when the stages would send it unreduced;
+    transcripts that need map-reduce are not shared verbatim, so they get None.
+    """
+    if not SESSION_REUSE or not transcript:
+        return None
+    if estimate_tokens(transcript) > async_ollama_client.prompt_budget(SUMMARY_PROMPT, SUMMARY_TOKENS):
+        return None
+    return async_ollama_client.open_session(transcript)
+
+
+async def run_analysis(transcript: str, emit: Optional[Callable[[str, Dict[str, Any]], Any]] = None,
+                       llm_model: Optional[str] = None, mode: Optional[str] = None, **kwargs) -> PipelineResult:
+    """
+    Run all four analysis stages on a transcript, optionally streaming events to emit.
+    llm_model overrides the Ollama model for every stage of this analysis.
+    mode is "pipeline" or "combined" (default: ANALYSIS_MODE).
+    """
+    mode = mode or ANALYSIS_MODE
+    if mode not in ANALYSIS_MODES:
+        raise ValueError(f"Unknown analysis mode '{mode}', expected one of {ANALYSIS_MODES}")
+    build = build_combined_pipeline if mode == "combined" else build_analysis_pipeline
+
+    def on_stage(event: str, stage: str, info: Dict[str, Any]):
+        emit("stage", dict(info, stage=stage, status=event))
+
+    # Stage tasks copy the context when they are created, so they all see the override,
+    # and the whole analysis prefers one Ollama backend
+    affinity = uuid.uuid4().hex
+    token = model_override.set(llm_model)
+    affinity_token = backend_affinity.set(affinity)
+    try:
+        result = await build(emit).run(transcript=transcript, session=transcript_session(transcript),
+                                       on_stage=on_stage if emit else None, **kwargs)
+    finally:
+        backend_affinity.reset(affinity_token)
+        model_override.reset(token)
+        async_ollama_client.pool.forget(affinity)
+    model_policy.observe_analysis(llm_model or async_ollama_client.model, result.total)
+    for name, seconds in result.timings.items():
+        stage_seconds.observe(seconds, stage=name)
+    timing_report = ", ".join(f"{name} {seconds:.1f}s" for name, seconds in result.timings.items())
+    print(f"⏱️ Analysis stages: {timing_report} (total {result.total:.1f}s)")
+    return result
@@ -1,19 +1,8 @@
 from ai.ollama_client import ollama_client
+from ai.async_client import async_ollama_client
 
-class QuizGenerator:
-    def __init__(self):
-        self.client = ollama_client
-
-    def generate_quizzes(self, study_guide):
-        """
-        Generate intelligent quiz questions using AI analysis.
-        Creates varied question types that test different levels of understanding.
-        """
-        if not study_guide or len(study_guide.strip()) < 50:
-            return self._fallback_quizzes()
-        
-        # Optimized prompt for quiz generation
-        prompt = """Create 5-7 quiz questions based on this study guide. Include:
+# Optimized prompt for quiz generation
+QUIZ_PROMPT = """Create 5-7 quiz questions based on this study guide. Include:
         
         1. Multiple choice questions (with 4 options each)
         2. Short answer questions
@@ -31,16 +20,47 @@ class QuizGenerator:
         - Knowledge retention
         
         Format clearly with Q1, Q2, etc."""
+
+class QuizGenerator:
+    def __init__(self):
+        self.client = ollama_client
+        self.async_client = async_ollama_client
+
+    def generate_quizzes(self, study_guide):
+        """
+        Generate intelligent quiz questions using AI analysis.
+        Creates varied question types that test different levels of understanding.
+        """
+        if not study_guide or len(study_guide.strip()) < 50:
+            return self._fallback_quizzes()
         
         try:
-            quizzes = self.client.generate(prompt, study_guide, max_tokens=600)
+            quizzes = self.client.generate(QUIZ_PROMPT, study_guide, max_tokens=600)
             if quizzes and len(quizzes.strip()) > 200:
-                return f"❓ AI-GENERATED QUIZ QUESTIONS\n{'='*50}\n\n{quizzes}\n\n💡 TIP: Test yourself regularly to reinforce learning!"
+                return self.format_quizzes(quizzes)
         except Exception as e:
             print(f"AI quiz generation failed: {e}")
         
         return self._fallback_quizzes()
     
+    async def generate_quizzes_async(self, study_guide, on_token=None):
+        """Async version of generate_quizzes() that awaits the pooled Ollama client"""
+        if not study_guide or len(study_guide.strip()) < 50:
+            return self._fallback_quizzes()
+        
+        try:
+            quizzes = await self.async_client.generate_async(QUIZ_PROMPT, study_guide, max_tokens=600, on_token=on_token)
+            if quizzes and len(quizzes.strip()) > 200:
+                return self.format_quizzes(quizzes)
+        except Exception as e:
+            print(f"AI quiz generation failed: {e}")
+        
+        return self._fallback_quizzes()
+    
+    def format_quizzes(self, quizzes):
+        """Wrap AI-written questions in the standard heading and tip"""
+        return f"❓ AI-GENERATED QUIZ QUESTIONS\n{'='*50}\n\n{quizzes}\n\n💡 TIP: Test yourself regularly to reinforce learning!"
+    
     def _fallback_quizzes(self):
         """Fallback quiz questions when AI is unavailable"""
         quiz_content = []
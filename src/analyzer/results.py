@@ -0,0 +1,30 @@
+import os
+import sys
+import importlib.util
+
+# src/types shares its name with the standard library's `types` module, which is
+# always imported first, so the record definitions are loaded from their file.
+_spec = importlib.util.spec_from_file_location(
+    "video_ai_types", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "types", "index.py")
+)
+_types = importlib.util.module_from_spec(_spec)
+sys.modules[_spec.name] = _types
+_spec.loader.exec_module(_types)
+
+dumps = _types.dumps
+VideoAIAnalyzerTypes = _types.VideoAIAnalyzerTypes
+AnalysisResult = VideoAIAnalyzerTypes.AnalysisResult
+VideoInfo = VideoAIAnalyzerTypes.VideoInfo
+
+
+def build_result(transcript, analysis, video_info=None):
+    """Assemble an AnalysisResult from a transcript and a finished analysis pipeline"""
+    return AnalysisResult(
+        transcript=transcript,
+        summary=analysis["summary"],
+        guide=analysis["guide"],
+        topics=analysis["topics"],
+        quizzes=analysis["quizzes"],
+        video=VideoInfo.from_dict(video_info) if video_info else None,
+        timings={name: round(seconds, 3) for name, seconds in analysis.timings.items()},
+    )
@@ -1,8 +1,21 @@
 from ai.ollama_client import ollama_client
+from ai.async_client import async_ollama_client
+
+# Optimized prompt for study guide generation
+STUDY_GUIDE_PROMPT = """Create a comprehensive study guide from this summary. Include:
+        
+        1. KEY CONCEPTS (3-5 main ideas)
+        2. LEARNING OBJECTIVES (what to achieve)
+        3. STUDY STRATEGIES (how to learn effectively)
+        4. PRACTICAL APPLICATIONS (real-world uses)
+        5. FURTHER READING SUGGESTIONS (related topics)
+        
+        Format clearly with emojis and bullet points. Make it actionable and engaging."""
 
 class StudyGuide:
     def __init__(self):
         self.client = ollama_client
+        self.async_client = async_ollama_client
 
     def create_guide(self, summary):
         """
@@ -12,26 +25,33 @@ class StudyGuide:
         if not summary or len(summary.strip()) < 20:
             return self._fallback_guide(summary)
         
-        # Optimized prompt for study guide generation
-        prompt = """Create a comprehensive study guide from this summary. Include:
-        
-        1. KEY CONCEPTS (3-5 main ideas)
-        2. LEARNING OBJECTIVES (what to achieve)
-        3. STUDY STRATEGIES (how to learn effectively)
-        4. PRACTICAL APPLICATIONS (real-world uses)
-        5. FURTHER READING SUGGESTIONS (related topics)
+        try:
+            guide = self.client.generate(STUDY_GUIDE_PROMPT, summary, max_tokens=400)
+            if guide and len(guide.strip()) > 50:
+                return self.format_guide(guide)
+        except Exception as e:
+            print(f"AI study guide generation failed: {e}")
         
-        Format clearly with emojis and bullet points. Make it actionable and engaging."""
+        return self._fallback_guide(summary)
+    
+    async def create_guide_async(self, summary, on_token=None):
+        """Async version of create_guide() that awaits the pooled Ollama client"""
+        if not summary or len(summary.strip()) < 20:
+            return self._fallback_guide(summary)
         
         try:
-            guide = self.client.generate(prompt, summary, max_tokens=400)
+            guide = await self.async_client.generate_async(STUDY_GUIDE_PROMPT, summary, max_tokens=400, on_token=on_token)
             if guide and len(guide.strip()) > 50:
-                return f"📚 AI-GENERATED STUDY GUIDE\n{'='*50}\n\n{guide}"
+                return self.format_guide(guide)
         except Exception as e:
             print(f"AI study guide generation failed: {e}")
         
         return self._fallback_guide(summary)
     
+    def format_guide(self, guide):
+        """Wrap an AI-written guide in the standard heading"""
+        return f"📚 AI-GENERATED STUDY GUIDE\n{'='*50}\n\n{guide}"
+    
     def _fallback_guide(self, summary):
         """Fallback study guide when AI is unavailable"""
         guide_content = []
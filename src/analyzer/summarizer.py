@@ -1,33 +1,132 @@
-from ai.ollama_client import ollama_client
+import re
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from ai.ollama_client import ollama_client, estimate_tokens
+from ai.async_client import async_ollama_client
+
+# Optimized prompt for fast, accurate summarization
+SUMMARY_PROMPT = """Create a concise, informative summary of this video transcript. 
+        Focus on:
+        - Main topic and key message
+        - 3-5 most important points
+        - Practical takeaways
+        
+        Keep it under 150 words and make it actionable."""
+
+# Map step for transcripts that do not fit in the model's context window
+CHUNK_SUMMARY_PROMPT = """Write a summary of this part of a longer video transcript.
+        Keep every key point, definition and example it contains.
+        Use plain sentences and at most 120 words."""
+
+SUMMARY_TOKENS = 200
+CHUNK_SUMMARY_TOKENS = 160
+MAX_REDUCE_LEVELS = 6
+
+def split_text(text, budget_tokens):
+    """Pack whole sentences into chunks of at most budget_tokens (estimated)"""
+    chunks = []
+    current = []
+    current_tokens = 0
+    for sentence in re.split(r'(?<=[.!?])\s+', text.strip()):
+        if not sentence:
+            continue
+        pieces = [sentence]
+        if estimate_tokens(sentence) > budget_tokens:
+            # Unpunctuated run-on text: fall back to word windows
+            words = sentence.split()
+            step = max(1, budget_tokens * 3 // 4)
+            pieces = [' '.join(words[i:i + step]) for i in range(0, len(words), step)]
+        for piece in pieces:
+            tokens = estimate_tokens(piece)
+            if current and current_tokens + tokens > budget_tokens:
+                chunks.append(' '.join(current))
+                current, current_tokens = [], 0
+            current.append(piece)
+            current_tokens += tokens
+    if current:
+        chunks.append(' '.join(current))
+    return chunks
 
 class Summarizer:
     def __init__(self):
         self.client = ollama_client
+        self.async_client = async_ollama_client
     
-    def summarize(self, transcript):
+    def summarize(self, transcript, session=None):
         """
         Generate intelligent summary using Ollama with Meta-style optimizations.
         Focuses on key insights and main points for maximum value.
+        A session over the transcript is used when the transcript fits unreduced.
         """
         if not transcript or len(transcript.strip()) < 50:
             return "Transcript too short for meaningful summary."
         
-        # Optimized prompt for fast, accurate summarization
-        prompt = """Create a concise, informative summary of this video transcript. 
-        Focus on:
-        - Main topic and key message
-        - 3-5 most important points
-        - Practical takeaways
-        
-        Keep it under 150 words and make it actionable."""
+        try:
+            # Long transcripts are summarized chunk by chunk first so nothing is truncated
+            text = self._reduce(transcript)
+            if session is not None and session.document == text:
+                summary = session.generate(SUMMARY_PROMPT, max_tokens=SUMMARY_TOKENS)
+            else:
+                summary = self.client.generate(SUMMARY_PROMPT, text, max_tokens=SUMMARY_TOKENS)
+            return summary if summary else self._fallback_summary(transcript)
+        except Exception as e:
+            print(f"AI summarization failed: {e}")
+            return self._fallback_summary(transcript)
+    
+    async def summarize_async(self, transcript, on_token=None, session=None):
+        """Async version of summarize() that awaits the pooled Ollama client"""
+        if not transcript or len(transcript.strip()) < 50:
+            return "Transcript too short for meaningful summary."
         
         try:
-            summary = self.client.generate(prompt, transcript, max_tokens=200)
+            text = await self._reduce_async(transcript)
+            if session is not None and session.document == text:
+                summary = await session.generate_async(SUMMARY_PROMPT, max_tokens=SUMMARY_TOKENS, on_token=on_token)
+            else:
+                summary = await self.async_client.generate_async(SUMMARY_PROMPT, text, max_tokens=SUMMARY_TOKENS, on_token=on_token)
             return summary if summary else self._fallback_summary(transcript)
         except Exception as e:
             print(f"AI summarization failed: {e}")
             return self._fallback_summary(transcript)
     
+    def _reduce(self, text):
+        """
+        Map-reduce text until it fits in one summary prompt.
+        Each level summarizes token-budgeted chunks in parallel and joins the
+        partial summaries, so the number of levels grows logarithmically.
+        """
+        final_budget = self.client.prompt_budget(SUMMARY_PROMPT, SUMMARY_TOKENS)
+        chunk_budget = self.client.prompt_budget(CHUNK_SUMMARY_PROMPT, CHUNK_SUMMARY_TOKENS)
+        for _ in range(MAX_REDUCE_LEVELS):
+            if estimate_tokens(text) <= final_budget:
+                break
+            chunks = split_text(text, chunk_budget)
+            print(f"🧩 Summarizing {len(chunks)} transcript chunks...")
+            with ThreadPoolExecutor(max_workers=min(len(chunks), 4)) as pool:
+                partials = list(pool.map(
+                    lambda chunk: self.client.generate(CHUNK_SUMMARY_PROMPT, chunk, max_tokens=CHUNK_SUMMARY_TOKENS),
+                    chunks,
+                ))
+            text = '\n'.join(partial for partial in partials if partial)
+        return text
+    
+    async def _reduce_async(self, text):
+        """Async version of _reduce(); chunks are summarized concurrently"""
+        final_budget = self.async_client.prompt_budget(SUMMARY_PROMPT, SUMMARY_TOKENS)
+        chunk_budget = self.async_client.prompt_budget(CHUNK_SUMMARY_PROMPT, CHUNK_SUMMARY_TOKENS)
+        for _ in range(MAX_REDUCE_LEVELS):
+            if estimate_tokens(text) <= final_budget:
+                break
+            chunks = split_text(text, chunk_budget)
+            print(f"🧩 Summarizing {len(chunks)} transcript chunks...")
+            partials = await asyncio.gather(*(
+                self.async_client.generate_async(CHUNK_SUMMARY_PROMPT, chunk, max_tokens=CHUNK_SUMMARY_TOKENS)
+                for chunk in chunks
+            ))
+            text = '\n'.join(partial for partial in partials if partial)
+        return text
+    
     def _fallback_summary(self, transcript):
         """Fallback summary when AI is unavailable"""
         sentences = transcript.split('. ')
@@ -1,19 +1,8 @@
 from ai.ollama_client import ollama_client
+from ai.async_client import async_ollama_client
 
-class TopicRecommender:
-    def __init__(self):
-        self.client = ollama_client
-    
-    def recommend_topics(self, transcript):
-        """
-        Generate intelligent topic recommendations using AI analysis.
-        Provides context-aware suggestions for deeper learning.
-        """
-        if not transcript or len(transcript.strip()) < 50:
-            return self._fallback_topics()
-        
-        # Optimized prompt for topic recommendation
-        prompt = """Analyze this transcript and recommend 5-7 related topics for further study. 
+# Optimized prompt for topic recommendation
+TOPICS_PROMPT = """Analyze this transcript and recommend 5-7 related topics for further study. 
         For each topic, provide:
         - Topic name
         - Why it's relevant (1 sentence)
@@ -26,16 +15,54 @@ class TopicRecommender:
         - Emerging trends in the field
         
         Format as a numbered list with clear explanations."""
+
+class TopicRecommender:
+    def __init__(self):
+        self.client = ollama_client
+        self.async_client = async_ollama_client
+    
+    def recommend_topics(self, transcript, session=None):
+        """
+        Generate intelligent topic recommendations using AI analysis.
+        Provides context-aware suggestions for deeper learning.
+        With a session over the transcript, its prompt evaluation is reused.
+        """
+        if not transcript or len(transcript.strip()) < 50:
+            return self._fallback_topics()
+        
+        try:
+            if session is not None:
+                recommendations = session.generate(TOPICS_PROMPT, max_tokens=500)
+            else:
+                recommendations = self.client.generate(TOPICS_PROMPT, transcript, max_tokens=500)
+            if recommendations and len(recommendations.strip()) > 100:
+                return self.format_topics(recommendations)
+        except Exception as e:
+            print(f"AI topic recommendation failed: {e}")
+        
+        return self._fallback_topics()
+    
+    async def recommend_topics_async(self, transcript, on_token=None, session=None):
+        """Async version of recommend_topics() that awaits the pooled Ollama client"""
+        if not transcript or len(transcript.strip()) < 50:
+            return self._fallback_topics()
         
         try:
-            recommendations = self.client.generate(prompt, transcript, max_tokens=500)
+            if session is not None:
+                recommendations = await session.generate_async(TOPICS_PROMPT, max_tokens=500, on_token=on_token)
+            else:
+                recommendations = await self.async_client.generate_async(TOPICS_PROMPT, transcript, max_tokens=500, on_token=on_token)
             if recommendations and len(recommendations.strip()) > 100:
-                return f"🎯 AI-RECOMMENDED TOPICS FOR FURTHER STUDY\n{'='*60}\n\n{recommendations}\n\n💡 TIP: Start with topics that match your current skill level!"
+                return self.format_topics(recommendations)
         except Exception as e:
             print(f"AI topic recommendation failed: {e}")
         
         return self._fallback_topics()
     
+    def format_topics(self, recommendations):
+        """Wrap AI-written recommendations in the standard heading and tip"""
+        return f"🎯 AI-RECOMMENDED TOPICS FOR FURTHER STUDY\n{'='*60}\n\n{recommendations}\n\n💡 TIP: Start with topics that match your current skill level!"
+    
     def _fallback_topics(self):
         """Fallback topic recommendations when AI is unavailable"""
         result = "🎯 RECOMMENDED TOPICS FOR FURTHER STUDY:\n"
@@ -0,0 +1 @@
+# Makes 'api' a Python package.
\ No newline at end of file
@@ -0,0 +1,155 @@
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from fastapi import APIRouter, FastAPI, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse, StreamingResponse, JSONResponse
+from starlette.background import BackgroundTask
+
+from analyzer.pipeline import run_analysis
+from analyzer.results import build_result
+from offline.processor import VideoProcessor
+from offline.audio import probe_duration
+from ai.model_policy import model_policy
+from ai.async_client import async_ollama_client
+from utils.uploads import receive_upload, UploadError, UploadTooLargeError, UPLOAD_OPENAPI
+from utils.workspace import workspace_manager, MAX_UPLOAD_BYTES
+from utils.sse import analysis_event_stream, SSE_HEADERS
+from utils.json_api import requested_fields, json_response
+from utils.warmup import model_warmer
+from jobs.manager import job_manager
+
+# Routes served by both apps (src/main.py and simple_server.py)
+router = APIRouter(tags=["analysis"])
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start the job workers and warm the models in the background; stop both on shutdown"""
+    workspace_manager.purge_stale()
+    await job_manager.start()
+    model_warmer.start()
+    try:
+        yield
+    finally:
+        await model_warmer.stop()
+        await job_manager.stop()
+        await async_ollama_client.aclose()
+
+
+@router.get("/ready")
+async def ready():
+    """Readiness probe: 200 once the models are loaded, 503 while warming up or if a load failed"""
+    status = model_warmer.status()
+    return JSONResponse(status, status_code=200 if status['ready'] else 503)
+
+
+@router.post("/analyze-video", response_class=PlainTextResponse, openapi_extra=UPLOAD_OPENAPI)
+async def analyze_video(request: Request):
+    # Each request gets its own scratch directory, so concurrent uploads never collide
+    workspace = workspace_manager.create()
+    models = None
+
+    try:
+        video_path, filename, media_digest, _ = await receive_upload(request, workspace, max_bytes=MAX_UPLOAD_BYTES)
+
+        # Pick Whisper/LLM models that keep turnaround within the latency target
+        models = model_policy.admit(await run_in_threadpool(probe_duration, video_path), job_manager.backlog())
+
+        # Initialize analysis components
+        processor = VideoProcessor(video_path, models.whisper_model)
+
+        # Reuse the transcript if these exact bytes were transcribed before
+        print("🎬 Processing video...")
+        transcript, _ = await run_in_threadpool(processor.process_video_cached, media_digest, filename=filename)
+        print("✅ Transcription completed!")
+
+        # Generate analysis results
+        print("📊 Generating analysis...")
+        # Topics run alongside the summary -> guide -> quiz chain
+        analysis = await run_analysis(transcript, llm_model=models.llm_model)
+
+        # Format the results
+        results = build_result(transcript, analysis).to_text()
+
+        print("✅ Analysis completed!")
+        return results
+
+    except Exception as e:
+        print(f"❌ Error during analysis: {e}")
+        return f"Error processing video: {str(e)}"
+    finally:
+        # Clean up the upload and anything else written for this request
+        model_policy.release(models)
+        workspace.cleanup()
+
+
+@router.post("/api/analyze-video", openapi_extra=UPLOAD_OPENAPI)
+async def analyze_video_json(request: Request, fields: Optional[str] = None):
+    """
+    Analyze an uploaded video and return JSON with only the requested fields.
+    ?fields=summary,quizzes selects them; the transcript is left out unless named.
+    """
+    fields = requested_fields(fields)
+    workspace = workspace_manager.create()
+    models = None
+    try:
+        video_path, filename, media_digest, _ = await receive_upload(request, workspace, max_bytes=MAX_UPLOAD_BYTES)
+        models = model_policy.admit(await run_in_threadpool(probe_duration, video_path), job_manager.backlog())
+        processor = VideoProcessor(video_path, models.whisper_model)
+        transcript, _ = await run_in_threadpool(processor.process_video_cached, media_digest, filename=filename)
+        analysis = await run_analysis(transcript, llm_model=models.llm_model)
+        return json_response(build_result(transcript, analysis), fields)
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except UploadError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"❌ Error during analysis: {e}")
+        raise HTTPException(status_code=500, detail=f"Error processing video: {str(e)}")
+    finally:
+        model_policy.release(models)
+        workspace.cleanup()
+
+
+@router.post("/analyze-video/stream", openapi_extra=UPLOAD_OPENAPI)
+async def analyze_video_stream(request: Request):
+    """Analyze an uploaded video, streaming progress and LLM tokens as server-sent events"""
+    # Until the stream takes over, this handler owns the workspace and must remove it on failure
+    workspace = workspace_manager.create()
+    try:
+        video_path, filename, media_digest, _ = await receive_upload(request, workspace, max_bytes=MAX_UPLOAD_BYTES)
+        models = model_policy.admit(await run_in_threadpool(probe_duration, video_path), job_manager.backlog())
+    except UploadTooLargeError as e:
+        workspace.cleanup()
+        raise HTTPException(status_code=413, detail=str(e))
+    except UploadError as e:
+        workspace.cleanup()
+        raise HTTPException(status_code=400, detail=str(e))
+    except BaseException:
+        workspace.cleanup()
+        raise
+
+    def finish():
+        model_policy.release(models)
+        workspace.cleanup()
+
+    async def transcribe():
+        try:
+            processor = VideoProcessor(video_path, models.whisper_model)
+            transcript, _ = await run_in_threadpool(processor.process_video_cached, media_digest, filename=filename)
+            return transcript
+        finally:
+            workspace.cleanup()
+
+    return analysis_stream_response(transcribe, finish, llm_model=models.llm_model)
+
+
+def analysis_stream_response(transcribe, finish, **kwargs) -> StreamingResponse:
+    """SSE response for analysis_event_stream that calls finish() exactly when the stream is over"""
+    # Starlette skips background tasks when the client disconnects, so the stream itself calls
+    # finish(); the background task only covers a stream that never started (both are idempotent)
+    return StreamingResponse(analysis_event_stream(transcribe, on_close=finish, **kwargs),
+                             media_type="text/event-stream", headers=SSE_HEADERS, background=BackgroundTask(finish))
@@ -0,0 +1 @@
+# Makes 'jobs' a Python package.
\ No newline at end of file
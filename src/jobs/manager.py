@@ -0,0 +1,162 @@
+import os
+import time
+import uuid
+import asyncio
+import logging
+import itertools
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from utils.metrics import metrics
+
+
+class QueueFullError(Exception):
+    """Raised when the job queue is at capacity"""
+
+
+class Job:
+    """State of one background analysis, as reported to polling clients"""
+
+    def __init__(self, kind: str, run: Callable[["Job"], Awaitable[Any]],
+                 duration: float = 0.0, info: Optional[Dict[str, Any]] = None):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.run = run
+        self.duration = duration  # media seconds, used for scheduling
+        self.info = info or {}
+        self.status = "queued"
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        self.result: Any = None  # AnalysisResult once done
+        self.error: Optional[str] = None
+        self.created = time.time()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+
+    def on_event(self, event: str, data: Dict[str, Any]):
+        """Pipeline event hook: records per-stage progress, ignores tokens"""
+        if event == "stage":
+            stage = self.stages.setdefault(data['stage'], {})
+            stage['status'] = "running" if data['status'] == "start" else "done"
+            if 'seconds' in data:
+                stage['seconds'] = round(data['seconds'], 3)
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("done", "failed")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'job_id': self.id,
+            'kind': self.kind,
+            'status': self.status,
+            'info': self.info,
+            'duration': self.duration,
+            'stages': self.stages,
+            'error': self.error,
+            'created': self.created,
+            'started': self.started,
+            'finished': self.finished,
+        }
+
+
+class JobManager:
+    """
+    Bounded pool of async workers draining a priority queue of jobs.
+    Jobs are ordered by submit time plus a penalty proportional to media
+    duration, so short clips overtake long lectures without starving them.
+    """
+
+    def __init__(self, workers: int = 2, max_queued: int = 100, duration_weight: float = 0.5,
+                 retention: float = 3600.0):
+        self.workers = workers
+        self.max_queued = max_queued
+        self.duration_weight = duration_weight
+        self.retention = retention  # seconds finished jobs stay queryable
+        self.logger = logging.getLogger(__name__)
+        self.jobs: Dict[str, Job] = {}
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._tasks = []
+        self._counter = itertools.count()
+
+    async def start(self):
+        if self._tasks:
+            return
+        self._queue = asyncio.PriorityQueue()
+        self._tasks = [asyncio.ensure_future(self._worker(i)) for i in range(self.workers)]
+        print(f"🧵 Job manager started with {self.workers} workers")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def submit(self, kind: str, run: Callable[[Job], Awaitable[Any]],
+               duration: float = 0.0, info: Optional[Dict[str, Any]] = None) -> Job:
+        """Queue a job and return it immediately"""
+        if self._queue is None:
+            raise RuntimeError("Job manager is not running")
+        self._prune()
+        if self._queue.qsize() >= self.max_queued:
+            raise QueueFullError(f"Job queue is full ({self.max_queued} jobs waiting)")
+
+        job = Job(kind, run, duration, info)
+        self.jobs[job.id] = job
+        priority = job.created + self.duration_weight * duration
+        self._queue.put_nowait((priority, next(self._counter), job.id))
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.jobs.get(job_id)
+
+    def queued(self) -> int:
+        return sum(1 for job in self.jobs.values() if job.status == "queued")
+
+    def running(self) -> int:
+        return sum(1 for job in self.jobs.values() if job.status == "running")
+
+    def backlog(self, exclude_job_id: Optional[str] = None) -> Tuple[int, float]:
+        """Jobs and media seconds queued or running, besides the one being scheduled"""
+        active = [job for job in list(self.jobs.values())
+                  if job.id != exclude_job_id and job.status in ("queued", "running")]
+        return len(active), sum(job.duration for job in active)
+
+    async def _worker(self, index: int):
+        while True:
+            _, _, job_id = await self._queue.get()
+            job = self.jobs.get(job_id)
+            if job is None:
+                continue
+            job.status = "running"
+            job.started = time.time()
+            try:
+                job.result = await job.run(job)
+                job.status = "done"
+            except asyncio.CancelledError:
+                job.status = "failed"
+                job.error = "Cancelled"
+                raise
+            except Exception as e:
+                self.logger.error(f"Job {job.id} failed: {e}")
+                print(f"❌ Job {job.id[:8]} failed: {e}")
+                job.status = "failed"
+                job.error = str(e)
+            finally:
+                job.finished = time.time()
+                job.run = None  # drop references to the job's inputs
+
+    def _prune(self):
+        cutoff = time.time() - self.retention
+        for job_id in [j.id for j in self.jobs.values() if j.done and j.finished < cutoff]:
+            del self.jobs[job_id]
+
+
+# Global job manager instance
+job_manager = JobManager(
+    workers=int(os.environ.get("JOB_WORKERS", "2")),
+    max_queued=int(os.environ.get("JOB_MAX_QUEUED", "100")),
+)
+
+metrics.gauge(
+    "video_ai_jobs", "Background jobs queued or running", ["status"],
+    collect=lambda: {("queued",): job_manager.queued(), ("running",): job_manager.running()},
+)
@@ -0,0 +1,73 @@
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
+from typing import Optional
+
+from jobs.manager import job_manager, QueueFullError
+from jobs.tasks import analyze_upload_job
+from offline.audio import probe_duration
+from utils.json_api import requested_fields, json_response
+from utils.uploads import receive_upload, UploadError, UploadTooLargeError, UPLOAD_OPENAPI
+from utils.workspace import workspace_manager, MAX_UPLOAD_BYTES
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+def submit_job(kind, run, duration=0.0, info=None):
+    """Queue a job, mapping a full queue to 503"""
+    try:
+        job = job_manager.submit(kind, run, duration=duration, info=info)
+    except QueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return JSONResponse(
+        status_code=202,
+        content={'job_id': job.id, 'status': job.status, 'status_url': f"/jobs/{job.id}"},
+    )
+
+
+@router.post("/video", openapi_extra=UPLOAD_OPENAPI)
+async def submit_video_job(request: Request):
+    """Queue an uploaded video for analysis and return its job ID immediately"""
+    # The workspace lives until the job finishes; the job removes it
+    workspace = workspace_manager.create()
+    try:
+        video_path, filename, media_digest, size = await receive_upload(request, workspace, max_bytes=MAX_UPLOAD_BYTES)
+        duration = await run_in_threadpool(probe_duration, video_path)
+        return submit_job(
+            "video",
+            lambda job: analyze_upload_job(job, workspace, video_path, media_digest, filename),
+            duration=duration,
+            info={'filename': filename, 'bytes': size},
+        )
+    except UploadTooLargeError as e:
+        workspace.cleanup()
+        raise HTTPException(status_code=413, detail=str(e))
+    except UploadError as e:
+        workspace.cleanup()
+        raise HTTPException(status_code=400, detail=str(e))
+    except BaseException:
+        workspace.cleanup()
+        raise
+
+
+@router.get("/{job_id}")
+async def job_status(job_id: str):
+    """Status and per-stage progress of a job"""
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+
+@router.get("/{job_id}/result")
+async def job_result(job_id: str, fields: Optional[str] = None):
+    """Analysis results once the job has finished; ?fields=transcript,summary picks what is sent"""
+    fields = requested_fields(fields)
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.status == "failed":
+        return JSONResponse(status_code=500, content={'job_id': job.id, 'status': job.status, 'error': job.error})
+    if job.status != "done":
+        return JSONResponse(status_code=202, content=job.to_dict())
+    return json_response(job.result, fields, job_id=job.id, status=job.status)
@@ -0,0 +1,67 @@
+import time
+import asyncio
+from typing import Any, Dict, Optional
+
+from analyzer.pipeline import run_analysis
+from analyzer.results import AnalysisResult, build_result
+from ai.model_policy import model_policy, ModelChoice
+from offline.processor import VideoProcessor
+from offline.url_pipeline import transcribe_url
+from jobs.manager import Job, job_manager
+from utils.workspace import Workspace, workspace_manager
+
+
+def _choose_models(job: Job) -> ModelChoice:
+    """Pick models when the job starts, counting the time it spent queued against the target"""
+    models = model_policy.choose(job.duration, waited=time.time() - job.created,
+                                 backlog=job_manager.backlog(exclude_job_id=job.id))
+    job.info['models'] = models.to_dict()
+    return models
+
+
+async def _analyze(job: Job, transcript: str, models: ModelChoice,
+                   video_info: Optional[Dict[str, Any]] = None) -> AnalysisResult:
+    if not transcript or len(transcript.strip()) < 20:
+        raise Exception("Could not transcribe audio from the video. The video might not have clear speech or audio.")
+    analysis = await run_analysis(transcript, emit=job.on_event, llm_model=models.llm_model)
+    return build_result(transcript, analysis, video_info)
+
+
+async def _timed_stage(job: Job, stage: str, func, *args, **kwargs):
+    """Run a blocking step in a thread and record it as a job stage"""
+    job.on_event("stage", {'stage': stage, 'status': "start"})
+    start = time.perf_counter()
+    result = await asyncio.to_thread(func, *args, **kwargs)
+    job.on_event("stage", {'stage': stage, 'status': "end", 'seconds': time.perf_counter() - start})
+    return result
+
+
+async def analyze_upload_job(job: Job, workspace: Workspace, video_path: str, media_digest: str,
+                             filename: str) -> AnalysisResult:
+    """Transcribe and analyze an uploaded file, removing its workspace when done"""
+    models = _choose_models(job)
+    try:
+        processor = VideoProcessor(video_path, models.whisper_model)
+        transcript, _ = await _timed_stage(job, "transcription", processor.process_video_cached,
+                                           media_digest, filename=filename)
+    finally:
+        workspace.cleanup()
+    return await _analyze(job, transcript, models)
+
+
+async def analyze_url_job(job: Job, url: str, stream=None) -> AnalysisResult:
+    """Download, transcribe and analyze a video URL; stream is its resolve_url() result, if known"""
+    models = _choose_models(job)
+    workspace = workspace_manager.create()
+    try:
+        # Download and transcription overlap, so they are tracked as one stage
+        transcript, video_info = await _timed_stage(job, "transcription", transcribe_url, url, workspace,
+                                                    model_name=models.whisper_model, stream=stream)
+        if video_info is None:
+            raise Exception("Failed to download video audio. Please try again or check your internet connection.")
+        job.info.update(video_info)
+        # Resolving may have failed at submit time; the real duration now counts in the backlog
+        job.duration = video_info.get('duration') or 0
+    finally:
+        workspace.cleanup()
+    return await _analyze(job, transcript, models, video_info)
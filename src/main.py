@@ -7,21 +7,22 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, current_dir)
 
 # Import modules
-from analyzer.summarizer import Summarizer
-from analyzer.study_guide import StudyGuide
-from analyzer.topic_recommender import TopicRecommender
-from analyzer.quiz_generator import QuizGenerator
-from offline.processor import Processor, VideoProcessor
-from fastapi import FastAPI, File, UploadFile, Request, Form
-from fastapi.responses import PlainTextResponse, HTMLResponse, JSONResponse
+from analyzer.pipeline import run_analysis
+from offline.processor import Processor
+from offline.batch import batch_main
+from ai.tuning import calibrate_main
+from ai.async_client import async_ollama_client
+from utils.metrics import install_metrics
+from api.routes import router as analysis_router, lifespan
+from jobs.routes import router as jobs_router
+from fastapi import FastAPI, Request
+from fastapi.responses import HTMLResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 # from utils.video_downloader import video_downloader
-import shutil
-import os
-import sys
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
+install_metrics(app)
 
 # Mount static files and templates
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -35,13 +36,10 @@ os.makedirs(templates_dir, exist_ok=True)
 app.mount("/static", StaticFiles(directory=static_dir), name="static")
 templates = Jinja2Templates(directory=templates_dir)
 
-def main():
-    # Initialize components
-    summarizer = Summarizer()
-    study_guide = StudyGuide()
-    topic_recommender = TopicRecommender()
-    quiz_generator = QuizGenerator()
+app.include_router(analysis_router)
+app.include_router(jobs_router)
 
+def main():
     # Check for command line arguments to determine mode (offline/online)
     if len(sys.argv) > 1 and sys.argv[1] == 'offline':
         # Process video file offline
@@ -49,10 +47,11 @@ def main():
         if video_file:
             processor = Processor(video_file)
             transcript = processor.process_video()
-            summary = summarizer.summarize(transcript)
-            guide = study_guide.create_guide(summary)
-            topics = topic_recommender.recommend_topics(transcript)
-            quizzes = quiz_generator.generate_quizzes(guide)
+            analysis = async_ollama_client.run(run_analysis(transcript))
+            summary = analysis["summary"]
+            guide = analysis["guide"]
+            topics = analysis["topics"]
+            quizzes = analysis["quizzes"]
             # Display results
             print("Summary:", summary)
             print("Study Guide:", guide)
@@ -60,6 +59,12 @@ def main():
             print("Quizzes:", quizzes)
         else:
             print("Please provide a video file for offline processing.")
+    elif len(sys.argv) > 1 and sys.argv[1] == 'batch':
+        # Process a directory, glob or JSONL manifest of videos
+        batch_main(sys.argv[2:])
+    elif len(sys.argv) > 1 and sys.argv[1] == 'calibrate':
+        # Benchmark Ollama thread counts on this host and save a tuning profile
+        calibrate_main(sys.argv[2:])
     else:
         # Start the FastAPI server
         import uvicorn
@@ -87,66 +92,5 @@ async def results_page(request: Request):
 #     """Analyze video from URL - Temporarily disabled"""
 #     return "URL analysis is temporarily disabled. Please use file upload instead."
 
-@app.post("/analyze-video", response_class=PlainTextResponse)
-async def analyze_video(video: UploadFile = File(...)):
-    temp_video_path = f"temp_{video.filename}"
-    with open(temp_video_path, "wb") as buffer:
-        shutil.copyfileobj(video.file, buffer)
-
-    try:
-        # Initialize analysis components
-        processor = VideoProcessor(temp_video_path)
-        summarizer = Summarizer()
-        study_guide = StudyGuide()
-        topic_recommender = TopicRecommender()
-        quiz_generator = QuizGenerator()
-        
-        # Process the video
-        print("🎬 Processing video...")
-        transcript = processor.process_video()
-        print("✅ Transcription completed!")
-        
-        # Generate analysis results
-        print("📊 Generating analysis...")
-        summary = summarizer.summarize(transcript)
-        guide = study_guide.create_guide(summary)
-        topics = topic_recommender.recommend_topics(transcript)
-        quizzes = quiz_generator.generate_quizzes(guide)
-        
-        # Format the results
-        results = f"""
-🎯 VIDEO ANALYSIS RESULTS
-========================
-
-📝 TRANSCRIPT:
-{transcript}
-
-📊 SUMMARY:
-{summary}
-
-📚 STUDY GUIDE:
-{guide}
-
-🎯 RECOMMENDED TOPICS:
-{topics}
-
-❓ QUIZZES:
-{quizzes}
-
-========================
-Analysis completed successfully!
-"""
-        
-        print("✅ Analysis completed!")
-        return results
-        
-    except Exception as e:
-        print(f"❌ Error during analysis: {e}")
-        return f"Error processing video: {str(e)}"
-    finally:
-        # Clean up temporary file
-        if os.path.exists(temp_video_path):
-            os.remove(temp_video_path)
-
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,109 @@
+import os
+import shutil
+import subprocess
+
+from typing import Dict, Iterator, Optional
+
+import numpy as np
+
+# Whisper works on 16 kHz mono audio
+SAMPLE_RATE = 16000
+
+
+def ffmpeg_available() -> bool:
+    """Check if ffmpeg is available in the system PATH"""
+    return shutil.which("ffmpeg") is not None
+
+
+def ffmpeg_pcm_command(source: str, sample_rate: int = SAMPLE_RATE,
+                       headers: Optional[Dict[str, str]] = None) -> list:
+    """ffmpeg command that decodes any media source to raw 16-bit mono PCM on stdout"""
+    input_options = []
+    if source.startswith(("http://", "https://")):
+        input_options += ["-reconnect", "1", "-reconnect_streamed", "1", "-reconnect_delay_max", "5"]
+        if headers:
+            input_options += ["-headers", "".join(f"{key}: {value}\r\n" for key, value in headers.items())]
+    return [
+        "ffmpeg", "-nostdin", "-hide_banner", "-loglevel", "error",
+        "-threads", "0",
+        *input_options,
+        "-i", source,
+        "-vn", "-sn", "-dn",
+        "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(sample_rate),
+        "-",
+    ]
+
+
+def probe_duration(path: str) -> float:
+    """
+    Media duration in seconds from ffprobe.
+    Falls back to a size-based estimate (~128 kbit/s) when ffprobe is unavailable.
+    """
+    if shutil.which("ffprobe"):
+        try:
+            proc = subprocess.run(
+                ["ffprobe", "-v", "error", "-show_entries", "format=duration",
+                 "-of", "default=noprint_wrappers=1:nokey=1", path],
+                capture_output=True, text=True, timeout=30,
+            )
+            return float(proc.stdout.strip())
+        except (subprocess.SubprocessError, ValueError):
+            pass
+    try:
+        return os.path.getsize(path) / 16000.0
+    except OSError:
+        return 0.0
+
+
+def pcm16_to_float(data: bytes) -> np.ndarray:
+    """Convert little-endian 16-bit PCM bytes to float32 samples in [-1, 1]"""
+    return np.frombuffer(data, np.int16).astype(np.float32) / 32768.0
+
+
+def load_pcm(path: str, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """
+    Decode the audio track of a media file straight into memory.
+    ffmpeg streams PCM over a pipe, so no intermediate audio file is written.
+    """
+    if ffmpeg_available():
+        proc = subprocess.run(ffmpeg_pcm_command(path, sample_rate), capture_output=True)
+        if proc.returncode != 0:
+            raise RuntimeError(f"ffmpeg failed to decode audio: {proc.stderr.decode(errors='ignore').strip()}")
+        return pcm16_to_float(proc.stdout)
+    return _load_pcm_moviepy(path, sample_rate)
+
+
+def stream_pcm(source: str, headers: Optional[Dict[str, str]] = None, sample_rate: int = SAMPLE_RATE,
+               block_seconds: float = 5.0) -> Iterator[np.ndarray]:
+    """
+    Yield blocks of PCM samples as ffmpeg decodes them.
+    For a remote URL this starts producing audio while the rest is still downloading.
+    """
+    proc = subprocess.Popen(ffmpeg_pcm_command(source, sample_rate, headers),
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    block_bytes = int(block_seconds * sample_rate) * 2
+    try:
+        while True:
+            data = proc.stdout.read(block_bytes)
+            if not data:
+                break
+            yield pcm16_to_float(data[:len(data) // 2 * 2])
+        if proc.wait() != 0:
+            raise RuntimeError(f"ffmpeg failed to decode audio: {proc.stderr.read().decode(errors='ignore').strip()}")
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+            proc.wait()
+
+
+def _load_pcm_moviepy(path: str, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """Fallback decoder using moviepy's bundled ffmpeg binary"""
+    from moviepy.editor import AudioFileClip
+    clip = AudioFileClip(path, fps=sample_rate)
+    try:
+        samples = clip.to_soundarray(fps=sample_rate)
+    finally:
+        clip.close()
+    if samples.ndim > 1:
+        samples = samples.mean(axis=1)
+    return samples.astype(np.float32)
@@ -0,0 +1,175 @@
+import os
+import sys
+import glob
+import json
+import time
+import asyncio
+import hashlib
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Set
+
+MEDIA_EXTENSIONS = ('.mp4', '.mkv', '.webm', '.avi', '.mov', '.m4v', '.mp3', '.m4a', '.wav', '.flac', '.ogg')
+
+
+def iter_inputs(spec: str) -> Iterator[str]:
+    """
+    Expand a batch input spec into media paths.
+    Accepts a directory (searched recursively), a JSONL manifest with one
+    {"path": ...} object or plain string per line, or a glob pattern.
+    """
+    if os.path.isdir(spec):
+        for root, _, files in os.walk(spec):
+            for name in sorted(files):
+                if name.lower().endswith(MEDIA_EXTENSIONS):
+                    yield os.path.join(root, name)
+    elif spec.endswith('.jsonl') and os.path.isfile(spec):
+        base = os.path.dirname(os.path.abspath(spec))
+        with open(spec, encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                entry = json.loads(line)
+                path = entry if isinstance(entry, str) else entry['path']
+                yield path if os.path.isabs(path) else os.path.join(base, path)
+    else:
+        for path in sorted(glob.glob(spec, recursive=True)):
+            if os.path.isfile(path):
+                yield path
+
+
+def load_completed(output_path: str) -> Set[str]:
+    """Inputs that already have a successful result in the output file"""
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # partially written last line from an interrupted run
+            if record.get('status') == 'ok':
+                done.add(record['input'])
+    return done
+
+
+def _hash_file(path: str, chunk_size: int = 1024 * 1024) -> str:
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def _init_worker(threads: int):
+    """Each batch worker transcribes one file at a time on its share of the cores"""
+    from offline.transcriber import parallel_transcriber
+    parallel_transcriber.workers = 1
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+
+
+def _transcribe_file(path: str, model_name: Optional[str]) -> Dict[str, object]:
+    """Runs in a worker process: extract and transcribe one input"""
+    from offline.processor import VideoProcessor
+    start = time.perf_counter()
+    processor = VideoProcessor(path, model_name=model_name)
+    transcript, cache_hit = processor.process_video_cached(_hash_file(path), filename=os.path.basename(path))
+    return {'transcript': transcript, 'cache_hit': cache_hit, 'seconds': time.perf_counter() - start}
+
+
+async def run_batch(inputs: List[str], output_path: str, workers: int = 2, llm_concurrency: int = 4,
+                    model_name: Optional[str] = None) -> Dict[str, int]:
+    """
+    Transcribe inputs across a process pool and analyze each transcript as soon
+    as it is ready, appending one JSON line per input to output_path.
+    """
+    from analyzer.pipeline import run_analysis
+
+    cores = os.cpu_count() or 1
+    loop = asyncio.get_running_loop()
+    llm_slots = asyncio.Semaphore(llm_concurrency)
+    counts = {'ok': 0, 'error': 0}
+
+    # Terminate a line left half-written by an interrupted run
+    if os.path.exists(output_path) and os.path.getsize(output_path):
+        with open(output_path, 'rb+') as f:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b'\n':
+                f.write(b'\n')
+
+    with open(output_path, 'a', encoding='utf-8') as out, ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(max(1, cores // workers),),
+    ) as pool:
+
+        def write(record: Dict[str, object]):
+            out.write(json.dumps(record, ensure_ascii=False) + '\n')
+            out.flush()
+            counts[record['status']] += 1
+            print(f"{'✅' if record['status'] == 'ok' else '❌'} [{sum(counts.values())}/{len(inputs)}] {record['input']}")
+
+        async def process(path: str):
+            record = {'input': path}
+            try:
+                transcribed = await loop.run_in_executor(pool, _transcribe_file, path, model_name)
+                async with llm_slots:
+                    analysis = await run_analysis(transcribed['transcript'])
+                timings = {name: round(seconds, 3) for name, seconds in analysis.timings.items()}
+                timings['transcription'] = round(transcribed['seconds'], 3)
+                record.update(
+                    status='ok',
+                    transcript=transcribed['transcript'],
+                    summary=analysis["summary"],
+                    guide=analysis["guide"],
+                    topics=analysis["topics"],
+                    quizzes=analysis["quizzes"],
+                    cache_hit=transcribed['cache_hit'],
+                    timings=timings,
+                )
+            except Exception as e:
+                record.update(status='error', error=str(e))
+            write(record)
+
+        await asyncio.gather(*(process(path) for path in inputs))
+    return counts
+
+
+def batch_main(argv: List[str]):
+    parser = argparse.ArgumentParser(prog="main.py batch",
+                                     description="Analyze many videos and write one JSON result per line.")
+    parser.add_argument("inputs", help="directory, glob pattern or JSONL manifest")
+    parser.add_argument("-o", "--output", default="results.jsonl", help="JSONL output file (appended to)")
+    parser.add_argument("-w", "--workers", type=int, default=max(1, (os.cpu_count() or 1) // 4),
+                        help="transcription processes")
+    parser.add_argument("--llm-concurrency", type=int, default=4, help="analyses running at once")
+    parser.add_argument("--model", default=None, help="Whisper model name")
+    parser.add_argument("--no-resume", action="store_true", help="reprocess inputs already in the output")
+    args = parser.parse_args(argv)
+
+    inputs = list(dict.fromkeys(iter_inputs(args.inputs)))
+    if not args.no_resume:
+        done = load_completed(args.output)
+        skipped = len([path for path in inputs if path in done])
+        inputs = [path for path in inputs if path not in done]
+        if skipped:
+            print(f"⏭️ Skipping {skipped} inputs already in {args.output}")
+    if not inputs:
+        print("Nothing to process.")
+        return
+
+    from ai.async_client import async_ollama_client
+    print(f"📦 Processing {len(inputs)} inputs with {args.workers} transcription workers...")
+    start = time.perf_counter()
+    counts = async_ollama_client.run(run_batch(inputs, args.output, args.workers, args.llm_concurrency, args.model))
+    print(f"🏁 Done in {time.perf_counter() - start:.1f}s: {counts['ok']} ok, {counts['error']} failed")
+    if counts['error']:
+        sys.exit(1)
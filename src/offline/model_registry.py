@@ -0,0 +1,126 @@
+import os
+import threading
+import time
+import logging
+from typing import Optional, Dict, Any, Iterable
+
+from utils.metrics import metrics
+
+
+class WhisperModelRegistry:
+    """
+    Process-wide registry of loaded Whisper models.
+    Each model is loaded once per process and kept warm for every later request.
+    A Whisper model is not safe to run from two threads at once (its decoder's
+    key/value cache hooks are attached to the shared modules), so in-process
+    transcription goes through transcribe(), which serializes use of each model.
+    """
+
+    def __init__(self, default_model: str = "small", device: Optional[str] = None):
+        self.default_model = default_model
+        self.device = device
+        self.logger = logging.getLogger(__name__)
+        self._models: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self._load_locks: Dict[str, threading.Lock] = {}
+        self._use_locks: Dict[str, threading.Lock] = {}
+        self._load_seconds: Dict[str, float] = {}
+        self._hits: Dict[str, int] = {}
+        self._loads: Dict[str, int] = {}
+
+    def get(self, name: Optional[str] = None):
+        """Return a loaded model, loading it on first use"""
+        name = name or self.default_model
+        model = self._models.get(name)
+        if model is not None:
+            with self._lock:
+                self._hits[name] = self._hits.get(name, 0) + 1
+            return model
+
+        # One lock per model so loading "small" never blocks a "tiny" lookup
+        with self._lock:
+            load_lock = self._load_locks.setdefault(name, threading.Lock())
+
+        with load_lock:
+            model = self._models.get(name)
+            if model is not None:
+                with self._lock:
+                    self._hits[name] = self._hits.get(name, 0) + 1
+                return model
+            model = self._load(name)
+            with self._lock:
+                self._models[name] = model
+            return model
+
+    def transcribe(self, audio, name: Optional[str] = None, **options) -> Dict[str, Any]:
+        """Run model.transcribe with exclusive use of the model; other models stay usable meanwhile"""
+        name = name or self.default_model
+        model = self.get(name)
+        with self._lock:
+            use_lock = self._use_locks.setdefault(name, threading.Lock())
+        with use_lock:
+            return model.transcribe(audio, **options)
+
+    def _load(self, name: str):
+        import whisper
+        print(f"🧠 Loading Whisper model '{name}'...")
+        start = time.perf_counter()
+        model = whisper.load_model(name, device=self.device)
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self._load_seconds[name] = self._load_seconds.get(name, 0.0) + elapsed
+            self._loads[name] = self._loads.get(name, 0) + 1
+        print(f"✅ Whisper model '{name}' loaded in {elapsed:.2f}s")
+        return model
+
+    def preload(self, names: Optional[Iterable[str]] = None):
+        """Eagerly load the given models (defaults to the configured model)"""
+        for name in names or [self.default_model]:
+            try:
+                self.get(name)
+            except Exception as e:
+                self.logger.error(f"Failed to preload Whisper model '{name}': {e}")
+
+    def is_loaded(self, name: Optional[str] = None) -> bool:
+        return (name or self.default_model) in self._models
+
+    def unload(self, name: str):
+        """Drop a model so its memory can be reclaimed"""
+        with self._lock:
+            self._models.pop(name, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Load-time and hit counters per model"""
+        with self._lock:
+            names = set(self._loads) | set(self._hits)
+            return {
+                name: {
+                    'loaded': name in self._models,
+                    'loads': self._loads.get(name, 0),
+                    'load_seconds': round(self._load_seconds.get(name, 0.0), 3),
+                    'hits': self._hits.get(name, 0),
+                }
+                for name in sorted(names)
+            }
+
+
+def configured_models() -> list:
+    """Models to preload at startup, from WHISPER_PRELOAD (comma separated)"""
+    value = os.environ.get("WHISPER_PRELOAD", whisper_registry.default_model)
+    return [name.strip() for name in value.split(",") if name.strip()]
+
+
+# Global registry instance
+whisper_registry = WhisperModelRegistry(default_model=os.environ.get("WHISPER_MODEL", "small"))
+
+def _series(field: str) -> Dict[tuple, float]:
+    return {(name,): stats[field] for name, stats in whisper_registry.stats().items()}
+
+metrics.counter("video_ai_whisper_model_loads_total", "Whisper model loads, per model",
+                ["model"], collect=lambda: _series('loads'))
+metrics.counter("video_ai_whisper_model_load_seconds_total", "Time spent loading Whisper models, per model",
+                ["model"], collect=lambda: _series('load_seconds'))
+metrics.counter("video_ai_whisper_model_hits_total", "Lookups answered by an already loaded Whisper model",
+                ["model"], collect=lambda: _series('hits'))
+metrics.gauge("video_ai_whisper_model_loaded", "1 while a Whisper model is held in memory",
+              ["model"], collect=lambda: {key: int(value) for key, value in _series('loaded').items()})
@@ -1,59 +1,94 @@
-import os
-import subprocess
-import sys
+import time
+
+from offline.audio import load_pcm, stream_pcm, ffmpeg_available, SAMPLE_RATE
+from offline.model_registry import whisper_registry
+from offline.transcriber import parallel_transcriber
+from offline.transcript_cache import transcript_cache
+from utils.metrics import stage_seconds
+from ai.model_policy import model_policy
 
 class VideoProcessor:
-    def __init__(self, video_path):
+    def __init__(self, video_path, model_name=None):
         self.video_path = video_path
-        self.audio_path = "output_audio.mp3"
+        self.model_name = model_name or whisper_registry.default_model
+        self.audio = None  # 16 kHz mono float32 samples, filled by extract_audio()
+
+    def transcription_options(self):
+        """Settings that affect the transcript text, used as part of cache keys"""
+        return {
+            'chunk_seconds': parallel_transcriber.chunk_seconds,
+            'overlap_seconds': parallel_transcriber.overlap_seconds,
+        }
 
     def check_ffmpeg(self):
         """Check if ffmpeg is available in the system PATH"""
-        try:
-            subprocess.run(['ffmpeg', '-version'], capture_output=True, check=True)
-            return True
-        except (subprocess.CalledProcessError, FileNotFoundError):
-            return False
+        return ffmpeg_available()
 
     def extract_audio(self):
-        import moviepy.editor as mp
+        """Decode the media file's audio track into memory as 16 kHz mono PCM"""
         print("🎬 Extracting audio...")
-        clip = mp.VideoFileClip(self.video_path)
-        clip.audio.write_audiofile(self.audio_path)
-        print("✅ Audio extracted:", self.audio_path)
+        has_ffmpeg = self.check_ffmpeg()
+        if not has_ffmpeg:
+            print("⚠️  FFmpeg not found. Falling back to moviepy decoding...")
+        try:
+            with stage_seconds.time(stage="extraction"):
+                self.audio = load_pcm(self.video_path)
+        except Exception as e:
+            print(f"❌ Error extracting audio: {e}")
+            if has_ffmpeg:
+                # ffmpeg is installed, so this file itself could not be decoded
+                raise Exception(f"Could not extract audio: {e}") from e
+            print("💡 Please install ffmpeg to resolve this issue:")
+            print("   Option 1: Download from https://ffmpeg.org/download.html")
+            print("   Option 2: Use chocolatey: choco install ffmpeg")
+            print("   Option 3: Use winget: winget install ffmpeg")
+            raise Exception("FFmpeg is required for audio processing. Please install it and restart your application.") from e
+        print(f"✅ Audio extracted: {len(self.audio) / 16000:.1f}s of audio")
+        return self.audio
 
     def transcribe_audio(self):
-        import whisper
         print("\n📝 Transcribing audio with Whisper...")
-        
-        # Check if ffmpeg is available
-        if not self.check_ffmpeg():
-            print("⚠️  FFmpeg not found. Attempting to use alternative method...")
-            # Try to use whisper with a different approach
-            try:
-                # Load the audio file directly with whisper
-                model = whisper.load_model("small")
-                result = model.transcribe(self.audio_path)
-                transcript = result["text"]
-                return transcript
-            except Exception as e:
-                print(f"❌ Error with alternative method: {e}")
-                print("💡 Please install ffmpeg to resolve this issue:")
-                print("   Option 1: Download from https://ffmpeg.org/download.html")
-                print("   Option 2: Use chocolatey: choco install ffmpeg")
-                print("   Option 3: Use winget: winget install ffmpeg")
-                raise Exception("FFmpeg is required for audio processing. Please install it and restart your application.")
-        
-        # If ffmpeg is available, proceed normally
-        model = whisper.load_model("small")
-        result = model.transcribe(self.audio_path)
-        transcript = result["text"]
+        if self.audio is None:
+            self.extract_audio()
+
+        # Long audio is split at silences and transcribed across the worker pool
+        start = time.perf_counter()
+        with stage_seconds.time(stage="transcription"):
+            transcript = parallel_transcriber.transcribe(self.audio, self.model_name)
+        model_policy.observe_transcription(self.model_name, len(self.audio) / SAMPLE_RATE,
+                                           time.perf_counter() - start)
         return transcript
 
+    def transcribe_stream(self, headers=None):
+        """
+        Transcribe video_path (usually a remote media URL) while ffmpeg is still
+        fetching it, handing each complete chunk to Whisper as it arrives.
+        """
+        if not self.check_ffmpeg():
+            raise Exception("FFmpeg is required for streamed transcription.")
+        print("\n📝 Transcribing audio stream with Whisper...")
+        # Includes fetching the media, which overlaps with transcription here
+        with stage_seconds.time(stage="streamed_transcription"):
+            return parallel_transcriber.transcribe_stream(stream_pcm(self.video_path, headers), self.model_name)
+
     def process_video(self):
         self.extract_audio()
         transcript = self.transcribe_audio()
         return transcript
 
+    def process_video_cached(self, media_digest, **metadata):
+        """
+        Return the cached transcript for these media bytes, or process the video
+        and cache the result. Returns (transcript, cache_hit).
+        """
+        cache_key = transcript_cache.make_key(media_digest, self.model_name, self.transcription_options())
+        transcript = transcript_cache.get(cache_key)
+        if transcript is not None:
+            print("⚡ Transcript cache hit, skipping transcription")
+            return transcript, True
+        transcript = self.process_video()
+        transcript_cache.put(cache_key, transcript, model=self.model_name, **metadata)
+        return transcript, False
+
 class Processor(VideoProcessor):
-    pass
\ No newline at end of file
+    pass
@@ -0,0 +1,207 @@
+import os
+import re
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional, Dict, List, Tuple, Iterable
+
+import numpy as np
+
+from offline.audio import SAMPLE_RATE
+from offline.model_registry import whisper_registry
+
+
+def find_chunk_bounds(audio: np.ndarray, sample_rate: int = SAMPLE_RATE,
+                      chunk_seconds: float = 60.0, search_seconds: float = 5.0,
+                      frame_seconds: float = 0.02) -> List[Tuple[int, int]]:
+    """
+    Split audio into roughly chunk_seconds long pieces, cutting at the quietest
+    frame in the search_seconds before each target boundary.
+    Returns (start, end) sample offsets without overlap.
+    """
+    total = len(audio)
+    chunk = int(chunk_seconds * sample_rate)
+    if total <= chunk:
+        return [(0, total)]
+
+    frame = max(1, int(frame_seconds * sample_rate))
+    n_frames = total // frame
+    energy = np.sqrt(np.mean(audio[:n_frames * frame].reshape(n_frames, frame) ** 2, axis=1))
+    search = int(search_seconds * sample_rate) // frame
+
+    bounds = []
+    start = 0
+    while total - start > chunk:
+        target = (start + chunk) // frame
+        low = max(start // frame + 1, target - search)
+        cut = (low + int(np.argmin(energy[low:target + 1]))) * frame
+        bounds.append((start, cut))
+        start = cut
+    bounds.append((start, total))
+    return bounds
+
+
+def split_audio(audio: np.ndarray, sample_rate: int = SAMPLE_RATE, chunk_seconds: float = 60.0,
+                overlap_seconds: float = 1.0) -> List[np.ndarray]:
+    """Cut audio at silence boundaries and extend each chunk back by overlap_seconds"""
+    overlap = int(overlap_seconds * sample_rate)
+    return [audio[max(0, start - overlap):end]
+            for start, end in find_chunk_bounds(audio, sample_rate, chunk_seconds)]
+
+
+def _normalize(word: str) -> str:
+    return re.sub(r"[^\w']", "", word.lower())
+
+
+def merge_transcripts(texts: List[str], max_overlap_words: int = 12) -> str:
+    """
+    Join chunk transcripts in order, dropping words repeated across the overlap.
+    The longest run of words ending the transcript so far that also starts the
+    next chunk is treated as the duplicated overlap.
+    """
+    merged: List[str] = []
+    for text in texts:
+        words = text.split()
+        if not words:
+            continue
+        tail = [_normalize(w) for w in merged[-max_overlap_words:]]
+        head = [_normalize(w) for w in words[:max_overlap_words]]
+        skip = 0
+        for k in range(min(len(tail), len(head)), 0, -1):
+            if tail[-k:] == head[:k]:
+                skip = k
+                break
+        merged.extend(words[skip:])
+    return " ".join(merged)
+
+
+def _init_worker(model_name: str, threads: int):
+    """Pool initializer: size torch's thread pool and load the model once per worker"""
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+    whisper_registry.preload([model_name])
+
+
+def _transcribe_chunk(args) -> Tuple[int, str]:
+    index, samples, model_name, options = args
+    result = whisper_registry.transcribe(samples, model_name, **options)
+    return index, result["text"].strip()
+
+
+class ParallelTranscriber:
+    """
+    Transcribes long audio as overlapping chunks across a process pool.
+    Short audio, or a pool of one worker, is transcribed in-process through
+    whisper_registry.transcribe, so concurrent callers take turns on the model.
+    Each Whisper model gets its own process pool whose workers load it at
+    startup, so a model chosen later by the model policy is not loaded lazily
+    on its first chunk.
+    """
+
+    def __init__(self, workers: Optional[int] = None, chunk_seconds: float = 60.0,
+                 overlap_seconds: float = 1.0):
+        cores = os.cpu_count() or 1
+        self.workers = workers if workers is not None else max(1, cores // 4)
+        self.threads_per_worker = max(1, cores // max(1, self.workers))
+        self.chunk_seconds = chunk_seconds
+        self.overlap_seconds = overlap_seconds
+        self.logger = logging.getLogger(__name__)
+        self._pools: Dict[str, ProcessPoolExecutor] = {}
+        self._thread_pool = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self, model_name: str) -> ProcessPoolExecutor:
+        with self._lock:
+            if model_name not in self._pools:
+                # spawn avoids forking a parent that already holds torch threads
+                self._pools[model_name] = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(model_name, self.threads_per_worker),
+                )
+            return self._pools[model_name]
+
+    def transcribe(self, audio: np.ndarray, model_name: Optional[str] = None, **options) -> str:
+        model_name = model_name or whisper_registry.default_model
+        chunks = split_audio(audio, SAMPLE_RATE, self.chunk_seconds, self.overlap_seconds)
+
+        if self.workers <= 1 or len(chunks) == 1:
+            return whisper_registry.transcribe(audio, model_name, **options)["text"]
+
+        print(f"⚡ Transcribing {len(chunks)} chunks across {self.workers} workers...")
+        pool = self._get_pool(model_name)
+        jobs = [(i, chunk, model_name, options) for i, chunk in enumerate(chunks)]
+        results = dict(pool.map(_transcribe_chunk, jobs))
+        return merge_transcripts([results[i] for i in range(len(chunks))])
+
+    def _get_thread_pool(self) -> ThreadPoolExecutor:
+        # One in-process worker keeps streamed chunks in order; like transcribe(), it goes through
+        # whisper_registry.transcribe, which keeps other threads off the shared model meanwhile
+        with self._lock:
+            if self._thread_pool is None:
+                self._thread_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="whisper")
+            return self._thread_pool
+
+    def transcribe_stream(self, blocks: Iterable[np.ndarray], model_name: Optional[str] = None, **options) -> str:
+        """
+        Transcribe audio that is still arriving.
+        Each chunk is cut at a silence and handed to the workers as soon as it
+        is complete, so decoding/downloading overlaps with inference.
+        """
+        model_name = model_name or whisper_registry.default_model
+        if self.workers > 1:
+            pool = self._get_pool(model_name)
+        else:
+            pool = self._get_thread_pool()
+
+        chunk = int(self.chunk_seconds * SAMPLE_RATE)
+        overlap = int(self.overlap_seconds * SAMPLE_RATE)
+        futures = []
+        buffer = np.zeros(0, dtype=np.float32)
+        carry = np.zeros(0, dtype=np.float32)  # tail of the previous chunk, re-sent as overlap
+
+        def submit(samples: np.ndarray):
+            futures.append(pool.submit(_transcribe_chunk, (len(futures), samples, model_name, options)))
+
+        for block in blocks:
+            buffer = np.concatenate([buffer, block])
+            while len(buffer) > chunk:
+                cut = find_chunk_bounds(buffer, SAMPLE_RATE, self.chunk_seconds)[0][1]
+                submit(np.concatenate([carry, buffer[:cut]]))
+                carry = buffer[max(0, cut - overlap):cut]
+                buffer = buffer[cut:]
+        if len(buffer):
+            submit(np.concatenate([carry, buffer]))
+        if not futures:
+            return ""
+
+        print(f"⚡ Transcribed {len(futures)} streamed chunks")
+        results = dict(future.result() for future in futures)
+        return merge_transcripts([results[i] for i in range(len(futures))])
+
+    def shutdown(self):
+        with self._lock:
+            for pool in self._pools.values():
+                pool.shutdown(cancel_futures=True)
+            self._pools.clear()
+            if self._thread_pool is not None:
+                self._thread_pool.shutdown(cancel_futures=True)
+                self._thread_pool = None
+
+
+def _env_int(name: str) -> Optional[int]:
+    value = os.environ.get(name)
+    return int(value) if value else None
+
+
+# Global transcriber instance
+parallel_transcriber = ParallelTranscriber(
+    workers=_env_int("WHISPER_WORKERS"),
+    chunk_seconds=float(os.environ.get("WHISPER_CHUNK_SECONDS", "60")),
+    overlap_seconds=float(os.environ.get("WHISPER_CHUNK_OVERLAP", "1")),
+)
@@ -0,0 +1,123 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import tempfile
+import threading
+from typing import Optional, Dict, Any
+
+from utils.metrics import metrics
+
+
+class TranscriptCache:
+    """
+    Disk-backed transcript cache keyed on the media bytes and Whisper settings.
+    Entries are evicted least-recently-used first once the cache exceeds max_bytes.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 512 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._total_bytes = None  # computed lazily from the directory
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(media_digest: str, model: str, options: Optional[Dict[str, Any]] = None) -> str:
+        """Stable key for a media hash plus the model and transcription options"""
+        settings = json.dumps({'model': model, 'options': options or {}}, sort_keys=True)
+        return hashlib.sha256(f"{media_digest}:{settings}".encode()).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached transcript, marking it as recently used"""
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            os.utime(path)  # mtime doubles as the LRU timestamp
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return entry.get('transcript')
+
+    def put(self, key: str, transcript: str, **metadata):
+        """Store a transcript and evict old entries if the cache is over budget"""
+        os.makedirs(self.directory, exist_ok=True)
+        entry = dict(metadata, transcript=transcript, created=time.time())
+        data = json.dumps(entry, ensure_ascii=False).encode("utf-8")
+
+        # Write to a temp file first so readers never see a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            path = self._path(key)
+            previous = os.path.getsize(path) if os.path.exists(path) else 0
+            os.replace(tmp_path, path)
+        except OSError as e:
+            self.logger.error(f"Failed to write transcript cache entry: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+
+        with self._lock:
+            if self._total_bytes is not None:
+                self._total_bytes += len(data) - previous
+        self._evict()
+
+    def _scan(self):
+        entries = []
+        try:
+            for name in os.listdir(self.directory):
+                if name.endswith(".json"):
+                    try:
+                        st = os.stat(os.path.join(self.directory, name))
+                    except OSError:
+                        continue
+                    entries.append((st.st_mtime, st.st_size, name))
+        except FileNotFoundError:
+            pass
+        return entries
+
+    def _evict(self):
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = sum(size for _, size, _ in self._scan())
+            if self._total_bytes <= self.max_bytes:
+                return
+            entries = sorted(self._scan())
+            self._total_bytes = sum(size for _, size, _ in entries)
+            for _, size, name in entries:
+                if self._total_bytes <= self.max_bytes:
+                    break
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    continue
+                self._total_bytes -= size
+                self.evictions += 1
+
+
+# Global cache instance
+transcript_cache = TranscriptCache(
+    directory=os.environ.get(
+        "TRANSCRIPT_CACHE_DIR",
+        os.path.join(os.path.expanduser("~"), ".cache", "video-ai-analyzer", "transcripts"),
+    ),
+    max_bytes=int(os.environ.get("TRANSCRIPT_CACHE_MAX_BYTES", str(512 * 1024 * 1024))),
+)
+
+metrics.counter("video_ai_transcript_cache_lookups_total", "Transcript cache lookups, by result", ["result"],
+                collect=lambda: {("hit",): transcript_cache.hits, ("miss",): transcript_cache.misses})
+metrics.counter("video_ai_transcript_cache_evictions_total", "Transcripts evicted to stay under the size budget",
+                collect=lambda: {(): transcript_cache.evictions})
@@ -0,0 +1,52 @@
+import os
+
+from offline.audio import ffmpeg_available
+from offline.processor import VideoProcessor
+from utils.video_downloader import video_downloader
+
+# Transcribe remote audio while it downloads instead of after
+PIPELINED_URL_TRANSCRIPTION = os.environ.get("PIPELINED_URL_TRANSCRIPTION", "1") != "0"
+
+
+def resolve_url(url):
+    """
+    Resolve a video URL's audio stream and metadata before it is admitted or
+    queued, so scheduling can use its duration. Returns the
+    resolve_audio_stream() result (None if that failed) and the duration in
+    seconds (0 if unknown). Handing the result to transcribe_url saves it a
+    second yt-dlp extraction.
+    """
+    stream = video_downloader.resolve_audio_stream(url)
+    return stream, (stream[2].get('duration') or 0) if stream else 0
+
+
+def transcribe_url(url, workspace, pipelined=PIPELINED_URL_TRANSCRIPTION, model_name=None, stream=None):
+    """
+    Transcribe the audio of a video URL. Returns (transcript, video_info), or
+    (None, None) when the audio could not be fetched.
+
+    In pipelined mode the audio stream is decoded and transcribed chunk by chunk
+    while it downloads, so total time approaches max(download, transcribe).
+    If that fails, the audio is downloaded into the workspace first.
+    model_name selects the Whisper model (default: the registry's default).
+    stream is a result of resolve_url() to use instead of resolving the URL again;
+    if its media URL has expired meanwhile, the audio is downloaded as above.
+    """
+    if pipelined and ffmpeg_available():
+        stream = stream or video_downloader.resolve_audio_stream(url)
+        if stream:
+            media_url, headers, video_info = stream
+            try:
+                transcript = VideoProcessor(media_url, model_name).transcribe_stream(headers)
+                return transcript, video_info
+            except Exception as e:
+                print(f"⚠️ Pipelined transcription failed ({e}), downloading first...")
+
+    downloaded = video_downloader.download_with_info(url, output_dir=workspace.path)
+    if not downloaded:
+        return None, None
+    audio_path, video_info = downloaded
+    try:
+        return VideoProcessor(audio_path, model_name).transcribe_audio(), video_info
+    finally:
+        video_downloader.cleanup_file(audio_path)
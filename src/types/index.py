@@ -1,28 +1,126 @@
+import json
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the standard library
+    orjson = None
+
+
+def dumps(data: Any) -> bytes:
+    """Compact JSON encoding, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
 class VideoAIAnalyzerTypes:
     """This class defines various types and interfaces used throughout the application."""
-    
+
+    @dataclass(slots=True)
     class Transcript:
-        def __init__(self, text: str):
-            self.text = text
+        text: str
 
+    @dataclass(slots=True)
     class Summary:
-        def __init__(self, content: str):
-            self.content = content
+        content: str
 
+    @dataclass(slots=True)
     class StudyGuide:
-        def __init__(self, topics: list, summary: Summary):
-            self.topics = topics
-            self.summary = summary
+        topics: list
+        summary: "VideoAIAnalyzerTypes.Summary"
 
+    @dataclass(slots=True)
     class QuizQuestion:
-        def __init__(self, question: str, answer: str):
-            self.question = question
-            self.answer = answer
+        question: str
+        answer: str
 
+    @dataclass(slots=True)
     class Quiz:
-        def __init__(self, questions: list):
-            self.questions = questions
+        questions: list
 
+    @dataclass(slots=True)
     class TopicRecommendation:
-        def __init__(self, topics: list):
-            self.topics = topics
\ No newline at end of file
+        topics: list
+
+    @dataclass(slots=True)
+    class VideoInfo:
+        title: str = "Unknown Title"
+        uploader: str = "Unknown"
+        duration: float = 0
+        url: str = ""
+
+        @classmethod
+        def from_dict(cls, info: Dict[str, Any]) -> "VideoAIAnalyzerTypes.VideoInfo":
+            return cls(
+                title=info.get('title') or "Unknown Title",
+                uploader=info.get('uploader') or "Unknown",
+                duration=info.get('duration') or 0,
+                url=info.get('url') or "",
+            )
+
+    @dataclass(slots=True)
+    class AnalysisResult:
+        """Everything produced for one video; serialized field by field on request"""
+        transcript: str
+        summary: str
+        guide: str
+        topics: str
+        quizzes: str
+        video: Optional["VideoAIAnalyzerTypes.VideoInfo"] = None
+        timings: Dict[str, float] = field(default_factory=dict)
+
+        # The transcript dominates payload size, so it is only sent when asked for
+        ALL_FIELDS = ("transcript", "summary", "guide", "topics", "quizzes", "video", "timings")
+        DEFAULT_FIELDS = ("summary", "guide", "topics", "quizzes", "video", "timings")
+
+        @classmethod
+        def parse_fields(cls, fields: Optional[str]) -> List[str]:
+            """Turn a comma-separated ?fields= value into a validated field list"""
+            if not fields:
+                return list(cls.DEFAULT_FIELDS)
+            requested = [name.strip() for name in fields.split(",") if name.strip()]
+            unknown = [name for name in requested if name not in cls.ALL_FIELDS]
+            if unknown:
+                raise ValueError(f"Unknown field(s): {', '.join(unknown)}. Available: {', '.join(cls.ALL_FIELDS)}")
+            return requested
+
+        def to_dict(self, fields: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+            data = {}
+            for name in fields or self.DEFAULT_FIELDS:
+                value = getattr(self, name)
+                if name == "video":
+                    if value is None:
+                        continue
+                    value = {'title': value.title, 'uploader': value.uploader,
+                             'duration': value.duration, 'url': value.url}
+                data[name] = value
+            return data
+
+        def to_json(self, fields: Optional[Iterable[str]] = None) -> bytes:
+            return dumps(self.to_dict(fields))
+
+        def to_text(self) -> str:
+            """The plain-text report served by the original /analyze-* endpoints"""
+            video_section = ""
+            if self.video is not None:
+                video_section = (
+                    "📺 VIDEO INFORMATION:\n"
+                    f"Title: {self.video.title}\n"
+                    f"Uploader: {self.video.uploader}\n"
+                    f"Duration: {self.video.duration} seconds\n"
+                    f"URL: {self.video.url}\n\n"
+                )
+            return (
+                "\n🎯 VIDEO ANALYSIS RESULTS\n"
+                "========================\n\n"
+                f"{video_section}"
+                f"📝 TRANSCRIPT:\n{self.transcript}\n\n"
+                f"📊 SUMMARY:\n{self.summary}\n\n"
+                f"📚 STUDY GUIDE:\n{self.guide}\n\n"
+                f"🎯 RECOMMENDED TOPICS:\n{self.topics}\n\n"
+                f"❓ QUIZZES:\n{self.quizzes}\n\n"
+                "========================\n"
+                "Analysis completed successfully!\n"
+            )
@@ -0,0 +1,24 @@
+from fastapi import HTTPException
+from fastapi.responses import Response
+
+from analyzer.results import AnalysisResult, dumps
+
+
+def requested_fields(fields):
+    """Validate a ?fields= query value, mapping bad names to 400"""
+    try:
+        return AnalysisResult.parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def json_response(result, fields, status_code=200, **extra):
+    """
+    Serialize only the requested fields of an AnalysisResult, skipping
+    FastAPI's generic encoder. Keyword arguments are added to the top level.
+    """
+    if extra:
+        content = dumps({**extra, **result.to_dict(fields)})
+    else:
+        content = result.to_json(fields)
+    return Response(content=content, media_type="application/json", status_code=status_code)
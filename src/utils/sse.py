@@ -0,0 +1,69 @@
+import json
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from analyzer.pipeline import run_analysis
+
+# Headers that stop proxies from buffering the event stream
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def format_sse(event: str, data: Any) -> str:
+    """Encode one server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def analysis_event_stream(transcribe: Callable[[], Awaitable[str]],
+                                info: Optional[Dict[str, Any]] = None, llm_model: Optional[str] = None,
+                                on_close: Optional[Callable[[], None]] = None):
+    """
+    Run transcription and analysis, yielding server-sent events as work progresses:
+    info, stage start/end, the transcript, LLM tokens, and finally the full result.
+    llm_model overrides the Ollama model used for the analysis. on_close runs when
+    the stream ends for any reason, including the client disconnecting.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+
+    def emit(event: str, data: Dict[str, Any]):
+        queue.put_nowait((event, data))
+
+    async def produce():
+        try:
+            if info:
+                emit("info", info)
+            emit("stage", {'stage': "transcription", 'status': "start"})
+            transcript = await transcribe()
+            emit("stage", {'stage': "transcription", 'status': "end"})
+            if not transcript or len(transcript.strip()) < 20:
+                emit("error", {'message': "Could not transcribe audio from the video. The video might not have clear speech or audio."})
+                return
+            emit("transcript", {'text': transcript})
+
+            analysis = await run_analysis(transcript, emit=emit, llm_model=llm_model)
+            emit("result", {
+                'summary': analysis["summary"],
+                'guide': analysis["guide"],
+                'topics': analysis["topics"],
+                'quizzes': analysis["quizzes"],
+                'timings': {name: round(seconds, 3) for name, seconds in analysis.timings.items()},
+            })
+        except Exception as e:
+            print(f"❌ Error during streaming analysis: {e}")
+            emit("error", {'message': str(e)})
+        finally:
+            queue.put_nowait(None)
+
+    task = asyncio.ensure_future(produce())
+    try:
+        while True:
+            item = await queue.get()
+            if item is None:
+                break
+            yield format_sse(*item)
+        yield format_sse("done", {})
+    finally:
+        # Client went away: stop the remaining work
+        if not task.done():
+            task.cancel()
+        if on_close is not None:
+            on_close()
@@ -0,0 +1,139 @@
+import os
+import hashlib
+from typing import List, Optional, Tuple
+
+from python_multipart import MultipartParser
+from python_multipart.exceptions import FormParserError
+from python_multipart.multipart import parse_options_header
+
+from utils.metrics import uploaded_bytes, uploads
+
+# Room for the multipart boundaries and part headers around the file in Content-Length
+FORM_OVERHEAD_BYTES = 64 * 1024
+
+# OpenAPI description of the request body that receive_upload() parses, for the docs
+UPLOAD_OPENAPI = {
+    'requestBody': {
+        'required': True,
+        'content': {'multipart/form-data': {'schema': {
+            'type': 'object',
+            'required': ['video'],
+            'properties': {'video': {'type': 'string', 'format': 'binary'}},
+        }}},
+    },
+}
+
+
+class UploadError(Exception):
+    """Raised when a request does not carry the expected multipart file"""
+
+
+class UploadTooLargeError(Exception):
+    """Raised when an upload exceeds the configured size limit"""
+
+
+class _FilePart:
+    """multipart parser callbacks that keep one file field and ignore everything else"""
+
+    def __init__(self, field: str):
+        self.field = field
+        self.filename: Optional[str] = None
+        self.pending: List[bytes] = []  # data of the wanted part received since the last write
+        self.done = False
+        self._keep = False
+        self._header_name = b""
+        self._header_value = b""
+        self._disposition = b""
+
+    def on_part_begin(self):
+        self._disposition = b""
+
+    def on_header_field(self, data: bytes, start: int, end: int):
+        self._header_name += data[start:end]
+
+    def on_header_value(self, data: bytes, start: int, end: int):
+        self._header_value += data[start:end]
+
+    def on_header_end(self):
+        if self._header_name.lower() == b"content-disposition":
+            self._disposition = self._header_value
+        self._header_name = self._header_value = b""
+
+    def on_headers_finished(self):
+        _, options = parse_options_header(self._disposition)
+        name = options.get(b"name", b"").decode("utf-8", "replace")
+        self._keep = name == self.field and b"filename" in options and self.filename is None
+        if self._keep:
+            self.filename = options[b"filename"].decode("utf-8", "replace")
+
+    def on_part_data(self, data: bytes, start: int, end: int):
+        if self._keep:
+            self.pending.append(data[start:end])
+
+    def on_part_end(self):
+        if self._keep:
+            self.done = True
+            self._keep = False
+
+    def callbacks(self):
+        return {name: getattr(self, name) for name in (
+            "on_part_begin", "on_header_field", "on_header_value", "on_header_end",
+            "on_headers_finished", "on_part_data", "on_part_end")}
+
+
+async def receive_upload(request, workspace, field: str = "video",
+                         max_bytes: Optional[int] = None) -> Tuple[str, str, str, int]:
+    """
+    Parse a multipart/form-data upload as it arrives and write its `field`
+    file straight into the workspace, hashing it on the way. The body is never
+    spooled to a temporary file first, so the limit is enforced while the
+    upload streams in: a Content-Length past max_bytes is refused before any
+    of the body is read, and an upload without one stops at max_bytes.
+    Returns (path, original file name, SHA-256 hex digest, bytes written).
+    Raises UploadTooLargeError past max_bytes (the partial file is removed)
+    and UploadError if the request has no such file.
+    """
+    path = None
+    size = 0
+    try:
+        length = request.headers.get("content-length")
+        if max_bytes is not None and length and length.isdigit() and \
+                int(length) > max_bytes + FORM_OVERHEAD_BYTES:
+            raise UploadTooLargeError(f"Upload exceeds the {max_bytes // (1024 * 1024)} MB limit")
+        content_type, options = parse_options_header(request.headers.get("content-type", ""))
+        if content_type != b"multipart/form-data" or b"boundary" not in options:
+            raise UploadError("Expected a multipart/form-data upload")
+
+        part = _FilePart(field)
+        parser = MultipartParser(options[b"boundary"], part.callbacks())
+        hasher = hashlib.sha256()
+        buffer = None
+        try:
+            async for chunk in request.stream():
+                parser.write(chunk)
+                if part.filename is not None and buffer is None:
+                    path = workspace.file(part.filename)
+                    buffer = open(path, "wb")
+                for data in part.pending:
+                    size += len(data)
+                    if max_bytes is not None and size > max_bytes:
+                        raise UploadTooLargeError(f"Upload exceeds the {max_bytes // (1024 * 1024)} MB limit")
+                    hasher.update(data)
+                    buffer.write(data)
+                part.pending.clear()
+            parser.finalize()
+        except FormParserError as e:
+            raise UploadError(f"Invalid multipart data: {e}") from e
+        finally:
+            if buffer is not None:
+                buffer.close()
+        if not part.done:
+            raise UploadError(f"No '{field}' file in the upload")
+    except BaseException as e:
+        if path and os.path.exists(path):
+            os.remove(path)
+        uploads.inc(outcome="too_large" if isinstance(e, UploadTooLargeError) else "error")
+        raise
+    uploads.inc(outcome="ok")
+    uploaded_bytes.inc(size)
+    return path, part.filename, hasher.hexdigest(), size
@@ -3,9 +3,11 @@ import validators
 import os
 import tempfile
 import uuid
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
 import logging
 
+from utils.metrics import stage_seconds
+
 class VideoDownloader:
     """
     Video downloader for YouTube and other video platforms.
@@ -28,6 +30,19 @@ class VideoDownloader:
         url_lower = url.lower()
         return any(platform in url_lower for platform in self.supported_platforms)
     
+    @staticmethod
+    def _summarize_info(info: Dict[str, Any], url: str) -> Dict[str, Any]:
+        """Pick the fields the analyzer reports from a yt-dlp info dict"""
+        return {
+            'title': info.get('title', 'Unknown Title'),
+            'duration': info.get('duration', 0),
+            'uploader': info.get('uploader', 'Unknown'),
+            'view_count': info.get('view_count', 0),
+            'description': info.get('description', '')[:200] + '...' if info.get('description') else '',
+            'thumbnail': info.get('thumbnail', ''),
+            'url': url
+        }
+    
     def get_video_info(self, url: str) -> Optional[Dict[str, Any]]:
         """Get video information without downloading"""
         try:
@@ -39,129 +54,134 @@ class VideoDownloader:
             
             with yt_dlp.YoutubeDL(ydl_opts) as ydl:
                 info = ydl.extract_info(url, download=False)
-                return {
-                    'title': info.get('title', 'Unknown Title'),
-                    'duration': info.get('duration', 0),
-                    'uploader': info.get('uploader', 'Unknown'),
-                    'view_count': info.get('view_count', 0),
-                    'description': info.get('description', '')[:200] + '...' if info.get('description') else '',
-                    'thumbnail': info.get('thumbnail', ''),
-                    'url': url
-                }
+                return self._summarize_info(info, url)
         except Exception as e:
             self.logger.error(f"Failed to get video info: {e}")
             return None
     
-    def download_video(self, url: str, max_duration: int = 3600) -> Optional[str]:
+    def resolve_audio_stream(self, url: str) -> Optional[Tuple[str, Dict[str, str], Dict[str, Any]]]:
         """
-        Download video from URL with optimized settings.
-        Returns the path to the downloaded video file.
+        Resolve the direct media URL of the best audio format without downloading.
+        Returns (media URL, HTTP headers to send with it, video info) so the
+        audio can be decoded while it streams in.
         """
         if not self.is_valid_url(url):
             raise ValueError("Invalid or unsupported video URL")
         
-        # Create temporary file for the video
-        temp_dir = tempfile.gettempdir()
-        video_id = str(uuid.uuid4())[:8]
-        output_path = os.path.join(temp_dir, f"video_{video_id}.%(ext)s")
-        
-        # Optimized download options
         ydl_opts = {
-            'format': 'best[height<=720]/best',  # Prefer 720p or lower for faster processing
-            'outtmpl': output_path,
+            'format': 'bestaudio[protocol^=http]/bestaudio/best',
             'quiet': True,
             'no_warnings': True,
-            'extractaudio': False,
-            'audioformat': 'mp3',
-            'max_duration': max_duration,  # Limit to 1 hour max
-            'writesubtitles': False,
-            'writeautomaticsub': False,
-            'ignoreerrors': True,
             'no_check_certificate': True,
-            'prefer_insecure': False,
         }
-        
         try:
-            print(f"📥 Downloading video from: {url}")
-            print("⏳ This may take a few minutes depending on video length...")
-            
             with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                # Extract info first to get the actual filename
                 info = ydl.extract_info(url, download=False)
-                ydl.download([url])
-                
-                # Find the downloaded file
-                downloaded_files = []
-                for file in os.listdir(temp_dir):
-                    if file.startswith(f"video_{video_id}") and file.endswith(('.mp4', '.webm', '.mkv', '.avi')):
-                        downloaded_files.append(os.path.join(temp_dir, file))
-                
-                if downloaded_files:
-                    video_path = downloaded_files[0]
-                    print(f"✅ Video downloaded successfully: {os.path.basename(video_path)}")
-                    return video_path
-                else:
-                    print("❌ Video download failed - no file found")
+                if info and info.get('_type') == 'playlist' and info.get('entries'):
+                    info = next(entry for entry in info['entries'] if entry)
+                if not info:
                     return None
-                    
+                selected = (info.get('requested_formats') or [info])[0]
+                media_url = selected.get('url')
+                if not media_url:
+                    return None
+                return media_url, selected.get('http_headers') or {}, self._summarize_info(info, url)
         except Exception as e:
-            self.logger.error(f"Video download failed: {e}")
-            print(f"❌ Download failed: {str(e)}")
+            self.logger.error(f"Failed to resolve audio stream: {e}")
             return None
     
-    def download_audio_only(self, url: str, max_duration: int = 3600) -> Optional[str]:
+    @staticmethod
+    def _downloaded_path(ydl, info: Dict[str, Any]) -> Optional[str]:
+        """Real output path of a finished download, taken from the info dict"""
+        for download in info.get('requested_downloads') or []:
+            path = download.get('filepath') or download.get('_filename')
+            if path and os.path.exists(path):
+                return path
+        path = info.get('filepath') or ydl.prepare_filename(info)
+        return path if path and os.path.exists(path) else None
+    
+    def download_with_info(self, url: str, audio_only: bool = True, output_dir: Optional[str] = None,
+                           max_duration: int = 3600) -> Optional[Tuple[str, Dict[str, Any]]]:
         """
-        Download only audio from video URL for faster processing.
-        Returns the path to the downloaded audio file.
+        Extract metadata and download in a single yt-dlp pass.
+        Returns (downloaded file path, video info) or None on failure.
         """
         if not self.is_valid_url(url):
             raise ValueError("Invalid or unsupported video URL")
         
-        # Create temporary file for the audio
-        temp_dir = tempfile.gettempdir()
-        audio_id = str(uuid.uuid4())[:8]
-        output_path = os.path.join(temp_dir, f"audio_{audio_id}.%(ext)s")
+        output_dir = output_dir or tempfile.gettempdir()
+        file_id = str(uuid.uuid4())[:8]
+        prefix = "audio" if audio_only else "video"
+        output_path = os.path.join(output_dir, f"{prefix}_{file_id}.%(ext)s")
         
-        # Audio-only download options
-        ydl_opts = {
-            'format': 'bestaudio/best',
+        if audio_only:
+            # Audio-only download options
+            ydl_opts = {
+                'format': 'bestaudio/best',
+                'extractaudio': True,
+                'audioformat': 'mp3',
+                'audioquality': '192K',
+            }
+        else:
+            # Optimized download options
+            ydl_opts = {
+                'format': 'best[height<=720]/best',  # Prefer 720p or lower for faster processing
+                'extractaudio': False,
+                'audioformat': 'mp3',
+                'writesubtitles': False,
+                'writeautomaticsub': False,
+                'prefer_insecure': False,
+            }
+        ydl_opts.update({
             'outtmpl': output_path,
             'quiet': True,
             'no_warnings': True,
-            'extractaudio': True,
-            'audioformat': 'mp3',
-            'audioquality': '192K',
-            'max_duration': max_duration,
+            'max_duration': max_duration,  # Limit to 1 hour max
             'ignoreerrors': True,
             'no_check_certificate': True,
-        }
+        })
         
         try:
-            print(f"🎵 Downloading audio from: {url}")
-            print("⏳ Extracting audio for faster processing...")
+            print(f"{'🎵' if audio_only else '📥'} Downloading {prefix} from: {url}")
+            print("⏳ This may take a few minutes depending on video length...")
             
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                ydl.download([url])
-                
-                # Find the downloaded audio file
-                downloaded_files = []
-                for file in os.listdir(temp_dir):
-                    if file.startswith(f"audio_{audio_id}") and file.endswith(('.mp3', '.m4a', '.webm')):
-                        downloaded_files.append(os.path.join(temp_dir, file))
+            with stage_seconds.time(stage="download"), yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                # One extraction both resolves the metadata and downloads the media
+                info = ydl.extract_info(url, download=True)
+                if not info:
+                    print(f"❌ {prefix.capitalize()} download failed - no video information")
+                    return None
+                if info.get('_type') == 'playlist' and info.get('entries'):
+                    info = next(entry for entry in info['entries'] if entry)
                 
-                if downloaded_files:
-                    audio_path = downloaded_files[0]
-                    print(f"✅ Audio extracted successfully: {os.path.basename(audio_path)}")
-                    return audio_path
-                else:
-                    print("❌ Audio extraction failed - no file found")
+                path = self._downloaded_path(ydl, info)
+                if not path:
+                    print(f"❌ {prefix.capitalize()} download failed - no file found")
                     return None
+                print(f"✅ {prefix.capitalize()} downloaded successfully: {os.path.basename(path)}")
+                return path, self._summarize_info(info, url)
                     
         except Exception as e:
-            self.logger.error(f"Audio download failed: {e}")
-            print(f"❌ Audio extraction failed: {str(e)}")
+            self.logger.error(f"{prefix.capitalize()} download failed: {e}")
+            print(f"❌ Download failed: {str(e)}")
             return None
     
+    def download_video(self, url: str, max_duration: int = 3600) -> Optional[str]:
+        """
+        Download video from URL with optimized settings.
+        Returns the path to the downloaded video file.
+        """
+        downloaded = self.download_with_info(url, audio_only=False, max_duration=max_duration)
+        return downloaded[0] if downloaded else None
+    
+    def download_audio_only(self, url: str, max_duration: int = 3600) -> Optional[str]:
+        """
+        Download only audio from video URL for faster processing.
+        Returns the path to the downloaded audio file.
+        """
+        downloaded = self.download_with_info(url, audio_only=True, max_duration=max_duration)
+        return downloaded[0] if downloaded else None
+    
     def cleanup_file(self, file_path: str):
         """Clean up downloaded file"""
         try:
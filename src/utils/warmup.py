@@ -0,0 +1,141 @@
+import os
+import time
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+
+from offline.model_registry import whisper_registry, configured_models
+from ai.ollama_client import ollama_client
+from ai.async_client import async_ollama_client
+from ai.tuning import inference_tuner
+from ai.model_policy import model_policy
+from utils.metrics import metrics
+
+
+class ModelWarmer:
+    """
+    Loads the Whisper and Ollama models in the background at startup and keeps
+    them resident, so the first request after a quiet spell does not wait for
+    a cold load.
+
+    Whisper models stay loaded in-process once loaded. Ollama unloads a model
+    after its keep_alive expires, so every `interval` seconds without Ollama
+    traffic each model gets an empty generate request, which reloads it if
+    needed and restarts its keep_alive timer.
+    """
+
+    def __init__(self, interval: float = 240.0):
+        self.interval = interval
+        self.whisper: Dict[str, str] = {}  # model -> "loading" / "ready" / "failed"
+        self.ollama: Dict[str, str] = {}
+        self.errors: Dict[str, str] = {}
+        self.warm_seconds: Optional[float] = None
+        self.last_ping: Optional[float] = None  # time.time() of the last keep-warm ping
+        self.logger = logging.getLogger(__name__)
+        self._task: Optional[asyncio.Task] = None
+
+    def whisper_models(self) -> List[str]:
+        # Include the policy's smaller fallbacks so degrading under load never waits for a model load
+        return list(dict.fromkeys(configured_models() + model_policy.preload_models()))
+
+    def llm_models(self) -> List[str]:
+        return list(model_policy.llm_ladder) if model_policy.adaptive else model_policy.llm_ladder[:1]
+
+    async def _warm_whisper(self):
+        # One at a time: loading several models at once only multiplies peak memory
+        for name in self.whisper_models():
+            if whisper_registry.is_loaded(name) and self.whisper.get(name) == "ready":
+                continue
+            self.whisper[name] = "loading"
+            try:
+                await asyncio.to_thread(whisper_registry.get, name)
+                self.whisper[name] = "ready"
+                self.errors.pop(f"whisper:{name}", None)
+            except Exception as e:
+                self.whisper[name] = "failed"
+                self.errors[f"whisper:{name}"] = str(e)
+                self.logger.error(f"Failed to preload Whisper model '{name}': {e}")
+
+    async def _warm_ollama(self, name: str):
+        if self.ollama.get(name) != "ready":
+            self.ollama[name] = "loading"
+        if await async_ollama_client.load_model_async(name):
+            self.ollama[name] = "ready"
+            self.errors.pop(f"ollama:{name}", None)
+        else:
+            self.ollama[name] = "failed"
+            backends = ", ".join(backend.url for backend in async_ollama_client.pool.backends)
+            self.errors[f"ollama:{name}"] = f"could not load model on any backend ({backends})"
+
+    async def warm(self):
+        """Load every configured model; Whisper and Ollama load concurrently"""
+        start = time.perf_counter()
+        print("🔥 Warming up Whisper and Ollama models...")
+        await asyncio.gather(self._warm_whisper(), *(self._warm_ollama(name) for name in self.llm_models()))
+        self.warm_seconds = time.perf_counter() - start
+        if self.ready:
+            print(f"✅ Models warm in {self.warm_seconds:.1f}s")
+        else:
+            print(f"⚠️ Warm-up finished in {self.warm_seconds:.1f}s with problems: {self.errors}")
+
+    async def keep_warm(self):
+        """Reload anything that is not resident; ping Ollama models if Ollama has been idle"""
+        await self._warm_whisper()
+        idle = time.monotonic() - max(ollama_client.last_used, async_ollama_client.last_used)
+        # Real traffic already restarts keep_alive; a failed model is retried regardless
+        if idle >= self.interval or any(status != "ready" for status in self.ollama.values()):
+            await asyncio.gather(*(self._warm_ollama(name) for name in self.llm_models()))
+            self.last_ping = time.time()
+
+    async def _run(self):
+        await self.warm()
+        while self.interval > 0:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.keep_warm()
+            except Exception as e:
+                self.logger.error(f"Keep-warm ping failed: {e}")
+
+    def start(self):
+        """Warm up in the background; the app serves (and reports not ready) meanwhile"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    @property
+    def ready(self) -> bool:
+        """The best model of each ladder is loaded; smaller fallbacks are reported but optional"""
+        whisper_model = model_policy.whisper_ladder[0]
+        return (self.whisper.get(whisper_model) == "ready"
+                and self.ollama.get(model_policy.llm_ladder[0]) == "ready")
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            'ready': self.ready,
+            'whisper': dict(self.whisper),
+            'whisper_models': whisper_registry.stats(),
+            'ollama': dict(self.ollama),
+            'errors': dict(self.errors),
+            'warm_seconds': round(self.warm_seconds, 2) if self.warm_seconds is not None else None,
+            'ollama_backends': async_ollama_client.pool.stats(),
+            'keep_alive': async_ollama_client.keep_alive,
+            'tuning': inference_tuner.stats() if inference_tuner is not None else None,
+            'keep_warm_interval': self.interval,
+            'last_ping': self.last_ping,
+        }
+
+
+# Global warmer instance.
+# OLLAMA_KEEP_WARM_INTERVAL (seconds, 0 disables pings) should stay below OLLAMA_KEEP_ALIVE.
+model_warmer = ModelWarmer(interval=float(os.environ.get("OLLAMA_KEEP_WARM_INTERVAL", "240")))
+
+metrics.gauge("video_ai_ready", "1 when the best Whisper and Ollama models are loaded",
+              collect=lambda: {(): int(model_warmer.ready)})
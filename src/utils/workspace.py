@@ -0,0 +1,77 @@
+import os
+import re
+import time
+import shutil
+import tempfile
+import logging
+from typing import Optional
+
+
+class Workspace:
+    """A private scratch directory for one job, removed by cleanup()"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.logger = logging.getLogger(__name__)
+
+    def file(self, name: str) -> str:
+        """Path for a file inside the workspace, with the name made filesystem-safe"""
+        safe = re.sub(r"[^\w.\-]", "_", os.path.basename(name or "")).lstrip(".") or "upload"
+        return os.path.join(self.path, safe[:128])
+
+    def cleanup(self):
+        """Remove the workspace and everything in it (safe to call more than once)"""
+        try:
+            shutil.rmtree(self.path, ignore_errors=False)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            self.logger.error(f"Failed to clean up workspace {self.path}: {e}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.cleanup()
+
+
+class WorkspaceManager:
+    """
+    Hands out unique per-job scratch directories under one root.
+    Point WORKSPACE_ROOT at a tmpfs such as /dev/shm to keep uploads in memory.
+    """
+
+    PREFIX = "job_"
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = root or os.path.join(tempfile.gettempdir(), "video-ai-analyzer")
+        self.logger = logging.getLogger(__name__)
+
+    def create(self) -> Workspace:
+        os.makedirs(self.root, exist_ok=True)
+        return Workspace(tempfile.mkdtemp(prefix=self.PREFIX, dir=self.root))
+
+    def purge_stale(self, max_age: float = 24 * 3600) -> int:
+        """Remove workspaces left behind by a crashed process"""
+        removed = 0
+        cutoff = time.time() - max_age
+        try:
+            names = os.listdir(self.root)
+        except FileNotFoundError:
+            return 0
+        for name in names:
+            path = os.path.join(self.root, name)
+            try:
+                if name.startswith(self.PREFIX) and os.path.getmtime(path) < cutoff:
+                    shutil.rmtree(path)
+                    removed += 1
+            except OSError as e:
+                self.logger.error(f"Failed to purge workspace {path}: {e}")
+        return removed
+
+
+# Largest upload accepted, in bytes
+MAX_UPLOAD_BYTES = int(os.environ.get("MAX_UPLOAD_BYTES", str(2 * 1024 * 1024 * 1024)))
+
+# Global workspace manager instance
+workspace_manager = WorkspaceManager(os.environ.get("WORKSPACE_ROOT"))
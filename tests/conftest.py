@@ -0,0 +1,27 @@
+import os
+import sys
+
+import pytest
+
+# Tests import modules the way the apps do, with src/ on the path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+# Keep the Ollama response cache in memory so tests never touch ~/.cache
+os.environ.setdefault("OLLAMA_CACHE_DB", "")
+
+
+class FakeClock:
+    """Stand-in for time.monotonic() that only moves when a test advances it"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
@@ -0,0 +1,38 @@
+import os
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api import routes
+from utils.workspace import WorkspaceManager
+
+
+def app_with_workspaces(monkeypatch, tmp_path):
+    monkeypatch.setattr(routes, "workspace_manager", WorkspaceManager(str(tmp_path)))
+    app = FastAPI()
+    app.include_router(routes.router)
+    return TestClient(app, raise_server_exceptions=False)
+
+
+def test_stream_removes_the_upload_when_probing_fails(monkeypatch, tmp_path):
+    client = app_with_workspaces(monkeypatch, tmp_path)
+
+    def broken_probe(path):
+        assert os.path.exists(path)
+        raise RuntimeError("ffprobe crashed")
+
+    monkeypatch.setattr(routes, "probe_duration", broken_probe)
+    response = client.post("/analyze-video/stream", files={'video': ("talk.mp4", b"not really a video")})
+
+    assert response.status_code == 500
+    assert os.listdir(tmp_path) == []
+
+
+def test_stream_rejects_oversized_uploads_without_leftovers(monkeypatch, tmp_path):
+    client = app_with_workspaces(monkeypatch, tmp_path)
+    monkeypatch.setattr(routes, "MAX_UPLOAD_BYTES", 4)
+
+    response = client.post("/analyze-video/stream", files={'video': ("talk.mp4", b"too many bytes")})
+
+    assert response.status_code == 413
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,72 @@
+import asyncio
+import itertools
+import json
+
+import httpx
+
+from ai import async_client
+from ai.async_client import AsyncOllamaClient
+from ai.ollama_client import OllamaHealth
+
+_ports = itertools.count(22000)
+
+
+def client_answering(monkeypatch, handler):
+    """A client whose HTTP pool is served by handler(request) instead of a server"""
+    real_client = httpx.AsyncClient
+    monkeypatch.setattr(async_client.httpx, "AsyncClient",
+                        lambda **kwargs: real_client(transport=httpx.MockTransport(handler), **kwargs))
+    client = AsyncOllamaClient(base_url=f"http://async-test:{next(_ports)}")
+    client.pool.backends[0].health.probe_interval = 0
+    return client
+
+
+def lines(*chunks):
+    return "\n".join(json.dumps(chunk) for chunk in chunks) + "\n"
+
+
+def test_stream_cut_before_done_is_an_error_and_not_cached(monkeypatch):
+    client = client_answering(monkeypatch, lambda request: httpx.Response(
+        200, text=lines({"response": "Half an"}, {"response": " answer"})))
+    tokens = []
+
+    answer = client.run(client.generate_async("Summarize", "cut stream", on_token=tokens.append))
+
+    assert tokens[:2] == ["Half an", " answer"]
+    assert answer != "Half an answer"
+    data = client._build_request("Summarize", "cut stream", 500)
+    assert client.cache.get(client._cache_key(data)) is None
+    assert client.pool.backends[0].failures == 1
+
+
+def test_complete_stream_is_returned_and_cached(monkeypatch):
+    client = client_answering(monkeypatch, lambda request: httpx.Response(
+        200, text=lines({"response": "All"}, {"response": " done", "done": True, "prompt_eval_count": 7})))
+
+    assert client.run(client.generate_async("Summarize", "full stream", on_token=lambda token: None)) == "All done"
+    data = client._build_request("Summarize", "full stream", 500)
+    assert client.cache.get(client._cache_key(data)) == "All done"
+
+
+def test_garbled_response_does_not_open_the_circuit(monkeypatch):
+    client = client_answering(monkeypatch, lambda request: httpx.Response(200, text="not json"))
+    health = client.pool.backends[0].health
+
+    for i in range(health.failure_threshold + 1):
+        client.run(client.generate_async("Summarize", f"garbled {i}"))
+        client.run(client.generate_async("Summarize", f"garbled stream {i}", on_token=lambda token: None))
+
+    assert health.state == OllamaHealth.CLOSED
+    assert client.pool.backends[0].failures == 0
+
+
+def test_pool_is_closed_when_a_plain_asyncio_run_ends(monkeypatch):
+    client = client_answering(monkeypatch, lambda request: httpx.Response(
+        200, json={"response": "ok", "done": True}))
+
+    asyncio.run(client.generate_async("Summarize", "first loop"))
+    first = client._client
+    assert first.is_closed
+
+    asyncio.run(client.generate_async("Summarize", "second loop"))
+    assert client._client is not first
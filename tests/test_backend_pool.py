@@ -0,0 +1,95 @@
+import itertools
+
+from ai.ollama_client import OllamaBackendPool, OllamaHealth
+
+_ports = itertools.count(21000)
+
+
+def pool_of(count, spill=4):
+    # Backends and breakers are shared per URL, so every test gets fresh ones
+    pool = OllamaBackendPool([f"http://pool-test:{next(_ports)}" for _ in range(count)], spill=spill)
+    for backend in pool.backends:
+        backend.health.probe_interval = 0  # no prober thread, no network
+    return pool
+
+
+def eject(backend):
+    for _ in range(backend.health.failure_threshold):
+        backend.health.record_failure()
+    assert backend.health.state == OllamaHealth.OPEN
+
+
+def test_least_outstanding_wins():
+    pool = pool_of(3)
+    a, b, c = pool.backends
+    a.outstanding, b.outstanding, c.outstanding = 2, 0, 1
+    assert pool.acquire() is b
+    assert b.outstanding == 1
+
+
+def test_latency_breaks_ties():
+    pool = pool_of(2)
+    a, b = pool.backends
+    a.ewma_seconds, b.ewma_seconds = 3.0, 1.0
+    assert pool.acquire() is b
+    assert pool.acquire() is a
+
+
+def test_affinity_sticks_until_spill():
+    pool = pool_of(2, spill=2)
+    first = pool.acquire("job-1")
+    other = next(backend for backend in pool.backends if backend is not first)
+    # Within `spill` of the least busy backend: stay put
+    assert pool.acquire("job-1") is first
+    assert first.outstanding == 2 and other.outstanding == 0
+    # Two more than the least busy one: this request spills over...
+    assert pool.acquire("job-1") is other
+    # ...but the pin stays, so the session context is reused once the load evens out
+    first.outstanding = 1
+    assert pool.acquire("job-1") is first
+
+
+def test_forget_drops_the_pin():
+    pool = pool_of(2)
+    first = pool.acquire("job-1")
+    pool.forget("job-1")
+    assert pool.acquire("job-1") is not first
+
+
+def test_ejected_backend_is_skipped_and_readmitted():
+    pool = pool_of(2)
+    a, b = pool.backends
+    assert pool.acquire("job-1") is a
+    eject(a)
+    # The pin moves to the healthy backend even though it is busier
+    b.outstanding = 3
+    assert pool.acquire("job-1") is b
+    assert pool.acquire() is b
+
+    a.health.record_success()  # what a passing probe does
+    assert pool.acquire() is a
+
+
+def test_all_ejected_claims_a_trial_or_gives_up():
+    pool = pool_of(2)
+    for backend in pool.backends:
+        eject(backend)
+    assert pool.acquire() is None
+
+    health = pool.backends[1].health
+    health.opened_at -= health.reset_timeout  # its reset timeout has passed
+    assert pool.acquire() is pool.backends[1]
+    assert pool.backends[1].health.state == OllamaHealth.HALF_OPEN
+
+
+def test_load_counts_only_backends_that_are_up():
+    pool = pool_of(4)
+    for backend in pool.backends:
+        backend.outstanding = 2
+    assert pool.load() == 2
+    eject(pool.backends[0])
+    eject(pool.backends[1])
+    assert pool.load() == 4
+    for backend in pool.backends:
+        eject(backend)
+    assert pool.load() == 2
@@ -0,0 +1,58 @@
+import json
+
+from ai.ollama_client import OllamaClient
+from ai.tuning import InferenceTuner
+from analyzer.combined import CombinedAnalyzer, parse_json_object
+
+
+def analyzer(tuner=None):
+    combined = CombinedAnalyzer()
+    combined.client = OllamaClient(base_url="http://127.0.0.1:9", tuner=tuner)
+    return combined
+
+
+def test_fixed_context_only_without_a_tuner():
+    assert analyzer()._request_kwargs()['options'] == {"num_ctx": 4096}
+    tuned = analyzer(InferenceTuner(cores=8, context_sizes=[2048, 8192]))
+    assert 'options' not in tuned._request_kwargs()
+    # The budget follows the tuner's largest context, not the fixed window
+    assert tuned._fits("word " * 4000) and not analyzer()._fits("word " * 4000)
+
+
+def test_json_is_found_inside_surrounding_text():
+    assert parse_json_object('Here you go: {"summary": "x"} Enjoy!') == {"summary": "x"}
+    assert parse_json_object("[1, 2]") == {}
+    assert parse_json_object("no json {here") == {}
+    assert parse_json_object("") == {}
+
+
+def test_each_section_falls_back_on_its_own():
+    response = json.dumps({
+        "summary": "The lecture explains how neural networks learn from data.",
+        "study_guide": {"key_concepts": ["Gradients", "Loss"], "further_reading": "Deep Learning book"},
+        "topics": [{"name": "Backpropagation", "level": "Intermediate", "why": "Core idea"},
+                   "Optimizers", {"why": "no name"}],
+        "quiz": [{"question": "What is a loss?", "options": ["A", "B", "C", "D"], "answer": "A"}],
+    })
+    sections = analyzer().parse(response)
+
+    assert sections['summary'].startswith("The lecture explains")
+    assert "🔑 KEY CONCEPTS:\n• Gradients\n• Loss" in sections['guide']
+    assert "📚 FURTHER READING:\n• Deep Learning book" in sections['guide']
+    # Two usable topics and one question are too few, so only those sections are regenerated
+    assert sections['topics'] is None
+    assert sections['quizzes'] is None
+
+
+def test_unparseable_response_leaves_every_section_to_the_analyzers():
+    assert analyzer().parse("Sorry, I cannot help with that.") == dict.fromkeys(CombinedAnalyzer.SECTIONS)
+
+
+def test_complete_sections_are_rendered():
+    quiz = [{"question": f"Question {i}?", "options": ["a", "b", "c", "d"], "answer": "a",
+             "difficulty": "Easy"} for i in range(3)]
+    topics = [{"name": f"Topic {i}", "level": "Beginner"} for i in range(3)]
+    sections = analyzer().parse(json.dumps({"topics": topics, "quiz": quiz}))
+    assert "1. Topic 0 (Beginner)" in sections['topics']
+    assert "Q3. Question 2? [Easy]\n   A) a" in sections['quizzes']
+    assert sections['summary'] is None and sections['guide'] is None
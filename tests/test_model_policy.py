@@ -0,0 +1,64 @@
+from ai.model_policy import ModelPolicy
+
+
+def policy(**kwargs):
+    # Defaults: Whisper small/base take 0.3/0.1 s per media second; the LLMs 60/36 s per analysis
+    kwargs.setdefault("explore_every", 0)
+    kwargs.setdefault("adaptive", True)
+    return ModelPolicy(["small", "base"], ["big", "little"], target_seconds=300, **kwargs)
+
+
+def test_best_models_while_they_fit_the_target():
+    choice = policy().choose(100)
+    assert (choice.whisper_model, choice.llm_model) == ("small", "big")
+    assert choice.predicted_seconds == 90 and not choice.degraded
+
+
+def test_fixed_policy_never_degrades():
+    choice = policy(adaptive=False).choose(100, backlog=(10, 1000))
+    assert (choice.whisper_model, choice.llm_model, choice.degraded) == ("small", "big", False)
+
+
+def test_backlog_degrades_to_the_fastest_pair_when_nothing_fits():
+    choice = policy().choose(100, backlog=(10, 1000))
+    assert (choice.whisper_model, choice.llm_model) == ("base", "little")
+    assert choice.degraded
+
+
+def test_restoring_a_tier_needs_headroom():
+    models = policy()
+    models.choose(100, backlog=(10, 1000))
+    # (small, big) would take 270s: within the 300s target but not the 240s upgrade margin
+    choice = models.choose(700)
+    assert (choice.whisper_model, choice.llm_model) == ("base", "big")
+    assert models.choose(100).degraded is False
+
+
+def test_degraded_choices_periodically_explore_one_tier_up():
+    models = policy(explore_every=2)
+    first = models.choose(100, backlog=(10, 1000))
+    second = models.choose(100, backlog=(10, 1000))
+    assert (first.whisper_model, first.llm_model) == ("base", "little")
+    assert (second.whisper_model, second.llm_model) == ("base", "big")
+    # Exploring is not an upgrade
+    assert models.stats()['current'] == {'whisper_model': "base", 'llm_model': "little"}
+
+
+def test_admitted_requests_count_towards_the_backlog_until_released():
+    models = policy()
+    first = models.admit(600)
+    second = models.admit(400)
+    assert models.backlog((1, 50.0)) == (3, 1050.0)
+    models.release(first)
+    models.release(first)
+    models.release(None)
+    assert models.backlog() == (1, 400.0)
+    models.release(second)
+    assert models.backlog() == (0, 0.0)
+
+
+def test_admission_sees_requests_already_being_served():
+    models = policy()
+    for _ in range(5):
+        models.admit(600)
+    assert models.admit(100).degraded
@@ -0,0 +1,97 @@
+import requests
+
+from ai.ollama_client import OllamaHealth
+
+
+class FakeResponse:
+    def raise_for_status(self):
+        pass
+
+
+def breaker(clock, threshold=3, reset=30.0):
+    # probe_interval=0: no prober thread, probes are driven by the test
+    return OllamaHealth("http://health-test:11434", failure_threshold=threshold, reset_timeout=reset,
+                        probe_interval=0, clock=clock)
+
+
+def test_opens_after_consecutive_failures_and_fails_fast(clock):
+    health = breaker(clock)
+    health.record_failure()
+    health.record_failure()
+    assert health.state == OllamaHealth.CLOSED and health.allow()
+
+    health.record_failure()
+    assert health.state == OllamaHealth.OPEN
+    assert not health.allow() and not health.allow()
+    assert health.short_circuited == 2
+
+
+def test_success_resets_the_failure_count(clock):
+    health = breaker(clock)
+    health.record_failure()
+    health.record_failure()
+    health.record_success()
+    health.record_failure()
+    health.record_failure()
+    assert health.state == OllamaHealth.CLOSED
+
+
+def test_half_open_trial_after_reset_timeout(clock):
+    health = breaker(clock, threshold=1)
+    health.record_failure()
+
+    clock.advance(29)
+    assert not health.allow()
+    clock.advance(1)
+    assert health.allow()
+    assert health.state == OllamaHealth.HALF_OPEN
+    # Only one trial at a time
+    assert not health.allow()
+
+    health.record_success()
+    assert health.state == OllamaHealth.CLOSED and health.allow()
+
+
+def test_failed_trial_reopens_for_another_timeout(clock):
+    health = breaker(clock, threshold=3)
+    for _ in range(3):
+        health.record_failure()
+    clock.advance(30)
+    assert health.allow()
+
+    health.record_failure()
+    assert health.state == OllamaHealth.OPEN
+    clock.advance(10)
+    assert not health.allow()
+    clock.advance(20)
+    assert health.allow()
+
+
+def test_lost_trial_is_retried_after_timeout(clock):
+    health = breaker(clock, threshold=1)
+    health.record_failure()
+    clock.advance(30)
+    assert health.allow()
+    # The trial never reports back
+    clock.advance(30)
+    assert health.allow()
+    assert health.state == OllamaHealth.HALF_OPEN
+
+
+def test_probe_opens_and_closes_the_circuit(monkeypatch, clock):
+    health = breaker(clock)
+
+    def refused(url, timeout):
+        raise requests.exceptions.ConnectionError("refused")
+
+    monkeypatch.setattr(requests, "get", refused)
+    assert not health.probe()
+    assert health.state == OllamaHealth.OPEN
+    assert health.last_probe['ok'] is False and "refused" in health.last_probe['error']
+    assert not health.allow()
+
+    monkeypatch.setattr(requests, "get", lambda url, timeout: FakeResponse())
+    assert health.probe()
+    assert health.state == OllamaHealth.CLOSED
+    assert health.status()['consecutive_failures'] == 0
+    assert health.allow()
@@ -0,0 +1,54 @@
+import asyncio
+
+import pytest
+
+from analyzer.pipeline import AnalysisPipeline, Stage
+
+
+def stage(name, depends_on=(), value=None):
+    async def func(results):
+        return value if value is not None else name
+    return Stage(name, func, depends_on)
+
+
+def test_unknown_dependency_is_rejected():
+    with pytest.raises(ValueError, match="unknown stage"):
+        AnalysisPipeline([stage("guide", ["summary"])])
+
+
+def test_inputs_satisfy_dependencies():
+    pipeline = AnalysisPipeline([stage("summary", ["transcript"])], inputs=["transcript"])
+    assert asyncio.run(pipeline.run(transcript="text"))["summary"] == "summary"
+    with pytest.raises(ValueError, match="Missing pipeline inputs"):
+        asyncio.run(pipeline.run())
+
+
+def test_dependency_cycle_is_rejected():
+    with pytest.raises(ValueError, match="cycle"):
+        AnalysisPipeline([stage("a", ["c"]), stage("b", ["a"]), stage("c", ["b"])])
+    with pytest.raises(ValueError, match="cycle"):
+        AnalysisPipeline([stage("a", ["a"])])
+
+
+def test_stages_run_after_their_dependencies_and_concurrently_otherwise():
+    events = []
+    release = asyncio.Event()
+
+    async def slow(results):
+        await release.wait()
+        return "summary"
+
+    async def topics(results):
+        release.set()  # only finishes if it runs while "summary" is still waiting
+        return "topics"
+
+    async def guide(results):
+        return results["summary"] + "+guide"
+
+    pipeline = AnalysisPipeline([Stage("summary", slow), Stage("guide", guide, ["summary"]),
+                                 Stage("topics", topics)])
+    result = asyncio.run(pipeline.run(on_stage=lambda event, name, info: events.append((event, name))))
+
+    assert result["guide"] == "summary+guide"
+    assert events.index(("end", "summary")) < events.index(("start", "guide"))
+    assert set(result.timings) == {"summary", "guide", "topics"}
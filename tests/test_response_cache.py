@@ -0,0 +1,64 @@
+from ai import response_cache as module
+from ai.response_cache import ResponseCache, make_cache_key
+
+
+def frozen_time(monkeypatch, start=1000.0):
+    now = [start]
+    monkeypatch.setattr(module.time, "time", lambda: now[0])
+    return now
+
+
+def test_entries_expire_after_the_ttl(monkeypatch, tmp_path):
+    now = frozen_time(monkeypatch)
+    cache = ResponseCache(str(tmp_path / "cache.sqlite3"), ttl=60)
+    cache.put("k", "answer")
+    now[0] += 59
+    assert cache.get("k") == "answer"
+    now[0] += 1
+    assert cache.get("k") is None
+    assert cache.misses == 1
+
+
+def test_memory_tier_evicts_least_recently_used(monkeypatch):
+    frozen_time(monkeypatch)
+    cache = ResponseCache(None, max_entries=2)
+    cache.put("a", "1")
+    cache.put("b", "2")
+    assert cache.get("a") == "1"  # "b" is now the least recently used
+    cache.put("c", "3")
+    assert cache.get("b") is None
+    assert cache.get("a") == "1" and cache.get("c") == "3"
+
+
+def test_disk_tier_serves_entries_evicted_from_memory(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = ResponseCache(path, max_entries=1)
+    cache.put("a", "1")
+    cache.put("b", "2")
+    assert cache.get("a") == "1"
+    assert cache.disk_hits == 1
+    # Another process (or a restart) sees the same store
+    assert ResponseCache(path).get("b") == "2"
+
+
+def test_prune_drops_expired_then_least_recently_accessed(monkeypatch, tmp_path):
+    now = frozen_time(monkeypatch)
+    cache = ResponseCache(str(tmp_path / "cache.sqlite3"), ttl=100, max_disk_bytes=20)
+    cache.put("expired", "x" * 5)
+    now[0] += 50
+    for key in ("old", "recent", "new"):
+        cache.put(key, "y" * 8)
+        now[0] += 1
+    now[0] += 50
+    cache._db.execute("UPDATE responses SET accessed = ? WHERE key = 'old'", (now[0],))
+
+    cache._prune(now[0])
+
+    keys = {row[0] for row in cache._db.execute("SELECT key FROM responses")}
+    assert keys == {"old", "new"}
+    assert cache.storage()['disk'] == {'entries': 2, 'bytes': 16}
+
+
+def test_cache_key_ignores_option_order():
+    assert make_cache_key("m", {"a": 1, "b": 2}, "p") == make_cache_key("m", {"b": 2, "a": 1}, "p")
+    assert make_cache_key("m", {"a": 1}, "p") != make_cache_key("m", {"a": 2}, "p")
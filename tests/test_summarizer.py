@@ -0,0 +1,109 @@
+import re
+import asyncio
+
+from ai.ollama_client import OllamaClient, estimate_tokens
+from ai.tuning import InferenceTuner
+from analyzer.summarizer import (Summarizer, split_text, SUMMARY_PROMPT, SUMMARY_TOKENS,
+                                 CHUNK_SUMMARY_PROMPT, MAX_REDUCE_LEVELS)
+
+
+class ShrinkingClient:
+    """Stands in for the Ollama clients: each 'summary' keeps the first `keep` characters"""
+
+    def __init__(self, final_budget=100, chunk_budget=80, keep=60):
+        self.budgets = {SUMMARY_PROMPT: final_budget, CHUNK_SUMMARY_PROMPT: chunk_budget}
+        self.keep = keep
+        self.calls = []
+
+    def prompt_budget(self, prompt, max_tokens):
+        return self.budgets[prompt]
+
+    def generate(self, prompt, context="", max_tokens=500):
+        self.calls.append(context)
+        return context[:self.keep]
+
+    async def generate_async(self, prompt, context="", max_tokens=500):
+        return self.generate(prompt, context, max_tokens)
+
+
+def sentences(count):
+    return " ".join(f"Sentence number {i} explains one more idea about gradient descent." for i in range(count))
+
+
+def summarizer_with(client):
+    summarizer = Summarizer()
+    summarizer.client = summarizer.async_client = client
+    return summarizer
+
+
+def test_split_keeps_sentences_whole_and_within_budget():
+    text = sentences(40)
+    chunks = split_text(text, 50)
+    assert len(chunks) > 1
+    assert " ".join(chunks) == text
+    for chunk in chunks:
+        assert sum(estimate_tokens(s) for s in re.split(r'(?<=[.!?])\s+', chunk)) <= 50
+        assert chunk.endswith(".")
+
+
+def test_split_short_and_empty_text():
+    assert split_text("One short sentence.", 50) == ["One short sentence."]
+    assert split_text("   ", 50) == []
+
+
+def test_split_falls_back_to_word_windows_for_run_on_text():
+    words = [f"word{i}" for i in range(300)]
+    chunks = split_text(" ".join(words), 40)
+    assert " ".join(chunks).split() == words
+    assert all(len(chunk.split()) <= 30 for chunk in chunks)  # windows of 3/4 of the budget
+
+
+def test_prompt_budget_leaves_room_for_prompt_and_answer():
+    client = OllamaClient(base_url="http://127.0.0.1:9")
+    overhead = estimate_tokens(client._optimize_prompt(SUMMARY_PROMPT))
+    assert client.prompt_budget(SUMMARY_PROMPT, SUMMARY_TOKENS) == \
+        client.context_window - overhead - SUMMARY_TOKENS - 64
+    assert client.prompt_budget(SUMMARY_PROMPT, 10_000) == 256
+
+
+def test_prompt_budget_uses_the_tuners_largest_context():
+    tuner = InferenceTuner(cores=4, context_sizes=[2048, 8192])
+    client = OllamaClient(base_url="http://127.0.0.1:9", tuner=tuner)
+    overhead = estimate_tokens(client._optimize_prompt(SUMMARY_PROMPT))
+    assert client.prompt_budget(SUMMARY_PROMPT, SUMMARY_TOKENS) == 8192 - overhead - SUMMARY_TOKENS - 64
+
+    # Ollama counted twice the estimated tokens: the budget halves in estimate units
+    tuner.record_prompt(client.model, 1000, 2000)
+    expected = (8192 - 2 * overhead - SUMMARY_TOKENS - 64) // 2
+    assert client.prompt_budget(SUMMARY_PROMPT, SUMMARY_TOKENS) == expected
+
+
+def test_reduce_leaves_text_that_fits_untouched():
+    client = ShrinkingClient()
+    text = sentences(3)
+    assert summarizer_with(client)._reduce(text) == text
+    assert client.calls == []
+
+
+def test_reduce_recurses_until_the_text_fits():
+    client = ShrinkingClient(final_budget=100, chunk_budget=80, keep=60)
+    text = sentences(200)
+    reduced = summarizer_with(client)._reduce(text)
+    assert estimate_tokens(reduced) <= 100
+    # Every level summarizes chunks of the previous level's output
+    first_level = split_text(text, 80)
+    assert client.calls[:len(first_level)] == first_level
+    assert len(client.calls) > len(first_level)
+
+
+def test_reduce_stops_after_max_levels():
+    client = ShrinkingClient(final_budget=10, chunk_budget=1000, keep=10_000)  # summaries never shrink
+    text = sentences(50)
+    assert summarizer_with(client)._reduce(text) == text
+    assert len(client.calls) == MAX_REDUCE_LEVELS
+
+
+def test_async_reduce_matches_sync():
+    text = sentences(200)
+    sync = summarizer_with(ShrinkingClient())._reduce(text)
+    assert asyncio.run(summarizer_with(ShrinkingClient())._reduce_async(text)) == sync
@@ -0,0 +1,101 @@
+import numpy as np
+
+from offline.transcriber import find_chunk_bounds, split_audio, merge_transcripts
+
+RATE = 1000  # low sample rate keeps the arrays small; the functions take any rate
+
+
+def noise(seconds: float, level: float = 0.5, seed: int = 0) -> np.ndarray:
+    return np.random.default_rng(seed).uniform(-level, level, int(seconds * RATE)).astype(np.float32)
+
+
+def test_merge_drops_words_repeated_across_the_overlap():
+    assert merge_transcripts(["the cat sat on", "sat on the mat"]) == "the cat sat on the mat"
+
+
+def test_merge_matches_case_and_punctuation_insensitively():
+    assert merge_transcripts(["We learn gradient descent.", "Descent updates weights"]) == \
+        "We learn gradient descent. updates weights"
+
+
+def test_merge_skips_empty_chunks():
+    assert merge_transcripts(["", "one two", "  ", "two three"]) == "one two three"
+    assert merge_transcripts([]) == ""
+
+
+def test_merge_keeps_overlaps_longer_than_the_window():
+    words = [f"w{i}" for i in range(30)]
+    first, second = " ".join(words[:20]), " ".join(words[5:])
+    # 15 repeated words cannot be matched within 12, so nothing is dropped
+    assert merge_transcripts([first, second]) == f"{first} {second}"
+    assert merge_transcripts([first, second], max_overlap_words=15) == " ".join(words)
+
+
+def test_bounds_of_short_and_empty_audio():
+    assert find_chunk_bounds(noise(3), RATE, chunk_seconds=10) == [(0, 3 * RATE)]
+    assert find_chunk_bounds(np.zeros(0, np.float32), RATE, chunk_seconds=10) == [(0, 0)]
+
+
+def test_bounds_cut_at_the_silence_before_the_target():
+    audio = noise(25)
+    audio[int(7.5 * RATE):int(7.7 * RATE)] = 0.0  # inside the 5 s search window before 10 s
+    bounds = find_chunk_bounds(audio, RATE, chunk_seconds=10, search_seconds=5)
+    assert 7.5 * RATE <= bounds[0][1] < 7.7 * RATE
+
+
+def test_bounds_without_silence_stay_within_the_search_window():
+    audio = np.full(35 * RATE, 0.3, np.float32)  # constant level: no quieter frame anywhere
+    bounds = find_chunk_bounds(audio, RATE, chunk_seconds=10, search_seconds=2)
+    for start, end in bounds[:-1]:
+        assert 8 * RATE <= end - start <= 10 * RATE
+    assert bounds[0][0] == 0 and bounds[-1][1] == len(audio)
+    assert all(a[1] == b[0] for a, b in zip(bounds, bounds[1:]))
+
+
+def test_bounds_never_leave_an_empty_tail():
+    for seconds in (10.001, 20, 20.02, 30.5):
+        audio = noise(seconds)
+        bounds = find_chunk_bounds(audio, RATE, chunk_seconds=10)
+        assert all(end > start for start, end in bounds)
+        assert bounds[-1][1] == len(audio)
+
+
+def test_split_overlaps_every_chunk_but_the_first():
+    audio = noise(25)
+    bounds = find_chunk_bounds(audio, RATE, chunk_seconds=10)
+    chunks = split_audio(audio, RATE, chunk_seconds=10, overlap_seconds=1)
+    assert len(chunks) == len(bounds)
+    assert len(chunks[0]) == bounds[0][1]
+    for chunk, (start, end) in zip(chunks[1:], bounds[1:]):
+        assert len(chunk) == end - start + RATE
+        np.testing.assert_array_equal(chunk, audio[start - RATE:end])
+
+
+def test_split_short_audio_is_one_chunk():
+    audio = noise(4)
+    chunks = split_audio(audio, RATE, chunk_seconds=10, overlap_seconds=1)
+    assert len(chunks) == 1
+    np.testing.assert_array_equal(chunks[0], audio)
+
+
+def test_each_model_gets_its_own_worker_pool(monkeypatch):
+    from offline import transcriber
+
+    created = []
+
+    class FakePool:
+        def __init__(self, **kwargs):
+            created.append(kwargs["initargs"][0])
+            self.stopped = False
+
+        def shutdown(self, cancel_futures=False):
+            self.stopped = True
+
+    monkeypatch.setattr(transcriber, "ProcessPoolExecutor", FakePool)
+    parallel = transcriber.ParallelTranscriber(workers=2)
+    tiny = parallel._get_pool("tiny")
+    assert parallel._get_pool("tiny") is tiny
+    small = parallel._get_pool("small")
+    assert small is not tiny and created == ["tiny", "small"]
+    parallel.shutdown()
+    assert tiny.stopped and small.stopped
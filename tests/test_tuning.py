@@ -0,0 +1,117 @@
+from ai.tuning import InferenceTuner, CONTEXT_MARGIN
+
+
+def tuner_with(clock, **kwargs):
+    return InferenceTuner(cores=8, context_sizes=[2048, 4096], smoothing=1.0, clock=clock, **kwargs)
+
+
+def test_level_changes_only_after_settling(clock):
+    tuner = tuner_with(clock, settle_after=30)
+    tuner.observe(4)
+    assert tuner.threads() == 8
+    clock.advance(29)
+    tuner.observe(4)
+    assert tuner.threads() == 8
+    clock.advance(1)
+    tuner.observe(4)
+    assert tuner.concurrency_level() == 4 and tuner.threads() == 2
+
+
+def test_load_near_a_boundary_does_not_flip_the_level(clock):
+    tuner = tuner_with(clock, settle_after=30)
+    # round(log2(load)) changes at load ~1.41; hover around it for a long time
+    for i in range(100):
+        tuner.observe(1.5 if i % 2 else 1.3)
+        clock.advance(5)
+    assert tuner.concurrency_level() == 1
+
+
+def test_options_do_not_touch_the_load(clock):
+    tuner = tuner_with(clock, settle_after=0)
+    for _ in range(10):
+        tuner.options("m", 100, 200)
+    assert tuner.stats()['concurrency'] == 1.0
+    tuner.observe(2)
+    assert tuner.options("m", 100, 200)['num_thread'] == 4
+
+
+def test_context_fits_prompt_and_response(clock):
+    tuner = tuner_with(clock)
+    options = tuner.options("m", 1500, 500)
+    assert options['num_ctx'] == 2048 + 2048
+    assert options['num_predict'] == 500
+    fixed = tuner.options("m", 1500, 500, num_ctx=2048)
+    assert fixed['num_predict'] == 2048 - 1500 - CONTEXT_MARGIN
+
+
+def test_prompt_estimate_follows_measured_counts(clock):
+    tuner = tuner_with(clock)
+    assert tuner.prompt_tokens("m", 1000) == 1000
+    tuner.record_prompt("m", 1000, 1300)
+    assert tuner.prompt_tokens("m", 1000) == 1300
+    assert tuner.prompt_tokens("other", 1000) == 1000
+    # A prompt mostly served from Ollama's prefix cache is not a sample
+    tuner.record_prompt("m", 1000, 50)
+    assert tuner.prompt_tokens("m", 1000) == 1300
+    # The calibrated size picks the context
+    assert tuner.options("m", 1400, 200)['num_ctx'] == 4096
+
+
+def test_truncated_num_predict_is_counted(clock):
+    from utils.metrics import ollama_truncated_responses
+    tuner = tuner_with(clock)
+
+    def count(reason):
+        return ollama_truncated_responses._values.get(("t", reason), 0)
+
+    before = {reason: count(reason) for reason in ("context", "floor")}
+    tuner.options("t", 3000, 2000)
+    assert tuner.options("t", 5000, 500)['num_predict'] == CONTEXT_MARGIN
+    assert count("context") == before["context"] + 1
+    assert count("floor") == before["floor"] + 1
+
+
+def tuned_client(monkeypatch, clock, ratio=1.0):
+    """OllamaClient with a tuner whose requests are answered without a server"""
+    from ai.ollama_client import OllamaClient, estimate_tokens
+
+    tuner = InferenceTuner(cores=8, context_sizes=[2048], clock=clock)
+    client = OllamaClient(base_url="http://127.0.0.1:9", tuner=tuner)
+    client.sent = []
+
+    def make_request(endpoint, data, backend=None, affinity=None):
+        client.sent.append(data)
+        return {'response': "A detailed answer.", 'prompt_eval_count': int(estimate_tokens(data["prompt"]) * ratio)}
+
+    monkeypatch.setattr(client, "_make_request", make_request)
+    return client
+
+
+def test_cache_hits_are_not_tuned_or_counted(monkeypatch, clock):
+    from utils.metrics import ollama_truncated_responses
+
+    client = tuned_client(monkeypatch, clock)
+    floor = ("llama3:8b", "floor")
+    before = ollama_truncated_responses._values.get(floor, 0)
+    document = "word " * 2000  # ~2500 tokens: the prompt overflows the context
+    client.generate("Summarize the overflowing lecture", document)
+    retained = dict(client.tuner._contexts)
+    clock.advance(60)
+    for _ in range(3):
+        client.generate("Summarize the overflowing lecture", document)
+
+    assert len(client.sent) == 1
+    assert ollama_truncated_responses._values.get(floor, 0) == before + 1
+    assert client.tuner._contexts == retained
+
+
+def test_calibration_does_not_change_cache_keys(monkeypatch, clock):
+    client = tuned_client(monkeypatch, clock, ratio=1.8)
+    document = "word " * 1100  # ~1400 tokens estimated, ~2500 measured
+    client.generate("Summarize the calibrated lecture", document)
+    assert client.sent[0]["options"]["num_predict"] == 500
+    # Now the same request would be sent with num_predict cut to the floor...
+    assert client.tuner.options(client.model, 1400, 500, report=False)["num_predict"] == CONTEXT_MARGIN
+    # ...but it is still answered from the cache
+    client.generate("Summarize the calibrated lecture", document)
+    assert len(client.sent) == 1
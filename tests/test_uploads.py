@@ -0,0 +1,75 @@
+import asyncio
+import hashlib
+import os
+
+import pytest
+
+from utils.uploads import receive_upload, UploadError, UploadTooLargeError
+from utils.workspace import WorkspaceManager
+
+BOUNDARY = "xyzzy"
+
+
+def form(parts):
+    body = b""
+    for name, filename, data in parts:
+        disposition = f'form-data; name="{name}"' + (f'; filename="{filename}"' if filename else "")
+        body += f"--{BOUNDARY}\r\nContent-Disposition: {disposition}\r\n\r\n".encode() + data + b"\r\n"
+    return body + f"--{BOUNDARY}--\r\n".encode()
+
+
+class FakeRequest:
+    """The parts of a Starlette request receive_upload uses; the body arrives in small chunks"""
+
+    def __init__(self, body, content_length=True, chunk=7):
+        self.headers = {'content-type': f"multipart/form-data; boundary={BOUNDARY}"}
+        if content_length:
+            self.headers['content-length'] = str(len(body))
+        self.body = body
+        self.chunk = chunk
+        self.read = 0
+
+    async def stream(self):
+        for i in range(0, len(self.body), self.chunk):
+            self.read += self.chunk
+            yield self.body[i:i + self.chunk]
+
+
+def receive(request, tmp_path, **kwargs):
+    workspace = WorkspaceManager(str(tmp_path)).create()
+    return asyncio.run(receive_upload(request, workspace, **kwargs)), workspace
+
+
+def test_file_is_written_and_hashed_while_it_streams_in(tmp_path):
+    data = os.urandom(1000)
+    body = form([("note", None, b"ignored"), ("video", "../my talk.mp4", data)])
+    (path, filename, digest, size), workspace = receive(FakeRequest(body), tmp_path)
+
+    assert filename == "../my talk.mp4"
+    assert os.path.dirname(path) == workspace.path and os.path.basename(path) == "my_talk.mp4"
+    assert open(path, "rb").read() == data
+    assert digest == hashlib.sha256(data).hexdigest() and size == 1000
+
+
+def test_declared_length_over_the_limit_is_refused_unread(tmp_path):
+    request = FakeRequest(form([("video", "big.mp4", b"x" * 200_000)]))
+    with pytest.raises(UploadTooLargeError):
+        receive(request, tmp_path, max_bytes=1000)
+    assert request.read == 0
+
+
+def test_undeclared_length_stops_at_the_limit(tmp_path):
+    request = FakeRequest(form([("video", "big.mp4", b"x" * 5000)]), content_length=False, chunk=100)
+    with pytest.raises(UploadTooLargeError):
+        receive(request, tmp_path, max_bytes=1000)
+    assert request.read < 2000
+    assert [os.listdir(os.path.join(tmp_path, name)) for name in os.listdir(tmp_path)] == [[]]
+
+
+def test_missing_file_field_is_an_upload_error(tmp_path):
+    with pytest.raises(UploadError):
+        receive(FakeRequest(form([("other", "a.mp4", b"data")])), tmp_path)
+    request = FakeRequest(b"video=1")
+    request.headers['content-type'] = "application/x-www-form-urlencoded"
+    with pytest.raises(UploadError):
+        receive(request, tmp_path)
@@ -0,0 +1,45 @@
+from offline import url_pipeline
+from utils.workspace import WorkspaceManager
+
+INFO = {'title': "Lecture", 'duration': 3600, 'url': "https://youtu.be/x"}
+
+
+class FakeProcessor:
+    def __init__(self, source, model_name=None):
+        self.source = source
+
+    def transcribe_stream(self, headers):
+        return f"transcript of {self.source}"
+
+
+def fake_downloader(monkeypatch, resolved):
+    calls = []
+
+    def resolve_audio_stream(url):
+        calls.append(url)
+        return resolved
+
+    monkeypatch.setattr(url_pipeline.video_downloader, "resolve_audio_stream", resolve_audio_stream)
+    monkeypatch.setattr(url_pipeline, "ffmpeg_available", lambda: True)
+    monkeypatch.setattr(url_pipeline, "VideoProcessor", FakeProcessor)
+    return calls
+
+
+def test_resolve_reports_the_duration(monkeypatch):
+    fake_downloader(monkeypatch, ("https://media/a.m4a", {}, INFO))
+    stream, duration = url_pipeline.resolve_url(INFO['url'])
+    assert duration == 3600 and stream[0] == "https://media/a.m4a"
+
+
+def test_failed_resolve_has_unknown_duration(monkeypatch):
+    fake_downloader(monkeypatch, None)
+    assert url_pipeline.resolve_url(INFO['url']) == (None, 0)
+
+
+def test_transcription_reuses_the_resolved_stream(monkeypatch, tmp_path):
+    calls = fake_downloader(monkeypatch, ("https://media/a.m4a", {}, INFO))
+    stream, _ = url_pipeline.resolve_url(INFO['url'])
+    with WorkspaceManager(str(tmp_path)).create() as workspace:
+        transcript, info = url_pipeline.transcribe_url(INFO['url'], workspace, pipelined=True, stream=stream)
+    assert transcript == "transcript of https://media/a.m4a" and info == INFO
+    assert len(calls) == 1  # only the resolve before queueing